@@ -0,0 +1,98 @@
+from functools import lru_cache
+from typing import Optional, Tuple
+import re
+
+# (city, region, country) in the lowercase form stored on candidates
+NormalizedLocation = Tuple[Optional[str], Optional[str], Optional[str]]
+
+US_STATES = {
+    "alabama": "al", "alaska": "ak", "arizona": "az", "arkansas": "ar", "california": "ca",
+    "colorado": "co", "connecticut": "ct", "delaware": "de", "florida": "fl", "georgia": "ga",
+    "hawaii": "hi", "idaho": "id", "illinois": "il", "indiana": "in", "iowa": "ia",
+    "kansas": "ks", "kentucky": "ky", "louisiana": "la", "maine": "me", "maryland": "md",
+    "massachusetts": "ma", "michigan": "mi", "minnesota": "mn", "mississippi": "ms", "missouri": "mo",
+    "montana": "mt", "nebraska": "ne", "nevada": "nv", "new hampshire": "nh", "new jersey": "nj",
+    "new mexico": "nm", "new york": "ny", "north carolina": "nc", "north dakota": "nd", "ohio": "oh",
+    "oklahoma": "ok", "oregon": "or", "pennsylvania": "pa", "rhode island": "ri", "south carolina": "sc",
+    "south dakota": "sd", "tennessee": "tn", "texas": "tx", "utah": "ut", "vermont": "vt",
+    "virginia": "va", "washington": "wa", "west virginia": "wv", "wisconsin": "wi", "wyoming": "wy",
+    "district of columbia": "dc",
+}
+US_STATE_CODES = set(US_STATES.values())
+
+# Country names and unambiguous codes mapped to ISO 3166 alpha-2. Two-letter
+# codes that collide with US states (CA, IN, DE, ...) are deliberately absent.
+COUNTRY_ALIASES = {
+    "us": "us", "usa": "us", "u.s.": "us", "u.s.a.": "us", "united states": "us",
+    "united states of america": "us", "america": "us",
+    "uk": "gb", "u.k.": "gb", "gb": "gb", "united kingdom": "gb", "great britain": "gb", "england": "gb",
+    "canada": "ca", "mexico": "mx", "brazil": "br", "germany": "de", "france": "fr",
+    "spain": "es", "portugal": "pt", "italy": "it", "netherlands": "nl", "ireland": "ie",
+    "poland": "pl", "sweden": "se", "switzerland": "ch", "india": "in", "singapore": "sg",
+    "japan": "jp", "china": "cn", "australia": "au", "israel": "il", "uae": "ae",
+    "united arab emirates": "ae",
+}
+
+# Nicknames and common spellings resolved to a full location
+CITY_ALIASES = {
+    "nyc": ("new york", "ny", "us"),
+    "new york city": ("new york", "ny", "us"),
+    "new york": ("new york", "ny", "us"),
+    "manhattan": ("new york", "ny", "us"),
+    "brooklyn": ("new york", "ny", "us"),
+    "sf": ("san francisco", "ca", "us"),
+    "san fran": ("san francisco", "ca", "us"),
+    "bay area": ("san francisco", "ca", "us"),
+    "sf bay area": ("san francisco", "ca", "us"),
+    "la": ("los angeles", "ca", "us"),
+    "dc": ("washington", "dc", "us"),
+    "washington dc": ("washington", "dc", "us"),
+    "washington d.c.": ("washington", "dc", "us"),
+    "philly": ("philadelphia", "pa", "us"),
+    "bangalore": ("bengaluru", None, "in"),
+    "bombay": ("mumbai", None, "in"),
+}
+
+REMOTE = ("remote", None, None)
+
+
+def _clean(text: str) -> str:
+    return re.sub(r"\s+", " ", text.strip().lower()).strip(" .")
+
+
+@lru_cache(maxsize=4096)
+def normalize_location(location: Optional[str]) -> NormalizedLocation:
+    """Split a free-text location into lowercase (city, region, country).
+
+    "NYC", "New York" and "New York, NY" all become ("new york", "ny", "us").
+    Text that can't be parsed is kept whole as the city so it still matches
+    itself exactly.
+    """
+    if not location or not location.strip():
+        return (None, None, None)
+    key = _clean(location)
+    if key in ("remote", "anywhere", "worldwide"):
+        return REMOTE
+    if key in CITY_ALIASES:
+        return CITY_ALIASES[key]
+
+    parts = [_clean(part) for part in key.split(",") if _clean(part)]
+    city = region = country = None
+
+    if parts and parts[-1] in COUNTRY_ALIASES:
+        country = COUNTRY_ALIASES[parts.pop()]
+    if parts and (parts[-1] in US_STATE_CODES or parts[-1] in US_STATES) and (len(parts) > 1 or country in (None, "us")):
+        region = US_STATES.get(parts[-1], parts[-1])
+        country = country or "us"
+        parts.pop()
+    elif len(parts) > 1:
+        # "Toronto, ON": keep whatever follows the city as the region
+        region = parts.pop()
+    if parts:
+        city = " ".join(parts)
+        if city in CITY_ALIASES:
+            alias_city, alias_region, alias_country = CITY_ALIASES[city]
+            city = alias_city
+            region = region or alias_region
+            country = country or alias_country
+    return (city, region, country)
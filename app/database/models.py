@@ -1,31 +1,89 @@
-from sqlalchemy import Column, Integer, String, Float, JSON, DateTime, create_engine, ForeignKey, Text
+from sqlalchemy import Boolean, Column, Integer, String, Float, JSON, DateTime, create_engine, ForeignKey, Text, Index, bindparam, event, func, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.schema import CreateIndex
+from sqlalchemy.orm import Session, sessionmaker, relationship, validates
 from sqlalchemy.dialects.postgresql import UUID
 from datetime import datetime
+from typing import List
 import os
+import threading
 import uuid
 from dotenv import load_dotenv
 
+from .skills import normalize_skills
+from .locations import normalize_location
+
 # Load environment variables
 load_dotenv()
 
+# Worker threads available for blocking DB and LLM calls made by async routes
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", "200"))
+# Connections kept open per process. Sized from what the database can take
+# (workers x (DB_POOL_SIZE + DB_MAX_OVERFLOW) below max_connections), not from
+# THREADPOOL_SIZE: sessions give their connection back before LLM calls, so
+# each checkout lasts only as long as its queries.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+# Extra connections opened under load
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+# Seconds to wait for a free connection before failing
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+
 # Create SQLAlchemy base class
 Base = declarative_base()
 
-# Database URL from environment variable (PostgreSQL only)
-DATABASE_URL = os.getenv("DATABASE_URL")
-if not DATABASE_URL:
-    raise ValueError("DATABASE_URL environment variable is required")
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_engine():
+    """Return the process-wide engine, creating it on first use.
+
+    Nothing connects to the database (or requires DATABASE_URL) at import
+    time, so CLIs, tests and worker boots only pay for it when they query.
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                # Database URL from environment variable (PostgreSQL only)
+                database_url = os.getenv("DATABASE_URL")
+                if not database_url:
+                    raise ValueError("DATABASE_URL environment variable is required")
+                url = make_url(database_url)
+                pool_options = {}
+                # In-memory SQLite uses a single-connection pool that takes no sizing
+                if not (url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")):
+                    pool_options = {
+                        "pool_size": DB_POOL_SIZE,
+                        "max_overflow": DB_MAX_OVERFLOW,
+                        "pool_timeout": DB_POOL_TIMEOUT,
+                    }
+                # Create engine with PostgreSQL-specific configuration
+                _engine = create_engine(
+                    database_url,
+                    pool_pre_ping=True,  # Enable connection health checks
+                    pool_recycle=300,    # Recycle connections every 5 minutes
+                    echo=False,          # Set to True for SQL debugging
+                    **pool_options
+                )
+                SessionLocal.configure(bind=_engine)
+    return _engine
+
+class _LazySessionMaker(sessionmaker):
+    """sessionmaker that binds to get_engine() when the first session is made"""
+
+    def __call__(self, **local_kw):
+        get_engine()
+        return super().__call__(**local_kw)
 
-# Create engine with PostgreSQL-specific configuration
-engine = create_engine(
-    DATABASE_URL,
-    pool_pre_ping=True,  # Enable connection health checks
-    pool_recycle=300,    # Recycle connections every 5 minutes
-    echo=False           # Set to True for SQL debugging
-)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = _LazySessionMaker(autocommit=False, autoflush=False)
+
+def __getattr__(name):
+    # Keeps `from .models import engine` working without an import-time engine
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 class Candidate(Base):
     __tablename__ = "candidates"
@@ -35,6 +93,14 @@ class Candidate(Base):
     email = Column(String(255), unique=True, nullable=False)
     phone = Column(String(50))
     location = Column(String(255), nullable=False)
+    # Lowercase parts of location for indexed equality filters, see locations.normalize_location
+    location_city = Column(String(255), index=True)
+    location_region = Column(String(100), index=True)
+    location_country = Column(String(2), index=True)
+    # Set by the startup backfills on rows they visited, so rows that yield
+    # nothing (no parseable location, no skills) aren't revisited every boot
+    location_backfilled = Column(Boolean, nullable=True)
+    skills_backfilled = Column(Boolean, nullable=True)
     skills = Column(JSON, nullable=False)
     experience = Column(Text, nullable=False)  # Use Text for longer content
     education = Column(JSON)  # List of education entries
@@ -50,6 +116,31 @@ class Candidate(Base):
     # Relationships
     screenings = relationship("Screening", back_populates="candidate", cascade="all, delete-orphan")
     outreach = relationship("Outreach", back_populates="candidate", cascade="all, delete-orphan")
+    skill_links = relationship("CandidateSkill", back_populates="candidate", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        # Email lookups ignore case; rows stored before emails were lowercased may not be
+        Index("ix_candidates_email_lower", func.lower(email)),
+    )
+
+    @validates("email")
+    def _normalize_email(self, key, value):
+        return value.strip().lower() if isinstance(value, str) else value
+
+class CandidateSkill(Base):
+    """Normalized candidate-to-skill association used for indexed skill filtering"""
+    __tablename__ = "candidate_skills"
+
+    candidate_id = Column(String, ForeignKey("candidates.id", ondelete="CASCADE"), primary_key=True)
+    skill = Column(String(100), primary_key=True)  # canonical name, see skills.normalize_skill
+
+    # Relationships
+    candidate = relationship("Candidate", back_populates="skill_links")
+
+    __table_args__ = (
+        # Skill lookups go skill -> candidate ids; the PK covers the reverse
+        Index("ix_candidate_skills_skill_candidate", "skill", "candidate_id"),
+    )
 
 class Screening(Base):
     __tablename__ = "screenings"
@@ -66,6 +157,31 @@ class Screening(Base):
     # Relationships
     candidate = relationship("Candidate", back_populates="screenings")
 
+class ScreeningJob(Base):
+    """Queued screening work: question generation ("screen") or answer evaluation ("evaluate")"""
+    __tablename__ = "screening_jobs"
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    kind = Column(String(20), nullable=False)
+    status = Column(String(20), nullable=False, default="queued")  # queued, running, succeeded, failed
+    candidate_id = Column(String, ForeignKey("candidates.id", ondelete="CASCADE"), nullable=True)
+    screening_id = Column(Integer, ForeignKey("screenings.id", ondelete="CASCADE"), nullable=True)
+    payload = Column(JSON, nullable=True)  # job input, e.g. the submitted answers
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    callback_url = Column(String(500), nullable=True)  # POSTed the finished job
+    run_after = Column(DateTime, default=datetime.utcnow)  # not picked up before this (retry backoff)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        # Workers look for due queued jobs
+        Index("ix_screening_jobs_status_run_after", "status", "run_after"),
+    )
+
 class Outreach(Base):
     __tablename__ = "outreach"
 
@@ -80,14 +196,230 @@ class Outreach(Base):
     # Relationships
     candidate = relationship("Candidate", back_populates="outreach")
 
+class LLMCacheEntry(Base):
+    __tablename__ = "llm_cache_entries"
+
+    key = Column(String(64), primary_key=True)  # sha256 of the cached payload
+    namespace = Column(String(50), nullable=False, index=True)
+    model_name = Column(String(100), nullable=True)
+    prompt_version = Column(String(50), nullable=True)
+    value = Column(JSON, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class CandidateAnalysis(Base):
+    """LLM analysis of a candidate's profile, computed ahead of search.
+
+    A row is fresh when it is not dirty and was produced by the current model
+    and prompt version; see services.analysis_store.
+    """
+    __tablename__ = "candidate_analyses"
+
+    candidate_id = Column(String, ForeignKey("candidates.id", ondelete="CASCADE"), primary_key=True)
+    fingerprint = Column(String(64), nullable=False)  # content hash of the analyzed profile fields
+    model_name = Column(String(100), nullable=False)
+    prompt_version = Column(String(50), nullable=False)
+    analysis = Column(JSON, nullable=True)  # None until an analysis succeeds
+    dirty = Column(Boolean, nullable=False, default=False)  # set when the profile changes
+    attempts = Column(Integer, nullable=False, default=0)  # consecutive failed analyses
+    error = Column(Text, nullable=True)
+    # Lease taken by the refresher analyzing the row, so other processes skip it
+    claimed_until = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class CandidatePoolVersion(Base):
+    """Single-row counter bumped on every candidate write; keys the search result cache"""
+    __tablename__ = "candidate_pool_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+POOL_VERSION_ID = 1
+
+def bump_pool_version(connection) -> None:
+    """Invalidate cached search results; call after candidates are written outside the ORM"""
+    table = CandidatePoolVersion.__table__
+    result = connection.execute(
+        table.update().where(table.c.id == POOL_VERSION_ID).values(version=table.c.version + 1)
+    )
+    if result.rowcount == 0:
+        connection.execute(table.insert().values(id=POOL_VERSION_ID, version=1))
+
+def get_pool_version(db: Session) -> int:
+    version = db.query(CandidatePoolVersion.version).filter(CandidatePoolVersion.id == POOL_VERSION_ID).scalar()
+    return version or 0
+
+def sync_skill_links(candidate: Candidate) -> None:
+    """Make candidate.skill_links match the canonical form of candidate.skills"""
+    wanted = normalize_skills(candidate.skills)
+    current = {link.skill: link for link in candidate.skill_links}
+    for name, link in current.items():
+        if name not in wanted:
+            candidate.skill_links.remove(link)
+    for name in wanted:
+        if name not in current:
+            candidate.skill_links.append(CandidateSkill(skill=name))
+
+def sync_location_fields(candidate: Candidate) -> None:
+    """Derive the normalized location columns from candidate.location"""
+    candidate.location_city, candidate.location_region, candidate.location_country = normalize_location(candidate.location)
+
+# Keep derived skill and location data in sync with candidate writes made through the ORM
+@event.listens_for(Session, "before_flush")
+def _sync_candidate_derived_fields(session, flush_context, instances):
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, Candidate):
+            continue
+        is_new = obj in session.new
+        attrs = inspect(obj).attrs
+        if is_new or attrs.skills.history.has_changes():
+            sync_skill_links(obj)
+        if is_new or attrs.location.history.has_changes():
+            sync_location_fields(obj)
+
+# Any candidate insert, profile change or delete makes cached search results stale
+@event.listens_for(Session, "after_flush")
+def _bump_pool_version_on_candidate_write(session, flush_context):
+    changed = any(isinstance(obj, Candidate) for obj in session.new) or any(
+        isinstance(obj, Candidate) for obj in session.deleted
+    ) or any(
+        isinstance(obj, Candidate) and session.is_modified(obj) for obj in session.dirty
+    )
+    if changed:
+        bump_pool_version(session.connection())
+
+def backfill_skill_links(db: Session, batch_size: int = 1000) -> int:
+    """Populate candidate_skills for candidates written before it existed"""
+    linked = db.query(CandidateSkill.candidate_id).distinct()
+    missing = db.query(Candidate.id, Candidate.skills).filter(
+        Candidate.id.notin_(linked),
+        Candidate.skills_backfilled.is_(None)
+    )
+    visited = []
+    rows = []
+    for candidate_id, skills in missing.yield_per(batch_size):
+        visited.append(candidate_id)
+        rows.extend({"candidate_id": candidate_id, "skill": name} for name in normalize_skills(skills))
+    if not visited:
+        return 0
+    if rows:
+        db.execute(CandidateSkill.__table__.insert(), rows)
+        bump_pool_version(db.connection())
+    _mark_backfilled(db, Candidate.skills_backfilled, visited, batch_size)
+    db.commit()
+    return len(rows)
+
+def backfill_location_fields(db: Session, batch_size: int = 1000) -> int:
+    """Populate the normalized location columns for candidates written before they existed"""
+    missing = db.query(Candidate.id, Candidate.location).filter(
+        Candidate.location_city.is_(None),
+        Candidate.location_region.is_(None),
+        Candidate.location_country.is_(None),
+        Candidate.location_backfilled.is_(None),
+        Candidate.location.isnot(None),
+        Candidate.location != ""
+    )
+    visited = []
+    rows = []
+    for candidate_id, location in missing.yield_per(batch_size):
+        visited.append(candidate_id)
+        city, region, country = normalize_location(location)
+        if city or region or country:
+            rows.append({"b_id": candidate_id, "city": city, "region": region, "country": country})
+    if not visited:
+        return 0
+    if rows:
+        table = Candidate.__table__
+        db.execute(
+            table.update()
+            .where(table.c.id == bindparam("b_id"))
+            .values(location_city=bindparam("city"), location_region=bindparam("region"), location_country=bindparam("country")),
+            rows
+        )
+        bump_pool_version(db.connection())
+    _mark_backfilled(db, Candidate.location_backfilled, visited, batch_size)
+    db.commit()
+    return len(rows)
+
+def _mark_backfilled(db: Session, column, candidate_ids: List[str], batch_size: int) -> None:
+    # A plain flag write; no candidate data changed, so the pool version stays
+    table = Candidate.__table__
+    for start in range(0, len(candidate_ids), batch_size):
+        db.execute(
+            table.update()
+            .where(table.c.id.in_(candidate_ids[start:start + batch_size]))
+            # Keep updated_at: the row's data didn't change
+            .values({column.key: True, "updated_at": table.c.updated_at})
+        )
+
 # Create all tables
 def init_db():
-    """Initialize database tables"""
+    """Initialize database tables and add columns missing from existing ones"""
+    engine = get_engine()
     Base.metadata.create_all(bind=engine)
+    migrate_schema(engine)
+
+def migrate_schema(engine) -> List[str]:
+    """Add model columns that existing tables predate.
+
+    create_all only creates missing tables, so a database made before a
+    column was added (location_city, say) would fail every query touching
+    it. Nullable columns are added in place and missing indexes created;
+    any other missing column raises so it gets a hand-written migration.
+    Every worker runs this at startup, so a column or index that another
+    process adds first is skipped rather than failing the boot.
+    Returns the "table.column" names that were added.
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    added = []
+    with engine.begin() as conn:
+        preparer = conn.dialect.identifier_preparer
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            present = {column["name"] for column in inspector.get_columns(table.name)}
+            missing = [column for column in table.columns if column.name not in present]
+            for column in missing:
+                if column.primary_key or not column.nullable:
+                    raise RuntimeError(
+                        f"Column {table.name}.{column.name} is missing and cannot be added automatically"
+                    )
+                ddl = text(
+                    f"ALTER TABLE {preparer.format_table(table)} "
+                    f"ADD COLUMN {preparer.format_column(column)} {column.type.compile(dialect=conn.dialect)}"
+                )
+                if _run_unless_done(
+                    conn, lambda: conn.execute(ddl),
+                    lambda: column.name in {c["name"] for c in inspect(conn).get_columns(table.name)}
+                ):
+                    added.append(f"{table.name}.{column.name}")
+            for index in table.indexes:
+                # IF NOT EXISTS rather than checkfirst: SQLite can't reflect
+                # expression indexes such as ix_candidates_email_lower
+                _run_unless_done(
+                    conn, lambda: conn.execute(CreateIndex(index, if_not_exists=True)),
+                    lambda: inspect(conn).has_index(table.name, index.name)
+                )
+    return added
+
+def _run_unless_done(conn, ddl, done) -> bool:
+    """Run ddl in a savepoint; if it fails because another process got there first, skip it.
+
+    Returns whether this call made the change.
+    """
+    try:
+        with conn.begin_nested():
+            ddl()
+        return True
+    except DBAPIError:
+        if done():
+            return False
+        raise
 
 # Drop and recreate all tables (use with caution!)
 def reset_db():
     """Drop and recreate all tables - USE WITH CAUTION!"""
+    engine = get_engine()
     Base.metadata.drop_all(bind=engine)
     Base.metadata.create_all(bind=engine)
 
@@ -110,7 +442,10 @@ def init_sample_data():
 
 # Initialize database and sample data only if tables don't exist
 def setup_database():
-    """Setup database - creates tables and adds sample data if needed"""
+    """Setup database - creates tables and adds sample data if needed.
+
+    Run once per process from the app's lifespan (or a CLI), never on import.
+    """
     init_db()
     
     # Check if we need to add sample data
@@ -119,8 +454,8 @@ def setup_database():
         candidate_count = db.query(Candidate).count()
         if candidate_count == 0:
             init_sample_data()
+        else:
+            backfill_skill_links(db)
+            backfill_location_fields(db)
     finally:
-        db.close()
-
-# Call setup on import
-setup_database() 
\ No newline at end of file
+        db.close() 
\ No newline at end of file
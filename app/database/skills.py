@@ -0,0 +1,53 @@
+from functools import lru_cache
+from typing import Iterable, List
+import re
+
+# Alternate spellings mapped to the canonical skill name stored in candidate_skills
+SKILL_ALIASES = {
+    "js": "javascript",
+    "ecmascript": "javascript",
+    "ts": "typescript",
+    "py": "python",
+    "python3": "python",
+    "golang": "go",
+    "node": "node.js",
+    "nodejs": "node.js",
+    "react.js": "react",
+    "reactjs": "react",
+    "vue.js": "vue",
+    "vuejs": "vue",
+    "angular.js": "angular",
+    "angularjs": "angular",
+    "k8s": "kubernetes",
+    "postgres": "postgresql",
+    "psql": "postgresql",
+    "mongo": "mongodb",
+    "amazon web services": "aws",
+    "gcp": "google cloud",
+    "google cloud platform": "google cloud",
+    "ml": "machine learning",
+    "c sharp": "c#",
+    "csharp": "c#",
+    "cpp": "c++",
+    "springboot": "spring boot",
+}
+
+
+# Skill names repeat heavily across candidates; bulk imports and ranking hit this per skill
+@lru_cache(maxsize=8192)
+def normalize_skill(skill: str) -> str:
+    """Canonical form of a skill name: lowercased, whitespace collapsed, aliases resolved"""
+    key = re.sub(r"\s+", " ", str(skill).strip().lower())
+    return SKILL_ALIASES.get(key, key)
+
+
+def normalize_skills(skills: Iterable[str]) -> List[str]:
+    """Distinct canonical skill names, in first-seen order"""
+    seen = []
+    for skill in skills or []:
+        if not isinstance(skill, str):
+            continue
+        name = normalize_skill(skill)
+        if name and name not in seen:
+            seen.append(name)
+    return seen
@@ -0,0 +1,172 @@
+from typing import Any, Dict, List, NamedTuple, Optional, Type
+import hashlib
+import json
+import os
+import time
+
+from pydantic import BaseModel, ValidationError
+
+from ..metrics import LLM_CALL_SECONDS, LLM_CALLS_IN_FLIGHT, LLM_MALFORMED, LLM_TOKENS, add_request_timing
+from .errors import LLMOutputError
+from .prompts import (
+    ANALYSIS_PROMPT_VERSION, Prompt, analysis_prompt, batch_analysis_prompt, estimate_tokens, evaluation_prompt, screening_questions_prompt
+)
+from .resilience import ResiliencePolicy, get_policy
+from .singleflight import SingleFlight
+from .usage import token_usage
+
+# Shared by every client; keys include the model, so backends never collide
+llm_singleflight = SingleFlight()
+
+# Extra attempts when a response doesn't validate against its schema
+LLM_OUTPUT_RETRIES = int(os.getenv("LLM_OUTPUT_RETRIES", "1"))
+
+
+class Completion(NamedTuple):
+    """Provider output plus the token counts it reported (or estimates)"""
+    text: str
+    input_tokens: int
+    output_tokens: int
+
+
+class BaseLLMClient:
+    """Behaviour shared by all LLM backends.
+
+    Subclasses implement _generate for their provider, constraining output
+    to response_schema when one is given, and raise the errors in .errors.
+    generate_response wraps them so identical concurrent prompts reach the
+    provider only once, and every upstream call goes through the
+    provider's rate limiter, retries and circuit breaker.
+    """
+
+    provider: str = ""
+    model_name: str = ""
+    # Part of analysis cache keys; every client builds the same prompts
+    ANALYSIS_PROMPT_VERSION = ANALYSIS_PROMPT_VERSION
+
+    @property
+    def policy(self) -> ResiliencePolicy:
+        return get_policy(self.provider)
+
+    def is_available(self) -> bool:
+        """False while the provider's circuit breaker is open"""
+        return self.policy.breaker.available()
+
+    def estimate_tokens(self, prompt: str, system_prompt: str = None, max_output_tokens: int = None) -> int:
+        """Rough size of a call for the tokens/min limiter, output included"""
+        return estimate_tokens(prompt) + estimate_tokens(system_prompt or "") + (max_output_tokens or 0)
+
+    def _generate(
+        self, prompt: str, system_prompt: str = None, max_output_tokens: int = None,
+        response_schema: Optional[Type[BaseModel]] = None
+    ) -> Completion:
+        raise NotImplementedError
+
+    def _generation_params(self) -> Dict[str, Any]:
+        """Settings that change the output for a given prompt"""
+        return {}
+
+    def prompt_fingerprint(
+        self, prompt: str, system_prompt: str = None, max_output_tokens: int = None,
+        response_schema: Optional[Type[BaseModel]] = None
+    ) -> str:
+        schema_name = response_schema.__name__ if response_schema else None
+        payload = json.dumps(
+            [self.model_name, system_prompt, prompt, max_output_tokens, schema_name, self._generation_params()],
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def generate_response(
+        self, prompt: str, system_prompt: str = None, task: str = "generic", max_output_tokens: int = None,
+        response_schema: Optional[Type[BaseModel]] = None
+    ) -> str:
+        """Generate a response, sharing one upstream call among identical concurrent prompts"""
+        key = self.prompt_fingerprint(prompt, system_prompt, max_output_tokens, response_schema)
+        tokens = self.estimate_tokens(prompt, system_prompt, max_output_tokens)
+
+        def call() -> str:
+            start = self._call_started()
+            outcome = "error"
+            try:
+                completion = self.policy.call(
+                    lambda: self._generate(prompt, system_prompt, max_output_tokens, response_schema),
+                    tokens=tokens
+                )
+                outcome = "ok"
+            finally:
+                self._call_finished(task, start, outcome)
+            self._record_usage(task, completion)
+            return completion.text
+
+        return llm_singleflight.do(key, call)
+
+    def _call_started(self) -> float:
+        LLM_CALLS_IN_FLIGHT.labels(self.provider).inc()
+        return time.perf_counter()
+
+    def _call_finished(self, task: str, start: float, outcome: str) -> None:
+        elapsed = time.perf_counter() - start
+        LLM_CALLS_IN_FLIGHT.labels(self.provider).dec()
+        LLM_CALL_SECONDS.labels(self.provider, task, outcome).observe(elapsed)
+        add_request_timing(f"llm_{task}", elapsed)
+
+    def _record_usage(self, task: str, completion: Completion) -> None:
+        token_usage.record(task, completion.input_tokens, completion.output_tokens)
+        LLM_TOKENS.labels(self.provider, task, "input").inc(completion.input_tokens)
+        LLM_TOKENS.labels(self.provider, task, "output").inc(completion.output_tokens)
+
+    def _record_malformed(self, task: str) -> None:
+        token_usage.record_malformed(task)
+        LLM_MALFORMED.labels(self.provider, task).inc()
+
+    def generate(self, request: Prompt) -> str:
+        """generate_response for a prompt built by .prompts"""
+        return self.generate_response(
+            request.prompt, request.system_prompt, request.task, request.max_output_tokens, request.schema
+        )
+
+    def generate_structured(self, request: Prompt) -> BaseModel:
+        """Generate and validate against request.schema in one pass.
+
+        A response that doesn't validate is counted and retried up to
+        LLM_OUTPUT_RETRIES times, then raises LLMOutputError; there is no
+        made-up fallback value.
+        """
+        for _ in range(LLM_OUTPUT_RETRIES + 1):
+            text = self.generate(request)
+            try:
+                return request.schema.model_validate_json(text)
+            except ValidationError as e:
+                self._record_malformed(request.task)
+                error = e
+        raise LLMOutputError(f"Malformed {request.task} response: {error.error_count()} validation error(s)")
+
+    def analyze_candidate(self, candidate_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Analyze candidate data and extract relevant information"""
+        return self.generate_structured(analysis_prompt(candidate_data)).model_dump()
+
+    def analyze_candidates(self, candidates: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Analyze several candidates in one prompt.
+
+        Each candidate dict must carry an "id". Returns analyses keyed by id;
+        candidates missing from the response are left out so the caller can
+        fall back to analyze_candidate for them.
+        """
+        batch = self.generate_structured(batch_analysis_prompt(candidates))
+        wanted = {str(candidate["id"]) for candidate in candidates}
+        return {
+            item.id: item.model_dump(exclude={"id"})
+            for item in batch.analyses
+            if item.id in wanted
+        }
+
+    def generate_screening_questions(self, candidate_data: Dict[str, Any]) -> List[str]:
+        """Generate relevant screening questions for a candidate"""
+        questions = self.generate_structured(screening_questions_prompt(candidate_data)).questions
+        return [question.strip() for question in questions if question.strip()][:5]
+
+    def evaluate_screening_answers(self, questions: List[str], answers: List[str]) -> Dict[str, Any]:
+        """Evaluate screening answers and provide feedback"""
+        return self.generate_structured(evaluation_prompt(questions, answers)).model_dump()
@@ -0,0 +1,372 @@
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from ..database.models import LLMCacheEntry, SessionLocal
+
+# Seconds between deletes of expired llm_cache_entries rows, per cache and process
+LLM_CACHE_PRUNE_INTERVAL = float(os.getenv("LLM_CACHE_PRUNE_INTERVAL", "3600"))
+
+
+def content_hash(*parts: Any) -> str:
+    """Stable sha256 over JSON-serializable parts"""
+    payload = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# Abbreviations recruiters use interchangeably with the full word
+QUERY_TOKEN_ALIASES = {
+    "dev": "developer",
+    "devs": "developer",
+    "developers": "developer",
+    "eng": "engineer",
+    "engineers": "engineer",
+    "sr": "senior",
+    "snr": "senior",
+    "jr": "junior",
+    "mgr": "manager",
+    "yrs": "years",
+    "yr": "years",
+}
+
+
+# Words whose meaning depends on the token after them ("not java", "over 5");
+# each stays bound to that token when the rest of the query is reordered
+QUERY_BINDING_TOKENS = {
+    "not", "no", "non", "without", "except", "excluding", "but",
+    "over", "under", "than", "least", "most", "max", "min", "before", "after",
+}
+
+
+def normalize_query(query: str) -> str:
+    """Canonical form of a search query for cache keys.
+
+    Case, punctuation, repeated whitespace, common abbreviations and token
+    order are ignored, so "Senior Python developer, NYC" and
+    "senior python dev NYC" normalize to the same key. Negations and
+    comparisons keep the token they apply to, so "python not java" and
+    "java not python" differ, and repeated tokens are kept.
+    """
+    tokens = [QUERY_TOKEN_ALIASES.get(token, token) for token in re.findall(r"[a-z0-9+#]+", query.lower())]
+    units = []
+    prefix = []
+    for token in tokens:
+        prefix.append(token)
+        if token not in QUERY_BINDING_TOKENS:
+            units.append(" ".join(prefix))
+            prefix = []
+    if prefix:
+        units.append(" ".join(prefix))
+    return " | ".join(sorted(units))
+
+
+def _upsert(dialect_name: str):
+    if dialect_name == "postgresql":
+        insert = postgresql.insert
+    elif dialect_name == "sqlite":
+        insert = sqlite.insert
+    else:
+        raise ValueError(f"Bulk cache writes are not supported on {dialect_name}")
+    return insert(LLMCacheEntry.__table__)
+
+
+class LRUCache:
+    """Thread-safe in-process LRU with a size cap and per-entry TTL"""
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 3600):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            value, expires_at = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.evictions += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """Store value; ttl_seconds overrides the cache's TTL for this entry"""
+        ttl = self.ttl_seconds if ttl_seconds is None else min(ttl_seconds, self.ttl_seconds)
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class PersistentCache:
+    """Two-tier cache: in-process LRU backed by the llm_cache_entries table.
+
+    The database tier lets cached LLM results survive restarts and be shared
+    between uvicorn workers. Entries live in a namespace so several kinds of
+    LLM output can share the table. Expired rows of the namespace are
+    deleted by the first write after each LLM_CACHE_PRUNE_INTERVAL.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        max_size: int = 1024,
+        ttl_seconds: float = 3600,
+        session_factory: Callable[[], Session] = SessionLocal,
+        persist: bool = True,
+    ):
+        self.namespace = namespace
+        self.memory = LRUCache(max_size=max_size, ttl_seconds=ttl_seconds)
+        self.session_factory = session_factory
+        self.persist = persist
+        self.db_hits = 0
+        self.db_misses = 0
+        self.pruned = 0
+        self._lock = threading.Lock()
+        self._next_prune = time.monotonic() + LLM_CACHE_PRUNE_INTERVAL
+
+    def _count(self, hits: int, misses: int) -> None:
+        with self._lock:
+            self.db_hits += hits
+            self.db_misses += misses
+
+    def _remember(self, entry: LLMCacheEntry, now: datetime) -> None:
+        # Keep the row's remaining lifetime so the entry expires on schedule
+        remaining = self.memory.ttl_seconds - (now - entry.created_at).total_seconds()
+        self.memory.set(entry.key, entry.value, ttl_seconds=remaining)
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.memory.get(key)
+        if value is not None or not self.persist:
+            return value
+
+        db = self.session_factory()
+        try:
+            entry = db.get(LLMCacheEntry, key)
+            now = datetime.utcnow()
+            cutoff = now - timedelta(seconds=self.memory.ttl_seconds)
+            if entry is None or entry.namespace != self.namespace or entry.created_at < cutoff:
+                self._count(0, 1)
+                return None
+            self._count(1, 0)
+            self._remember(entry, now)
+            return entry.value
+        finally:
+            db.close()
+
+    def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """Look up several keys with at most one database round-trip"""
+        found = {}
+        missing = []
+        for key in keys:
+            value = self.memory.get(key)
+            if value is not None:
+                found[key] = value
+            else:
+                missing.append(key)
+        if not missing or not self.persist:
+            return found
+
+        db = self.session_factory()
+        try:
+            now = datetime.utcnow()
+            cutoff = now - timedelta(seconds=self.memory.ttl_seconds)
+            entries = db.query(LLMCacheEntry).filter(
+                LLMCacheEntry.key.in_(missing),
+                LLMCacheEntry.namespace == self.namespace,
+                LLMCacheEntry.created_at >= cutoff
+            ).all()
+            for entry in entries:
+                found[entry.key] = entry.value
+                self._remember(entry, now)
+            self._count(len(entries), len(missing) - len(entries))
+            return found
+        finally:
+            db.close()
+
+    def set(self, key: str, value: Any, **attrs: Any) -> None:
+        self.memory.set(key, value)
+        if not self.persist:
+            return
+
+        db = self.session_factory()
+        try:
+            db.merge(LLMCacheEntry(
+                key=key,
+                namespace=self.namespace,
+                value=value,
+                created_at=datetime.utcnow(),
+                **attrs
+            ))
+            db.commit()
+            if self._prune_due():
+                self.prune(db)
+        except Exception:
+            # The in-memory tier still holds the value; a failed write only
+            # costs us sharing it with other workers.
+            db.rollback()
+        finally:
+            db.close()
+
+    def set_many(self, entries: Dict[str, Any], **attrs: Any) -> None:
+        """Store several key/value pairs in one upsert; attrs apply to every row"""
+        for key, value in entries.items():
+            self.memory.set(key, value)
+        if not entries or not self.persist:
+            return
+
+        db = self.session_factory()
+        try:
+            created_at = datetime.utcnow()
+            stmt = _upsert(db.get_bind().dialect.name)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["key"],
+                set_={column: stmt.excluded[column] for column in ("namespace", "value", "created_at", *attrs)}
+            )
+            db.execute(stmt, [
+                {"key": key, "namespace": self.namespace, "value": value, "created_at": created_at, **attrs}
+                for key, value in entries.items()
+            ])
+            db.commit()
+            if self._prune_due():
+                self.prune(db)
+        except Exception:
+            # As in set: the in-memory tier still has the values
+            db.rollback()
+        finally:
+            db.close()
+
+    def _prune_due(self) -> bool:
+        with self._lock:
+            if time.monotonic() < self._next_prune:
+                return False
+            self._next_prune = time.monotonic() + LLM_CACHE_PRUNE_INTERVAL
+            return True
+
+    def prune(self, db: Optional[Session] = None) -> int:
+        """Delete this namespace's expired rows; returns the number deleted"""
+        own_session = db is None
+        if own_session:
+            db = self.session_factory()
+        try:
+            cutoff = datetime.utcnow() - timedelta(seconds=self.memory.ttl_seconds)
+            deleted = db.query(LLMCacheEntry).filter(
+                LLMCacheEntry.namespace == self.namespace,
+                LLMCacheEntry.created_at < cutoff
+            ).delete(synchronize_session=False)
+            db.commit()
+            with self._lock:
+                self.pruned += deleted
+            return deleted
+        finally:
+            if own_session:
+                db.close()
+
+    def stats(self) -> Dict[str, int]:
+        stats = self.memory.stats()
+        with self._lock:
+            stats["db_hits"] = self.db_hits
+            stats["db_misses"] = self.db_misses
+            stats["db_pruned"] = self.pruned
+        return stats
+
+
+class AnalysisCache(PersistentCache):
+    """Cache for analyze_candidate results keyed by payload, prompt version and model"""
+
+    def __init__(self, **kwargs: Any):
+        kwargs.setdefault("max_size", int(os.getenv("ANALYSIS_CACHE_SIZE", "10000")))
+        kwargs.setdefault("ttl_seconds", float(os.getenv("ANALYSIS_CACHE_TTL", str(7 * 24 * 3600))))
+        kwargs.setdefault("persist", os.getenv("ANALYSIS_CACHE_PERSIST", "true").lower() == "true")
+        super().__init__("analysis", **kwargs)
+
+    @staticmethod
+    def make_key(candidate_data: Dict[str, Any], prompt_version: str, model_name: str) -> str:
+        return content_hash("analysis", candidate_data, prompt_version, model_name)
+
+    def get_analysis(self, candidate_data: Dict[str, Any], prompt_version: str, model_name: str) -> Optional[Dict[str, Any]]:
+        return self.get(self.make_key(candidate_data, prompt_version, model_name))
+
+    def set_analysis(self, candidate_data: Dict[str, Any], prompt_version: str, model_name: str, analysis: Dict[str, Any]) -> None:
+        self.set(
+            self.make_key(candidate_data, prompt_version, model_name),
+            analysis,
+            model_name=model_name,
+            prompt_version=prompt_version
+        )
+
+    def set_analyses(
+        self, analyses: List[Tuple[Dict[str, Any], Dict[str, Any]]], prompt_version: str, model_name: str
+    ) -> None:
+        """Store (candidate_data, analysis) pairs with one database write"""
+        self.set_many(
+            {self.make_key(candidate_data, prompt_version, model_name): analysis for candidate_data, analysis in analyses},
+            model_name=model_name,
+            prompt_version=prompt_version
+        )
+
+
+class QueryParseCache(PersistentCache):
+    """Cache for parsed search criteria keyed by the normalized query"""
+
+    def __init__(self, **kwargs: Any):
+        kwargs.setdefault("max_size", int(os.getenv("QUERY_CACHE_SIZE", "5000")))
+        kwargs.setdefault("ttl_seconds", float(os.getenv("QUERY_CACHE_TTL", str(24 * 3600))))
+        kwargs.setdefault("persist", os.getenv("QUERY_CACHE_PERSIST", "true").lower() == "true")
+        super().__init__("query_parse", **kwargs)
+
+    @staticmethod
+    def make_key(query: str, prompt_version: str, model_name: str) -> str:
+        return content_hash("query_parse", normalize_query(query), prompt_version, model_name)
+
+    def get_criteria(self, query: str, prompt_version: str, model_name: str) -> Optional[Dict[str, Any]]:
+        return self.get(self.make_key(query, prompt_version, model_name))
+
+    def set_criteria(self, query: str, prompt_version: str, model_name: str, criteria: Dict[str, Any]) -> None:
+        self.set(
+            self.make_key(query, prompt_version, model_name),
+            criteria,
+            model_name=model_name,
+            prompt_version=prompt_version
+        )
+
+
+# Shared across requests; CandidateService is created per request
+analysis_cache = AnalysisCache()
+query_parse_cache = QueryParseCache()
@@ -0,0 +1,18 @@
+class LLMError(Exception):
+    """An LLM backend call failed"""
+
+
+class LLMRetryableError(LLMError):
+    """A transient failure (timeout, connection reset, 5xx) worth retrying"""
+
+
+class LLMRateLimitError(LLMRetryableError):
+    """The provider throttled us (HTTP 429 / quota exhausted)"""
+
+
+class LLMUnavailableError(LLMError):
+    """The circuit breaker is open; the backend is failing and isn't being called"""
+
+
+class LLMOutputError(LLMError):
+    """The backend answered, but not with JSON matching the requested schema"""
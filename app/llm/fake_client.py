@@ -0,0 +1,134 @@
+import hashlib
+import json
+import os
+import random
+import re
+import time
+from typing import Any, Dict, List, Optional, Type
+
+from pydantic import BaseModel
+
+from .base import BaseLLMClient, Completion
+from .errors import LLMRateLimitError, LLMRetryableError
+from .prompts import estimate_tokens
+
+# Simulated backend behaviour, for load tests and local runs without a provider
+FAKE_LLM_LATENCY = float(os.getenv("FAKE_LLM_LATENCY", "0.2"))
+FAKE_LLM_JITTER = float(os.getenv("FAKE_LLM_JITTER", "0.1"))
+FAKE_LLM_ERROR_RATE = float(os.getenv("FAKE_LLM_ERROR_RATE", "0"))
+FAKE_LLM_RATE_LIMIT_RATE = float(os.getenv("FAKE_LLM_RATE_LIMIT_RATE", "0"))
+
+LEVELS = ["Junior", "Mid", "Senior", "Lead"]
+
+
+def _stable_int(value: Any, modulo: int) -> int:
+    digest = hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    return int(digest[:8], 16) % modulo
+
+
+class FakeLLMClient(BaseLLMClient):
+    """Deterministic stand-in for a real provider.
+
+    Answers are derived from the prompts built by .prompts, so repeated
+    calls agree; latency and failures are injected from the FAKE_LLM_*
+    settings so the rate limiter, retries and circuit breaker can be exercised.
+    """
+
+    provider = "fake"
+
+    def __init__(self, model: str = None):
+        self.model_name = model or "fake"
+        self.latency = FAKE_LLM_LATENCY
+        self.jitter = FAKE_LLM_JITTER
+        self.error_rate = FAKE_LLM_ERROR_RATE
+        self.rate_limit_rate = FAKE_LLM_RATE_LIMIT_RATE
+
+    def _delay(self) -> float:
+        return max(0.0, self.latency + random.uniform(-self.jitter, self.jitter))
+
+    def _maybe_fail(self) -> None:
+        roll = random.random()
+        if roll < self.rate_limit_rate:
+            raise LLMRateLimitError("Fake LLM: rate limited")
+        if roll < self.rate_limit_rate + self.error_rate:
+            raise LLMRetryableError("Fake LLM: simulated server error")
+
+    def _generate(
+        self, prompt: str, system_prompt: str = None, max_output_tokens: int = None,
+        response_schema: Optional[Type[BaseModel]] = None
+    ) -> Completion:
+        time.sleep(self._delay())
+        self._maybe_fail()
+        return self._completion(prompt, system_prompt)
+
+    def _completion(self, prompt: str, system_prompt: str = None) -> Completion:
+        text = self.respond(prompt)
+        return Completion(text, estimate_tokens(prompt) + estimate_tokens(system_prompt or ""), estimate_tokens(text))
+
+    @classmethod
+    def respond(cls, prompt: str) -> str:
+        """Canned output for each prompt built by .prompts"""
+        head, _, _ = prompt.partition("\n")
+        label, _, body = head.partition(": ")
+        try:
+            data = json.loads(body)
+        except json.JSONDecodeError:
+            return "{}"
+        if label == "Candidates":
+            return json.dumps({"analyses": [{"id": c.get("id"), **cls._analysis(c)} for c in data]})
+        if label == "Candidate" and "screening questions" in prompt:
+            return json.dumps({"questions": cls._questions(data)})
+        if label == "Candidate":
+            return json.dumps(cls._analysis(data))
+        if label == "Interview":
+            return json.dumps(cls._evaluation([pair["a"] for pair in data]))
+        if label == "Parse the following recruitment query":
+            return json.dumps(cls._criteria(data))
+        return "{}"
+
+    @staticmethod
+    def _analysis(candidate: Dict[str, Any]) -> Dict[str, Any]:
+        payload = {k: v for k, v in candidate.items() if k != "id"}
+        return {
+            "skills": list(candidate.get("skills") or [])[:10],
+            "experience_level": LEVELS[_stable_int(candidate.get("experience"), len(LEVELS))],
+            "location": candidate.get("location") or "Remote",
+            "availability": "Available",
+            "fit_score": 40 + _stable_int(payload, 61),
+            "summary": f"{candidate.get('name', 'Candidate')}: {str(candidate.get('experience', ''))[:120]}"
+        }
+
+    @staticmethod
+    def _questions(candidate: Dict[str, Any]) -> List[str]:
+        skills = list(candidate.get("skills") or []) or ["your main stack"]
+        return [
+            f"Describe a production system you built with {skills[i % len(skills)]} and the trade-offs you made."
+            for i in range(5)
+        ]
+
+    @staticmethod
+    def _evaluation(answers: List[str]) -> Dict[str, Any]:
+        scores = [min(100, 30 + len(answer.split()) * 2) for answer in answers]
+        overall = round(sum(scores) / len(scores)) if scores else 0
+        return {
+            "overall_score": overall,
+            "individual_scores": scores,
+            "strengths": ["Clear communication"] if overall >= 60 else [],
+            "weaknesses": [] if overall >= 60 else ["Answers lack detail"],
+            "recommendation": "Hire" if overall >= 80 else "Maybe" if overall >= 60 else "Pass",
+            "feedback": f"Average answer score {overall}."
+        }
+
+    @staticmethod
+    def _criteria(query: str) -> Dict[str, Any]:
+        lowered = query.lower()
+        level = next((lvl for lvl in LEVELS if lvl.lower() in lowered), "")
+        location = re.search(r'\bin ([A-Za-z ]+?)(?:\s+(?:with|who|for)\b|$)', query)
+        skills = re.findall(r'\b(python|java|javascript|react|node\.js|aws|docker|kubernetes|go|rust|sql)\b', lowered)
+        return {
+            "required_skills": sorted(set(skills)),
+            "experience_level": level,
+            "location": location.group(1).strip() if location else "",
+            "employment_type": "Full-time",
+            "domain": ""
+        }
@@ -1,28 +1,62 @@
 import requests
-import json
-from typing import Dict, List, Any
+from typing import Dict, Any, Optional, Type
 import os
+from pydantic import BaseModel
 
-class OllamaClient:
-    def __init__(self):
-        self.base_url = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
-        self.model = "llama2"  # Default model, can be changed based on requirements
+from .base import BaseLLMClient, Completion
+from .errors import LLMError, LLMRateLimitError, LLMRetryableError
+from .prompts import estimate_tokens
+
+def _classify_status(status: int, message: str) -> LLMError:
+    if status == 429:
+        return LLMRateLimitError(message)
+    if status >= 500:
+        return LLMRetryableError(message)
+    return LLMError(message)
+
+class OllamaClient(BaseLLMClient):
+    provider = "ollama"
+
+    def __init__(self, model: str = None, base_url: str = None):
+        self.base_url = base_url or os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+        self.model = model or os.getenv("OLLAMA_MODEL", "llama2")  # Default model, can be changed based on requirements
+        self.model_name = self.model
+
+        # (connect, read) timeouts in seconds; generation can legitimately take a while
+        self.timeout = (
+            float(os.getenv("LLM_CONNECT_TIMEOUT", "5")),
+            float(os.getenv("LLM_READ_TIMEOUT", "120"))
+        )
+        self.pool_size = int(os.getenv("LLM_POOL_SIZE", "32"))
+
+        # Keep-alive connection pool shared by every thread using this client
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"Content-Type": "application/json"})
 
     def _make_request(self, endpoint: str, data: Dict[str, Any]) -> Dict[str, Any]:
         """Make a request to the Ollama API"""
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/{endpoint}",
                 json=data,
-                headers={"Content-Type": "application/json"}
+                timeout=self.timeout
             )
             response.raise_for_status()
             return response.json()
+        except requests.exceptions.HTTPError as e:
+            raise _classify_status(e.response.status_code, f"Error communicating with Ollama: {str(e)}") from e
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            raise LLMRetryableError(f"Error communicating with Ollama: {str(e)}") from e
         except requests.exceptions.RequestException as e:
-            raise Exception(f"Error communicating with Ollama: {str(e)}")
+            raise LLMError(f"Error communicating with Ollama: {str(e)}") from e
 
-    def generate_response(self, prompt: str, system_prompt: str = None) -> str:
-        """Generate a response from the LLM"""
+    def _generate_payload(
+        self, prompt: str, system_prompt: str = None, max_output_tokens: int = None,
+        response_schema: Optional[Type[BaseModel]] = None
+    ) -> Dict[str, Any]:
         data = {
             "model": self.model,
             "prompt": prompt,
@@ -30,63 +64,28 @@ class OllamaClient:
         }
         if system_prompt:
             data["system"] = system_prompt
+        if max_output_tokens:
+            data["options"] = {"num_predict": max_output_tokens}
+        if response_schema is not None:
+            # JSON mode: Ollama constrains sampling to valid JSON
+            data["format"] = "json"
+        return data
 
-        response = self._make_request("api/generate", data)
-        return response.get("response", "")
-
-    def analyze_candidate(self, candidate_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Analyze candidate data and extract relevant information"""
-        prompt = f"""
-        Analyze the following candidate data and extract key information:
-        {json.dumps(candidate_data, indent=2)}
-        
-        Please provide:
-        1. Key skills and expertise
-        2. Experience level
-        3. Location preferences
-        4. Availability
-        5. Potential fit score (0-100)
-        """
+    def _completion(self, data: Dict[str, Any], response: Dict[str, Any]) -> Completion:
+        text = response.get("response", "")
+        return Completion(
+            text=text,
+            input_tokens=response.get("prompt_eval_count") or estimate_tokens(data["prompt"] + data.get("system", "")),
+            output_tokens=response.get("eval_count") or estimate_tokens(text)
+        )
 
-        system_prompt = """
-        You are an expert recruiter and talent analyst. Your task is to analyze candidate data
-        and extract relevant information for recruitment purposes. Be precise and objective in your analysis.
-        """
-
-        response = self.generate_response(prompt, system_prompt)
-        return self._parse_analysis(response)
-
-    def _parse_analysis(self, response: str) -> Dict[str, Any]:
-        """Parse the LLM response into structured data"""
-        # TODO: Implement proper parsing logic
-        # This is a placeholder implementation
-        return {
-            "skills": [],
-            "experience_level": "",
-            "location": "",
-            "availability": "",
-            "fit_score": 0
-        }
-
-    def generate_screening_questions(self, candidate_data: Dict[str, Any]) -> List[str]:
-        """Generate relevant screening questions for a candidate"""
-        prompt = f"""
-        Based on the following candidate profile, generate 5 relevant technical screening questions:
-        {json.dumps(candidate_data, indent=2)}
-        
-        Focus on their key skills and experience areas.
-        """
-
-        system_prompt = """
-        You are an expert technical interviewer. Generate relevant and challenging
-        questions that will help assess the candidate's expertise in their domain.
-        """
-
-        response = self.generate_response(prompt, system_prompt)
-        return self._parse_questions(response)
+    def _generate(
+        self, prompt: str, system_prompt: str = None, max_output_tokens: int = None,
+        response_schema: Optional[Type[BaseModel]] = None
+    ) -> Completion:
+        """Generate a response from the LLM"""
+        data = self._generate_payload(prompt, system_prompt, max_output_tokens, response_schema)
+        return self._completion(data, self._make_request("api/generate", data))
 
-    def _parse_questions(self, response: str) -> List[str]:
-        """Parse the LLM response into a list of questions"""
-        # TODO: Implement proper parsing logic
-        # This is a placeholder implementation
-        return response.split("\n") 
\ No newline at end of file
+    def close(self) -> None:
+        self.session.close()
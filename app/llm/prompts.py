@@ -0,0 +1,171 @@
+from typing import Any, Dict, List, NamedTuple, Optional, Type
+import json
+import os
+
+from pydantic import BaseModel
+
+from .schemas import BatchAnalysis, CandidateAnalysis, ScreeningEvaluation, ScreeningQuestions, SearchCriteria
+
+# Input budget per candidate; long experience/education is cut to fit
+PROMPT_CANDIDATE_TOKENS = int(os.getenv("PROMPT_CANDIDATE_TOKENS", "400"))
+# Input budget per screening answer
+PROMPT_ANSWER_TOKENS = int(os.getenv("PROMPT_ANSWER_TOKENS", "300"))
+
+# Output caps per call type; a six-field analysis needs far less than 2048
+MAX_OUTPUT_TOKENS = {
+    "analysis": int(os.getenv("MAX_OUTPUT_TOKENS_ANALYSIS", "256")),
+    "questions": int(os.getenv("MAX_OUTPUT_TOKENS_QUESTIONS", "400")),
+    "evaluation": int(os.getenv("MAX_OUTPUT_TOKENS_EVALUATION", "512")),
+    "query_parse": int(os.getenv("MAX_OUTPUT_TOKENS_QUERY_PARSE", "160")),
+}
+
+# Bump whenever analysis_prompt or batch_analysis_prompt changes so cached
+# and stored analyses are redone
+ANALYSIS_PROMPT_VERSION = "3"
+# Bump whenever query_parse_prompt changes so cached parses are invalidated
+QUERY_PARSE_PROMPT_VERSION = "3"
+
+ANALYSIS_SYSTEM_PROMPT = "You are an expert recruiter. Analyze candidates objectively. Reply with JSON only."
+INTERVIEWER_SYSTEM_PROMPT = "You are an expert technical interviewer. Be fair, specific and concise. Reply with JSON only."
+QUERY_PARSE_SYSTEM_PROMPT = "You parse recruitment queries. Extract only explicitly stated requirements. Reply with JSON only."
+
+ANALYSIS_FIELDS = (
+    '"skills" (list), "experience_level" (Junior/Mid/Senior/Lead), "location", '
+    '"availability", "fit_score" (0-100), "summary" (one sentence)'
+)
+
+
+class Prompt(NamedTuple):
+    """One LLM call: the task name is used for token accounting, the schema
+    is the JSON shape the backend is constrained to and validated against"""
+    task: str
+    prompt: str
+    system_prompt: str
+    max_output_tokens: int
+    schema: Optional[Type[BaseModel]] = None
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token)"""
+    return (len(text) + 3) // 4
+
+
+def compact_json(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def truncate_text(text: str, max_tokens: int) -> str:
+    """Cut text to about max_tokens, at a word boundary where possible"""
+    max_chars = max(0, max_tokens) * 4
+    if len(text) <= max_chars:
+        return text
+    # One character is left for the ellipsis
+    cut = text[:max(0, max_chars - 1)]
+    space = cut.rfind(" ")
+    if space > max_chars // 2:
+        cut = cut[:space]
+    return cut.rstrip() + "…"
+
+
+def _fit_entries(entries: List[Any], max_tokens: int) -> List[Any]:
+    """Keep leading entries (most recent first in our data) while they fit"""
+    kept, spent = [], 0
+    for entry in entries:
+        spent += estimate_tokens(compact_json(entry))
+        if spent > max_tokens:
+            break
+        kept.append(entry)
+    return kept
+
+
+def fit_candidate(candidate: Dict[str, Any], max_tokens: int = PROMPT_CANDIDATE_TOKENS) -> Dict[str, Any]:
+    """Copy of a candidate whose free-text fields are trimmed to serialize within max_tokens"""
+    fitted = {key: value for key, value in candidate.items() if value not in (None, "", [])}
+    if estimate_tokens(compact_json(fitted)) <= max_tokens:
+        return fitted
+
+    experience = fitted.pop("experience", None)
+    education = fitted.pop("education", None)
+    remaining = max(0, max_tokens - estimate_tokens(compact_json(fitted)))
+
+    if education:
+        # Education gets at most a third; experience says more about fit
+        entries = education if isinstance(education, list) else [education]
+        education = _fit_entries(entries, remaining // 3)
+        if education:
+            fitted["education"] = education
+            remaining -= estimate_tokens('"education":,' + compact_json(education))
+    if experience:
+        # Leave room for the key and quotes around the value
+        fitted["experience"] = truncate_text(str(experience), remaining - estimate_tokens('"experience":"",'))
+    return fitted
+
+
+def analysis_prompt(candidate: Dict[str, Any]) -> Prompt:
+    return Prompt(
+        task="analysis",
+        prompt=f"Candidate: {compact_json(fit_candidate(candidate))}\nReturn a JSON object with {ANALYSIS_FIELDS}.",
+        system_prompt=ANALYSIS_SYSTEM_PROMPT,
+        max_output_tokens=MAX_OUTPUT_TOKENS["analysis"],
+        schema=CandidateAnalysis
+    )
+
+
+def batch_analysis_prompt(candidates: List[Dict[str, Any]]) -> Prompt:
+    fitted = [fit_candidate(candidate) for candidate in candidates]
+    return Prompt(
+        task="analysis_batch",
+        prompt=(
+            f"Candidates: {compact_json(fitted)}\n"
+            f'Return a JSON object with "analyses": one object per candidate with "id" (copied exactly), {ANALYSIS_FIELDS}.'
+        ),
+        system_prompt=ANALYSIS_SYSTEM_PROMPT,
+        max_output_tokens=MAX_OUTPUT_TOKENS["analysis"] * len(candidates),
+        schema=BatchAnalysis
+    )
+
+
+def screening_questions_prompt(candidate: Dict[str, Any]) -> Prompt:
+    return Prompt(
+        task="questions",
+        prompt=(
+            f"Candidate: {compact_json(fit_candidate(candidate))}\n"
+            "Write 5 challenging but fair technical screening questions on their key skills and experience. "
+            'Return a JSON object with "questions" (list of 5 strings).'
+        ),
+        system_prompt=INTERVIEWER_SYSTEM_PROMPT,
+        max_output_tokens=MAX_OUTPUT_TOKENS["questions"],
+        schema=ScreeningQuestions
+    )
+
+
+def evaluation_prompt(questions: List[str], answers: List[str]) -> Prompt:
+    pairs = [
+        {"q": question, "a": truncate_text(answer, PROMPT_ANSWER_TOKENS)}
+        for question, answer in zip(questions, answers)
+    ]
+    return Prompt(
+        task="evaluation",
+        prompt=(
+            f"Interview: {compact_json(pairs)}\n"
+            'Return a JSON object with "overall_score" (0-100), "individual_scores" (0-100 per question), '
+            '"strengths" (list), "weaknesses" (list), "recommendation" (Hire/Maybe/Pass), "feedback" (2-3 sentences).'
+        ),
+        system_prompt=INTERVIEWER_SYSTEM_PROMPT,
+        max_output_tokens=MAX_OUTPUT_TOKENS["evaluation"],
+        schema=ScreeningEvaluation
+    )
+
+
+def query_parse_prompt(query: str) -> Prompt:
+    return Prompt(
+        task="query_parse",
+        prompt=(
+            f"Parse the following recruitment query: {json.dumps(query)}\n"
+            'Return a JSON object with "required_skills" (list), "experience_level" (Junior/Mid/Senior/Lead), '
+            '"location", "employment_type" (Full-time/Contract/Part-time), "domain". Use "" or [] when not stated.'
+        ),
+        system_prompt=QUERY_PARSE_SYSTEM_PROMPT,
+        max_output_tokens=MAX_OUTPUT_TOKENS["query_parse"],
+        schema=SearchCriteria
+    )
@@ -0,0 +1,58 @@
+from typing import Any, Dict, Tuple
+import os
+import threading
+
+# Backend used when callers don't ask for one: gemini, ollama or fake
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "gemini").lower()
+# Model override for the default provider; each client has its own default
+LLM_MODEL = os.getenv("LLM_MODEL")
+
+_clients: Dict[Tuple[str, str], Any] = {}
+_lock = threading.Lock()
+
+
+def _create_client(provider: str, model: str = None):
+    # Imported lazily so only the configured backend's SDK is loaded
+    if provider == "gemini":
+        from .gemini_client import GeminiClient
+        return GeminiClient(model_name=model)
+    if provider == "ollama":
+        from .ollama_client import OllamaClient
+        return OllamaClient(model=model)
+    if provider == "fake":
+        from .fake_client import FakeLLMClient
+        return FakeLLMClient(model=model)
+    raise ValueError(f"Unknown LLM provider '{provider}'")
+
+
+def get_llm_client(provider: str = None, model: str = None):
+    """Return the process-wide client for a provider and model.
+
+    Clients are thread-safe and hold pooled connections, so one instance per
+    (provider, model) is shared by every request instead of being rebuilt.
+    """
+    provider = (provider or LLM_PROVIDER).lower()
+    if model is None and provider == LLM_PROVIDER:
+        model = LLM_MODEL
+    key = (provider, model or "")
+
+    client = _clients.get(key)
+    if client is not None:
+        return client
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _create_client(provider, model)
+            _clients[key] = client
+    return client
+
+
+def close_llm_clients() -> None:
+    """Release pooled connections held by registered clients"""
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        close = getattr(client, "close", None)
+        if close is not None:
+            close()
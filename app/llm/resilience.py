@@ -0,0 +1,239 @@
+from typing import Any, Callable, Dict, Optional
+import os
+import random
+import threading
+import time
+
+from .errors import LLMRateLimitError, LLMRetryableError, LLMUnavailableError
+
+
+def _env_float(name: str, default: str) -> Optional[float]:
+    value = os.getenv(name, default)
+    return float(value) if value else None
+
+
+class TokenBucket:
+    """Continuously refilling bucket; capacity is one minute's allowance"""
+
+    def __init__(self, per_minute: float):
+        self.per_minute = per_minute
+        self.tokens = per_minute
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.per_minute, self.tokens + (now - self.updated) * self.per_minute / 60.0)
+        self.updated = now
+
+    def reserve(self, amount: float) -> float:
+        """Take amount tokens, returning how long to wait before they're actually available"""
+        now = time.monotonic()
+        self._refill(now)
+        # Requests larger than the whole bucket would never fit; let them
+        # through once the bucket is full
+        amount = min(amount, self.per_minute)
+        self.tokens -= amount
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens * 60.0 / self.per_minute
+
+
+class AdaptiveRateLimiter:
+    """Client-side requests/min and tokens/min limits for one provider.
+
+    The request rate backs off multiplicatively when the provider throttles
+    us and creeps back up towards the configured limit on success.
+    """
+
+    def __init__(self, requests_per_minute: Optional[float], tokens_per_minute: Optional[float], min_fraction: float = 0.1):
+        self.max_rpm = requests_per_minute
+        self.min_rpm = requests_per_minute * min_fraction if requests_per_minute else None
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self._lock = threading.Lock()
+        self.throttled = 0
+
+    def _reserve(self, tokens: float) -> float:
+        with self._lock:
+            wait = 0.0
+            if self.requests is not None:
+                wait = max(wait, self.requests.reserve(1))
+            if self.tokens is not None:
+                wait = max(wait, self.tokens.reserve(tokens))
+            return wait
+
+    def acquire(self, tokens: float = 0) -> None:
+        wait = self._reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+    def on_rate_limited(self) -> None:
+        with self._lock:
+            self.throttled += 1
+            if self.requests is not None:
+                self.requests.per_minute = max(self.min_rpm, self.requests.per_minute * 0.5)
+
+    def on_success(self) -> None:
+        if self.requests is not None and self.requests.per_minute < self.max_rpm:
+            with self._lock:
+                self.requests.per_minute = min(self.max_rpm, self.requests.per_minute + self.max_rpm * 0.02)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests_per_minute": self.requests.per_minute if self.requests else None,
+            "tokens_per_minute": self.tokens.per_minute if self.tokens else None,
+            "throttled": self.throttled,
+        }
+
+
+class CircuitBreaker:
+    """Stop calling a backend after repeated failures.
+
+    After failure_threshold consecutive failures the circuit opens and calls
+    fail immediately with LLMUnavailableError. Once reset_timeout has passed
+    one trial call is let through (half-open); success closes the circuit.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def available(self) -> bool:
+        """Whether a call would currently be allowed (without claiming the trial)"""
+        with self._lock:
+            if self.state == self.OPEN:
+                return time.monotonic() - self.opened_at >= self.reset_timeout
+            return not (self.state == self.HALF_OPEN and self._trial_in_flight)
+
+    def before_call(self) -> None:
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == self.OPEN or (self.state == self.HALF_OPEN and self._trial_in_flight):
+                self.rejected += 1
+                raise LLMUnavailableError("LLM backend is unavailable (circuit open)")
+            if self.state == self.HALF_OPEN:
+                self._trial_in_flight = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {"state": self.state, "consecutive_failures": self.failures, "rejected": self.rejected}
+
+
+class ResiliencePolicy:
+    """Rate limiting, jittered exponential backoff and circuit breaking for one provider"""
+
+    def __init__(
+        self,
+        limiter: AdaptiveRateLimiter,
+        breaker: CircuitBreaker,
+        max_retries: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 20.0
+    ):
+        self.limiter = limiter
+        self.breaker = breaker
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retries = 0
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def call(self, fn: Callable[[], Any], tokens: float = 0) -> Any:
+        attempt = 0
+        while True:
+            self.breaker.before_call()
+            self.limiter.acquire(tokens)
+            try:
+                result = fn()
+            except LLMRetryableError as e:
+                self._on_failure(e)
+                if attempt >= self.max_retries:
+                    raise
+                self.retries += 1
+                time.sleep(self.backoff(attempt))
+                attempt += 1
+                continue
+            except Exception:
+                self._on_rejected()
+                raise
+            self._on_success()
+            return result
+
+    def _on_failure(self, error: Exception) -> None:
+        if isinstance(error, LLMRateLimitError):
+            # Throttling means the backend is up; slow down rather than trip the breaker
+            self.limiter.on_rate_limited()
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+
+    def _on_rejected(self) -> None:
+        # Not retryable (bad request, auth): the backend answered, so this
+        # doesn't count against its health
+        self.breaker.record_success()
+
+    def _on_success(self) -> None:
+        self.limiter.on_success()
+        self.breaker.record_success()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"retries": self.retries, "rate_limiter": self.limiter.stats(), "circuit_breaker": self.breaker.stats()}
+
+
+_policies: Dict[str, ResiliencePolicy] = {}
+_policies_lock = threading.Lock()
+
+
+def get_policy(provider: str) -> ResiliencePolicy:
+    """Process-wide policy for a provider, configured from <PROVIDER>_RPM / <PROVIDER>_TPM and LLM_* settings"""
+    policy = _policies.get(provider)
+    if policy is not None:
+        return policy
+    with _policies_lock:
+        if provider not in _policies:
+            prefix = provider.upper()
+            _policies[provider] = ResiliencePolicy(
+                limiter=AdaptiveRateLimiter(
+                    requests_per_minute=_env_float(f"{prefix}_RPM", ""),
+                    tokens_per_minute=_env_float(f"{prefix}_TPM", "")
+                ),
+                breaker=CircuitBreaker(
+                    failure_threshold=int(os.getenv("LLM_BREAKER_THRESHOLD", "5")),
+                    reset_timeout=float(os.getenv("LLM_BREAKER_RESET", "30"))
+                ),
+                max_retries=int(os.getenv("LLM_MAX_RETRIES", "3")),
+                base_delay=float(os.getenv("LLM_RETRY_BASE_DELAY", "0.5")),
+                max_delay=float(os.getenv("LLM_RETRY_MAX_DELAY", "20"))
+            )
+        return _policies[provider]
+
+
+def policy_stats() -> Dict[str, Any]:
+    return {provider: policy.stats() for provider, policy in _policies.items()}
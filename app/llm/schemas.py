@@ -0,0 +1,44 @@
+from typing import List, Literal
+from pydantic import BaseModel, Field
+
+# Shapes every backend is asked to return (Gemini response_schema, Ollama
+# format=json) and that responses are validated against in a single pass.
+# Responses are JSON objects at the top level, lists are wrapped in a field.
+
+
+class CandidateAnalysis(BaseModel):
+    skills: List[str] = []
+    experience_level: str = ""
+    location: str = ""
+    availability: str = ""
+    fit_score: float = Field(ge=0, le=100)
+    summary: str = ""
+
+
+class BatchAnalysisItem(CandidateAnalysis):
+    id: str
+
+
+class BatchAnalysis(BaseModel):
+    analyses: List[BatchAnalysisItem]
+
+
+class ScreeningQuestions(BaseModel):
+    questions: List[str] = Field(min_length=1)
+
+
+class ScreeningEvaluation(BaseModel):
+    overall_score: float = Field(ge=0, le=100)
+    individual_scores: List[float] = []
+    strengths: List[str] = []
+    weaknesses: List[str] = []
+    recommendation: Literal["Hire", "Maybe", "Pass"]
+    feedback: str = ""
+
+
+class SearchCriteria(BaseModel):
+    required_skills: List[str] = []
+    experience_level: str = ""
+    location: str = ""
+    employment_type: str = ""
+    domain: str = ""
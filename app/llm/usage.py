@@ -0,0 +1,32 @@
+from typing import Dict
+import threading
+
+
+class TokenUsage:
+    """Input/output token totals and malformed outputs per call type, across every backend"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals: Dict[str, Dict[str, int]] = {}
+
+    def record(self, task: str, input_tokens: int, output_tokens: int) -> None:
+        with self._lock:
+            totals = self._task(task)
+            totals["calls"] += 1
+            totals["input_tokens"] += input_tokens
+            totals["output_tokens"] += output_tokens
+
+    def record_malformed(self, task: str) -> None:
+        """A response that failed schema validation"""
+        with self._lock:
+            self._task(task)["malformed"] += 1
+
+    def _task(self, task: str) -> Dict[str, int]:
+        return self._totals.setdefault(task, {"calls": 0, "input_tokens": 0, "output_tokens": 0, "malformed": 0})
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {task: dict(totals) for task, totals in self._totals.items()}
+
+
+token_usage = TokenUsage()
@@ -1,21 +1,66 @@
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, File, Query, Request, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
+from contextlib import asynccontextmanager
 import os
+import json
+import time
+import anyio
 from dotenv import load_dotenv
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-from .database.models import init_db, get_db
-from .services.candidate_service import CandidateService
+from .database.models import THREADPOOL_SIZE, get_db, setup_database
+from .services.candidate_service import CandidateService, LLMBudget
+from .services.candidate_import import detect_format, import_candidates as run_candidate_import
+from .llm.cache import analysis_cache, query_parse_cache
+from .services.score_store import score_store
+from .services.analysis_store import analysis_refresher
+from .services.job_queue import job_queue
+from .services.vector_index import vector_index
+from .services.search_cache import search_result_cache
+from .llm.registry import close_llm_clients
+from .llm.base import llm_singleflight
+from .llm.errors import LLMError, LLMRetryableError, LLMUnavailableError
+from .llm.resilience import policy_stats
+from .llm.usage import token_usage
+from .metrics import (
+    HTTP_REQUEST_SECONDS, HTTP_REQUESTS_IN_FLIGHT, METRICS_CONTENT_TYPE, SERVER_TIMING_ENABLED,
+    render_metrics, server_timing_header, start_request_timings, stats_collector
+)
 
 # Load environment variables
 load_dotenv()
 
-# Initialize database
-init_db()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Process startup and shutdown.
+
+    Importing this module has no side effects; the schema check, sample
+    data and background writers are set up here, once per worker, and the
+    database engine and LLM clients are created on first use.
+    """
+    # Blocking work is offloaded to anyio's threadpool; the default of 40
+    # threads would cap in-flight searches per worker far below what the
+    # event loop can handle.
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    await anyio.to_thread.run_sync(setup_database)
+    score_store.start()
+    vector_index.start_backfill()
+    analysis_refresher.start()
+    job_queue.start()
+    try:
+        yield
+    finally:
+        job_queue.stop()
+        analysis_refresher.stop()
+        vector_index.stop()
+        score_store.stop()
+        close_llm_clients()
 
-app = FastAPI(title="PeopleGPT API")
+app = FastAPI(title="PeopleGPT API", lifespan=lifespan)
 
 # Configure CORS
 app.add_middleware(
@@ -26,10 +71,44 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+stats_collector.add_cache("analysis", analysis_cache)
+stats_collector.add_cache("query_parse", query_parse_cache)
+stats_collector.add_cache("search", search_result_cache)
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    timings = start_request_timings()
+    HTTP_REQUESTS_IN_FLIGHT.inc()
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        HTTP_REQUESTS_IN_FLIGHT.dec()
+        # Label by route template, not raw path, to keep cardinality bounded
+        route = request.scope.get("route")
+        HTTP_REQUEST_SECONDS.labels(
+            request.method, route.path if route is not None else "unmatched", str(status)
+        ).observe(time.perf_counter() - start)
+    # Streaming responses only include the stages run before the first byte
+    if SERVER_TIMING_ENABLED and timings:
+        response.headers["Server-Timing"] = server_timing_header(timings)
+    return response
+
 # Models
 class SearchQuery(BaseModel):
     query: str
     filters: Optional[Dict[str, Any]] = None
+    mode: Optional[str] = None  # strict, soft or off; defaults to SEARCH_CRITERIA_MODE
+    limit: Optional[int] = Field(default=None, ge=1, le=200)  # page size; omit for the full list
+    cursor: Optional[str] = None  # next_cursor from the previous page
+    # Budget for deep LLM analysis; defaults to RANK_LLM_MAX_CALLS / RANK_LLM_MAX_TOKENS
+    max_llm_calls: Optional[int] = Field(default=None, ge=0)
+    max_llm_tokens: Optional[int] = Field(default=None, ge=0)
+
+    def budget(self) -> LLMBudget:
+        return LLMBudget(max_calls=self.max_llm_calls, max_tokens=self.max_llm_tokens)
 
 class Candidate(BaseModel):
     id: str
@@ -43,6 +122,9 @@ class Candidate(BaseModel):
 class ScreeningAnswers(BaseModel):
     answers: List[str]
 
+class ScreeningBatch(BaseModel):
+    candidate_ids: List[str] = Field(min_length=1)
+
 # Routes
 @app.get("/")
 async def root():
@@ -58,15 +140,65 @@ async def search_candidates(
     """
     try:
         service = CandidateService(db)
-        candidates = service.search_candidates(query.query, query.filters)
+        if query.limit is not None or query.cursor is not None:
+            page = await service.asearch_page(
+                query.query,
+                query.filters,
+                query.mode,
+                limit=query.limit or 20,
+                cursor=query.cursor,
+                budget=query.budget()
+            )
+            return {**page, "query": query.query}
+
+        candidates = await service.asearch_candidates(query.query, query.filters, query.mode, query.budget())
         return {
             "candidates": candidates,
             "total": len(candidates),
             "query": query.query
         }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except (LLMUnavailableError, LLMRetryableError) as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except LLMError as e:
+        raise HTTPException(status_code=502, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/search/stream")
+async def stream_search_candidates(
+    query: SearchQuery,
+    format: str = "ndjson",
+    db: Session = Depends(get_db)
+):
+    """
+    Stream candidates as they are scored, as NDJSON (default) or server-sent events
+    """
+    if format not in ("ndjson", "sse"):
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'sse'")
+
+    service = CandidateService(db)
+    results = service.stream_search(query.query, query.filters, query.mode, query.budget())
+
+    def events():
+        total = 0
+        try:
+            for candidate in results:
+                total += 1
+                yield _stream_event({"type": "candidate", "candidate": candidate}, format)
+            yield _stream_event({"type": "done", "total": total, "query": query.query}, format)
+        except Exception as e:
+            # Headers are already sent; report the failure in-band
+            yield _stream_event({"type": "error", "detail": str(e)}, format)
+
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(events(), media_type=media_type)
+
+def _stream_event(payload: Dict[str, Any], format: str) -> str:
+    data = json.dumps(payload, default=str)
+    return f"data: {data}\n\n" if format == "sse" else f"{data}\n"
+
 @app.get("/candidate/{candidate_id}")
 async def get_candidate(
     candidate_id: str,
@@ -77,27 +209,80 @@ async def get_candidate(
     """
     try:
         service = CandidateService(db)
-        candidate = service.get_candidate(candidate_id)
+        candidate = await service.aget_candidate(candidate_id)
         return candidate
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    except (LLMUnavailableError, LLMRetryableError) as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except LLMError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/candidates/import")
+async def import_candidates(
+    file: UploadFile = File(...),
+    format: Optional[str] = None
+):
+    """
+    Bulk-import candidates from a CSV or JSONL export, deduplicated by email
+    """
+    try:
+        format = detect_format(file.filename, format)
+        # The upload is spooled to disk by now; parse it incrementally off the event loop
+        result = await run_in_threadpool(run_candidate_import, file.file, format)
+        if result.inserted_ids:
+            # Core inserts bypass the ORM events that keep the embedding index current
+            vector_index.start_backfill(result.inserted_ids)
+        return result.to_dict()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/candidate/{candidate_id}/screen")
 async def screen_candidate(
     candidate_id: str,
+    response: Response,
+    queued: bool = Query(False, alias="async"),
+    callback_url: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
     """
-    Perform AI-powered screening of a candidate
+    Perform AI-powered screening of a candidate. With async=true the work is
+    queued instead: 202 with a job to poll at status_url.
     """
+    callback_url = _checked_callback_url(callback_url)
     try:
+        if queued:
+            response.status_code = 202
+            return await run_in_threadpool(job_queue.enqueue_screening, db, candidate_id, callback_url)
         service = CandidateService(db)
-        screening = service.screen_candidate(candidate_id)
+        screening = await service.ascreen_candidate(candidate_id)
         return screening
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    except (LLMUnavailableError, LLMRetryableError) as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except LLMError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/candidates/screen")
+async def screen_candidates(
+    batch: ScreeningBatch,
+    db: Session = Depends(get_db)
+):
+    """
+    Screen a shortlist of candidates at once; one result or error per candidate
+    """
+    try:
+        service = CandidateService(db)
+        return await service.ascreen_candidates(batch.candidate_ids)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -105,20 +290,80 @@ async def screen_candidate(
 async def submit_screening_answers(
     screening_id: int,
     answers: ScreeningAnswers,
+    response: Response,
+    queued: bool = Query(False, alias="async"),
+    callback_url: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
     """
-    Submit and evaluate screening answers
+    Submit and evaluate screening answers. With async=true the work is
+    queued instead: 202 with a job to poll at status_url.
     """
+    callback_url = _checked_callback_url(callback_url)
     try:
+        if queued:
+            response.status_code = 202
+            return await run_in_threadpool(
+                job_queue.enqueue_evaluation, db, screening_id, answers.answers, callback_url
+            )
         service = CandidateService(db)
-        result = service.submit_screening_answers(screening_id, answers.answers)
+        result = await service.asubmit_screening_answers(screening_id, answers.answers)
         return result
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    except (LLMUnavailableError, LLMRetryableError) as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except LLMError as e:
+        raise HTTPException(status_code=502, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _checked_callback_url(callback_url: Optional[str]) -> Optional[str]:
+    try:
+        return job_queue.check_callback_url(callback_url)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/jobs/{job_id}")
+async def get_job(
+    job_id: str,
+    db: Session = Depends(get_db)
+):
+    """
+    Status of a queued screening or evaluation job, with its result once finished
+    """
+    try:
+        return await run_in_threadpool(job_queue.get, db, job_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/stats/cache")
+async def cache_stats():
+    """
+    Hit, miss and eviction counters for the LLM result caches and score writer
+    """
+    return {
+        "analysis": analysis_cache.stats(),
+        "query_parse": query_parse_cache.stats(),
+        "search": search_result_cache.stats(),
+        "scores": score_store.stats(),
+        "analyses": analysis_refresher.stats(),
+        "jobs": job_queue.stats(),
+        "llm_singleflight": llm_singleflight.stats(),
+        "llm_resilience": policy_stats(),
+        "llm_tokens": token_usage.stats()
+    }
+
+@app.get("/metrics")
+async def metrics():
+    """
+    Prometheus metrics: request and per-stage latency, LLM calls and tokens,
+    cache hit rates, circuit breaker state and DB pool usage
+    """
+    return Response(render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
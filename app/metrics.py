@@ -0,0 +1,174 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterable, Iterator, Optional
+import os
+import time
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, REGISTRY, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+# Add a Server-Timing header with per-stage durations to every response
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "false").lower() in ("1", "true", "yes")
+
+# Latency buckets from fast cache hits up to slow LLM fan-outs
+_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "peoplegpt_http_request_seconds", "HTTP request latency", ["method", "route", "status"], buckets=_BUCKETS
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge("peoplegpt_http_requests_in_flight", "HTTP requests being served")
+STAGE_SECONDS = Histogram(
+    "peoplegpt_stage_seconds", "Time spent in each request stage", ["stage"], buckets=_BUCKETS
+)
+LLM_CALL_SECONDS = Histogram(
+    "peoplegpt_llm_call_seconds", "Upstream LLM call latency, retries included",
+    ["provider", "task", "outcome"], buckets=_BUCKETS
+)
+LLM_CALLS_IN_FLIGHT = Gauge("peoplegpt_llm_calls_in_flight", "Upstream LLM calls in progress", ["provider"])
+LLM_TOKENS = Counter("peoplegpt_llm_tokens_total", "LLM tokens by direction", ["provider", "task", "direction"])
+JOB_SECONDS = Histogram(
+    "peoplegpt_job_seconds", "Background job run time", ["kind", "outcome"], buckets=_BUCKETS
+)
+JOB_QUEUE_WAIT_SECONDS = Histogram(
+    "peoplegpt_job_queue_wait_seconds", "Time from enqueue (or retry) to a worker starting the job", ["kind"],
+    buckets=_BUCKETS
+)
+VECTOR_INDEX_ERRORS = Counter(
+    "peoplegpt_vector_index_errors_total", "Vector index failures that fell back to SQL-only search", ["operation"]
+)
+LLM_MALFORMED = Counter("peoplegpt_llm_malformed_total", "LLM replies that failed schema validation", ["provider", "task"])
+
+# Per-request stage totals for Server-Timing: name -> seconds
+_request_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_timings", default=None)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time a block into peoplegpt_stage_seconds and the request's Server-Timing"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.labels(name).observe(elapsed)
+        add_request_timing(name, elapsed)
+
+
+def timed_iter(name: str, iterable: Iterable[Any]) -> Iterator[Any]:
+    """Yield from iterable, timing only how long items take to produce.
+
+    Time the consumer spends between items (streaming to a client, say) is
+    not counted. Recorded once the iterator is exhausted or closed.
+    """
+    iterator = iter(iterable)
+    elapsed = 0.0
+    try:
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                elapsed += time.perf_counter() - start
+                return
+            elapsed += time.perf_counter() - start
+            yield item
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            close()
+        STAGE_SECONDS.labels(name).observe(elapsed)
+        add_request_timing(name, elapsed)
+
+
+def add_request_timing(name: str, seconds: float) -> None:
+    timings = _request_timings.get()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+
+
+def start_request_timings() -> Dict[str, float]:
+    """Begin collecting stage timings for the current request.
+
+    The dict is shared (not copied) with threads and tasks spawned from the
+    request's context, so stages timed in the threadpool are included.
+    """
+    timings: Dict[str, float] = {}
+    _request_timings.set(timings)
+    return timings
+
+
+def server_timing_header(timings: Dict[str, float]) -> str:
+    return ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings.items())
+
+
+class StatsCollector:
+    """Exports the in-process caches, singleflight, resilience and DB pool
+    state at scrape time instead of mirroring every update into a metric"""
+
+    def __init__(self):
+        self._sources = []
+
+    def add_cache(self, name: str, cache) -> None:
+        self._sources.append((name, cache))
+
+    def describe(self):
+        # Without this the registry would call collect() on registration
+        return []
+
+    def collect(self):
+        # Imported here so registering the collector doesn't pull in the app
+        from .database.models import get_engine
+        from .llm.base import llm_singleflight
+        from .llm.resilience import policy_stats
+
+        hits = CounterMetricFamily("peoplegpt_cache_hits", "Cache hits", labels=["cache", "tier"])
+        misses = CounterMetricFamily("peoplegpt_cache_misses", "Cache misses", labels=["cache", "tier"])
+        size = GaugeMetricFamily("peoplegpt_cache_entries", "Entries held in memory", labels=["cache"])
+        for name, cache in self._sources:
+            stats = cache.stats()
+            hits.add_metric([name, "memory"], stats["hits"])
+            misses.add_metric([name, "memory"], stats["misses"])
+            if "db_hits" in stats:
+                hits.add_metric([name, "db"], stats["db_hits"])
+                misses.add_metric([name, "db"], stats["db_misses"])
+            size.add_metric([name], stats["size"])
+        yield hits
+        yield misses
+        yield size
+
+        flights = llm_singleflight.stats()
+        yield CounterMetricFamily("peoplegpt_llm_singleflight_calls", "Upstream calls made", value=flights["calls"])
+        yield CounterMetricFamily(
+            "peoplegpt_llm_singleflight_deduplicated", "Calls served by an identical in-flight call",
+            value=flights["deduplicated"]
+        )
+
+        breaker = GaugeMetricFamily(
+            "peoplegpt_llm_circuit_open", "1 while the provider's circuit breaker is open", labels=["provider"]
+        )
+        rpm = GaugeMetricFamily(
+            "peoplegpt_llm_rate_limit_rpm", "Current adaptive requests/min limit", labels=["provider"]
+        )
+        for provider, stats in policy_stats().items():
+            breaker.add_metric([provider], 0 if stats["circuit_breaker"]["state"] == "closed" else 1)
+            if stats["rate_limiter"]["requests_per_minute"] is not None:
+                rpm.add_metric([provider], stats["rate_limiter"]["requests_per_minute"])
+        yield breaker
+        yield rpm
+
+        pool = get_engine().pool
+        if hasattr(pool, "checkedout"):
+            yield GaugeMetricFamily("peoplegpt_db_pool_checked_out", "DB connections in use", value=pool.checkedout())
+            yield GaugeMetricFamily("peoplegpt_db_pool_size", "DB pool size", value=pool.size())
+            yield GaugeMetricFamily("peoplegpt_db_pool_overflow", "DB connections beyond pool size", value=pool.overflow())
+
+
+stats_collector = StatsCollector()
+REGISTRY.register(stats_collector)
+
+
+def render_metrics() -> bytes:
+    return generate_latest(REGISTRY)
+
+
+METRICS_CONTENT_TYPE = CONTENT_TYPE_LATEST
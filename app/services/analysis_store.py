@@ -0,0 +1,396 @@
+"""Candidate analyses materialized ahead of search.
+
+Analyses depend only on a candidate's profile, so they are computed once
+per profile (and model and prompt version) and stored in
+candidate_analyses. Search reads them with an outer join instead of
+calling the LLM. Profile writes through the ORM mark the stored analysis
+dirty; candidates without a row (new, or written with Core inserts) and
+rows from an older model or prompt version are stale too. A background
+refresher claims stale candidates in batches and analyzes them; claims are
+leases on the candidate_analyses row, so refreshers in several processes
+split the work instead of repeating it. Run one pass by hand with:
+
+    python -m app.services.analysis_store
+"""
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+import argparse
+import json
+import os
+import sys
+import threading
+
+from sqlalchemy import and_, delete, event, inspect, or_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from ..database.models import Candidate, CandidateAnalysis, SessionLocal, bump_pool_version, get_engine
+from ..llm.cache import content_hash
+
+# Search only uses stored analyses; candidates without one keep their
+# lexical score until the refresher gets to them. false analyzes them
+# inline, within the request's LLM budget.
+ANALYSIS_PRECOMPUTE = os.getenv("ANALYSIS_PRECOMPUTE", "true").lower() == "true"
+# Seconds between background refresh passes; 0 disables the refresher in this process
+ANALYSIS_REFRESH_INTERVAL = float(os.getenv("ANALYSIS_REFRESH_INTERVAL", "30"))
+# Stale candidates loaded and analyzed per refresh batch
+ANALYSIS_REFRESH_BATCH = int(os.getenv("ANALYSIS_REFRESH_BATCH", "200"))
+# Failed analyses of an unchanged profile before it is left alone
+ANALYSIS_MAX_ATTEMPTS = int(os.getenv("ANALYSIS_MAX_ATTEMPTS", "3"))
+# Seconds a refresher holds its claim on a batch; a process that dies
+# mid-batch leaves its candidates to others after this long
+ANALYSIS_CLAIM_TIMEOUT = float(os.getenv("ANALYSIS_CLAIM_TIMEOUT", "300"))
+
+# Candidate columns the analysis prompt sees; changing any of them makes the stored analysis stale
+ANALYZED_FIELDS = ("name", "skills", "experience", "location", "education")
+
+
+def analysis_payload(profile: Dict[str, Any]) -> Dict[str, Any]:
+    """Candidate fields sent to the LLM (and hashed for caches and fingerprints)"""
+    return {field: profile[field] for field in ANALYZED_FIELDS}
+
+
+def profile_fingerprint(payload: Dict[str, Any]) -> str:
+    return content_hash("profile", payload)
+
+
+def _upsert(dialect_name: str):
+    if dialect_name == "postgresql":
+        insert = postgresql.insert
+    elif dialect_name == "sqlite":
+        insert = sqlite.insert
+    else:
+        raise ValueError(f"Stored analyses are not supported on {dialect_name}")
+    return insert(CandidateAnalysis.__table__)
+
+
+class AnalysisStore:
+    """Reads and writes the candidate_analyses table"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.saved = 0
+        self.failed = 0
+        self.write_errors = 0
+
+    def fresh_condition(self, model_name: str, prompt_version: str):
+        """Join condition matching only a usable stored analysis for the candidate"""
+        return and_(
+            CandidateAnalysis.candidate_id == Candidate.id,
+            CandidateAnalysis.dirty.is_(False),
+            CandidateAnalysis.model_name == model_name,
+            CandidateAnalysis.prompt_version == prompt_version
+        )
+
+    def _stale_query(self, db: Session, model_name: str, prompt_version: str, now: datetime):
+        """Candidates whose analysis is missing, dirty or from another model or prompt version, and not claimed"""
+        return db.query(Candidate.id).outerjoin(
+            CandidateAnalysis, CandidateAnalysis.candidate_id == Candidate.id
+        ).filter(or_(
+            CandidateAnalysis.candidate_id.is_(None),
+            CandidateAnalysis.model_name != model_name,
+            CandidateAnalysis.prompt_version != prompt_version,
+            and_(CandidateAnalysis.dirty.is_(True), CandidateAnalysis.attempts < ANALYSIS_MAX_ATTEMPTS)
+        ), or_(
+            CandidateAnalysis.claimed_until.is_(None),
+            CandidateAnalysis.claimed_until < now
+        ))
+
+    def claim_stale(self, db: Session, model_name: str, prompt_version: str, limit: int) -> List[Dict[str, Any]]:
+        """Claim up to limit stale candidates and return their profiles and stored analysis state.
+
+        The claim is a conditional UPDATE of the candidate_analyses row, as
+        JobQueue claims jobs, so concurrent refreshers never get the same
+        candidate. Candidates without a row get a dirty placeholder to hold
+        the claim. Saving, failing or releasing a candidate ends the claim;
+        otherwise it lapses after ANALYSIS_CLAIM_TIMEOUT.
+        """
+        now = datetime.utcnow()
+        candidate_ids = [
+            candidate_id for (candidate_id,) in
+            self._stale_query(db, model_name, prompt_version, now).order_by(Candidate.id).limit(limit)
+        ]
+        db.rollback()
+        if not candidate_ids:
+            return []
+
+        engine = get_engine()
+        table = CandidateAnalysis.__table__
+        with engine.begin() as conn:
+            conn.execute(_upsert(engine.dialect.name).on_conflict_do_nothing(), [
+                {
+                    "candidate_id": candidate_id,
+                    "fingerprint": "",
+                    "model_name": model_name,
+                    "prompt_version": prompt_version,
+                    "dirty": True,
+                    "attempts": 0,
+                    "updated_at": now,
+                }
+                for candidate_id in candidate_ids
+            ])
+            claimed = [
+                candidate_id for (candidate_id,) in conn.execute(
+                    update(table)
+                    .where(
+                        table.c.candidate_id.in_(candidate_ids),
+                        or_(table.c.claimed_until.is_(None), table.c.claimed_until < now)
+                    )
+                    .values(claimed_until=now + timedelta(seconds=ANALYSIS_CLAIM_TIMEOUT))
+                    .returning(table.c.candidate_id)
+                )
+            ]
+        if not claimed:
+            return []
+
+        rows = db.query(
+            Candidate.id,
+            *[getattr(Candidate, field) for field in ANALYZED_FIELDS],
+            CandidateAnalysis.fingerprint,
+            CandidateAnalysis.model_name.label("analysis_model"),
+            CandidateAnalysis.prompt_version.label("analysis_prompt_version"),
+            CandidateAnalysis.error
+        ).join(
+            CandidateAnalysis, CandidateAnalysis.candidate_id == Candidate.id
+        ).filter(Candidate.id.in_(claimed)).order_by(Candidate.id)
+        return [row._asdict() for row in rows]
+
+    def release(self, candidate_ids: List[str]) -> None:
+        """Give up claims without recording a result, e.g. after a transient LLM error"""
+        if not candidate_ids:
+            return
+        table = CandidateAnalysis.__table__
+        with get_engine().begin() as conn:
+            conn.execute(update(table).where(table.c.candidate_id.in_(candidate_ids)).values(claimed_until=None))
+
+    def save(
+        self, entries: List[Tuple[str, Dict[str, Any], Dict[str, Any]]], model_name: str, prompt_version: str,
+        invalidate_searches: bool = False
+    ) -> None:
+        """Store successful analyses given as (candidate id, payload, analysis).
+
+        invalidate_searches drops cached search results, which may hold
+        these candidates with only a lexical score.
+        """
+        if not entries:
+            return
+        now = datetime.utcnow()
+        rows = [
+            {
+                "candidate_id": candidate_id,
+                "fingerprint": profile_fingerprint(payload),
+                "model_name": model_name,
+                "prompt_version": prompt_version,
+                "analysis": analysis,
+                "dirty": False,
+                "attempts": 0,
+                "error": None,
+                "claimed_until": None,
+                "updated_at": now,
+            }
+            for candidate_id, payload, analysis in entries
+        ]
+        engine = get_engine()
+        stmt = _upsert(engine.dialect.name)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["candidate_id"],
+            set_={column: stmt.excluded[column] for column in rows[0] if column != "candidate_id"}
+        )
+        try:
+            with engine.begin() as conn:
+                conn.execute(stmt, rows)
+                if invalidate_searches:
+                    bump_pool_version(conn)
+        except Exception:
+            with self._lock:
+                self.write_errors += 1
+            raise
+        with self._lock:
+            self.saved += len(rows)
+
+    def record_failures(self, entries: List[Tuple[str, Dict[str, Any], str]], model_name: str, prompt_version: str) -> None:
+        """Count a failed analysis, given as (candidate id, payload, error), against each candidate.
+
+        The row stays dirty, so it is retried until ANALYSIS_MAX_ATTEMPTS.
+        """
+        if not entries:
+            return
+        now = datetime.utcnow()
+        rows = [
+            {
+                "candidate_id": candidate_id,
+                "fingerprint": profile_fingerprint(payload),
+                "model_name": model_name,
+                "prompt_version": prompt_version,
+                "analysis": None,
+                "dirty": True,
+                "attempts": 1,
+                "error": error[:1000],
+                "claimed_until": None,
+                "updated_at": now,
+            }
+            for candidate_id, payload, error in entries
+        ]
+        engine = get_engine()
+        table = CandidateAnalysis.__table__
+        stmt = _upsert(engine.dialect.name)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["candidate_id"],
+            set_={
+                **{column: stmt.excluded[column] for column in rows[0] if column not in ("candidate_id", "attempts")},
+                "attempts": table.c.attempts + 1,
+            }
+        )
+        with engine.begin() as conn:
+            conn.execute(stmt, rows)
+        with self._lock:
+            self.failed += len(rows)
+
+    def mark_clean(self, candidate_ids: List[str]) -> None:
+        """Clear the dirty flag where a write didn't change the analyzed fields"""
+        if not candidate_ids:
+            return
+        table = CandidateAnalysis.__table__
+        with get_engine().begin() as conn:
+            conn.execute(
+                update(table).where(table.c.candidate_id.in_(candidate_ids)).values(dirty=False, claimed_until=None)
+            )
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"saved": self.saved, "failed": self.failed, "write_errors": self.write_errors}
+
+
+class AnalysisRefresher:
+    """Background thread that analyzes stale candidates.
+
+    Each pass works through stale candidates in batches until none are
+    left, the provider's circuit opens or a batch hits a transient LLM
+    error; the next pass retries after the interval. Every worker process
+    runs its own refresher unless ANALYSIS_REFRESH_INTERVAL is 0; each
+    batch is claimed first (see AnalysisStore.claim_stale), so the
+    refreshers split the stale candidates between them.
+    """
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        interval: float = ANALYSIS_REFRESH_INTERVAL,
+        batch_size: int = ANALYSIS_REFRESH_BATCH
+    ):
+        self.session_factory = session_factory
+        self.interval = interval
+        self.batch_size = batch_size
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.passes = 0
+        self.analyzed = 0
+        self.unchanged = 0
+        self.failed = 0
+        self.last_pass_at: Optional[datetime] = None
+
+    def start(self) -> None:
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="analysis-refresher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            # A batch in flight finishes within RANK_TIMEOUT; don't hold shutdown that long
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def refresh(self) -> int:
+        """Run one pass; returns the number of candidates analyzed"""
+        # Imported here: candidate_service imports this module
+        from .candidate_service import CandidateService
+
+        analyzed = 0
+        while not self._stop.is_set():
+            db = self.session_factory()
+            try:
+                service = CandidateService(db)
+                if not service.llm.is_available():
+                    break
+                result = service.refresh_analyses(self.batch_size)
+            finally:
+                db.close()
+            analyzed += result["analyzed"]
+            with self._lock:
+                self.analyzed += result["analyzed"]
+                self.unchanged += result["unchanged"]
+                self.failed += result["failed"]
+            if result["stale"] < self.batch_size or result["retryable"]:
+                break
+        with self._lock:
+            self.passes += 1
+            self.last_pass_at = datetime.utcnow()
+        return analyzed
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception:
+                # Database or provider trouble; stale rows are picked up next pass
+                pass
+            self._stop.wait(self.interval)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = {
+                "running": self._thread is not None,
+                "passes": self.passes,
+                "analyzed": self.analyzed,
+                "unchanged": self.unchanged,
+                "failed": self.failed,
+                "last_pass_at": self.last_pass_at.isoformat() if self.last_pass_at else None,
+            }
+        return {**stats, **analysis_store.stats()}
+
+
+analysis_store = AnalysisStore()
+analysis_refresher = AnalysisRefresher()
+
+
+# Profile writes made through the ORM invalidate the stored analysis
+@event.listens_for(Candidate, "after_update")
+def _candidate_profile_changed(mapper, connection, target):
+    state = inspect(target)
+    if any(state.attrs[field].history.has_changes() for field in ANALYZED_FIELDS):
+        table = CandidateAnalysis.__table__
+        connection.execute(
+            update(table).where(table.c.candidate_id == target.id).values(dirty=True, attempts=0)
+        )
+
+
+@event.listens_for(Candidate, "after_delete")
+def _candidate_deleted(mapper, connection, target):
+    # SQLite doesn't enforce ON DELETE CASCADE unless foreign keys are enabled
+    table = CandidateAnalysis.__table__
+    connection.execute(delete(table).where(table.c.candidate_id == target.id))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Analyze candidates whose stored analysis is missing or stale")
+    parser.add_argument("--batch-size", type=int, default=ANALYSIS_REFRESH_BATCH)
+    args = parser.parse_args(argv)
+
+    from ..database.models import init_db
+
+    init_db()
+    refresher = AnalysisRefresher(batch_size=args.batch_size)
+    while refresher.refresh():
+        # A pass can stop early on a transient error; go again while it makes progress
+        pass
+    json.dump(refresher.stats(), sys.stdout, indent=2)
+    print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
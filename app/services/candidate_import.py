@@ -0,0 +1,338 @@
+"""Bulk candidate import from CSV or JSONL exports.
+
+Rows are parsed one at a time from the stream, validated, deduplicated by
+email and written in batches with Core inserts, so memory stays flat no
+matter how large the file is. Run as a CLI from the repository root:
+
+    python -m app.services.candidate_import exports/candidates.csv --batch-size 2000
+"""
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Set, Tuple
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import time
+import uuid
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from ..database.locations import normalize_location
+from ..database.models import Candidate, CandidateSkill, bump_pool_version, get_engine
+from ..database.skills import normalize_skills
+
+# Rows written per INSERT batch and transaction; each commit is a large
+# share of a batch's cost on SQLite, so batches are fairly big
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "5000"))
+# Per-row errors kept in the report; the counts always cover every row
+IMPORT_MAX_ERRORS = int(os.getenv("IMPORT_MAX_ERRORS", "1000"))
+
+FORMATS = ("csv", "jsonl")
+
+# Separators accepted in a CSV skills cell, tried in order
+_SKILL_SEPARATORS = (";", "|", ",")
+
+
+# String fields: (max length or None, required); blank cells count as missing
+_STRING_FIELDS = {
+    "id": (255, False),
+    "name": (255, True),
+    "phone": (50, False),
+    "location": (255, True),
+    "experience": (None, True),
+    "resume_url": (500, False),
+    "linkedin_url": (500, False),
+    "github_url": (500, False),
+    "status": (50, False),
+}
+# Columns a record maps onto; anything else goes to candidate_metadata
+_KNOWN_FIELDS = set(_STRING_FIELDS) | {"email", "skills", "education"}
+
+
+def _parse_email(value: Any) -> str:
+    if not isinstance(value, str) or not value.strip():
+        raise ValueError("field required")
+    value = value.strip().lower()
+    if "@" not in value or len(value) > 255:
+        raise ValueError("not an email address")
+    return value
+
+
+def _parse_skills(value: Any) -> List[str]:
+    if isinstance(value, str):
+        value = value.strip()
+        if value.startswith("["):
+            value = json.loads(value)
+        else:
+            separator = next((sep for sep in _SKILL_SEPARATORS if sep in value), None)
+            value = value.split(separator) if separator else [value]
+    if not isinstance(value, list) or not all(isinstance(skill, str) for skill in value):
+        raise ValueError("must be a list of strings")
+    skills = [skill.strip() for skill in value if skill.strip()]
+    if not skills:
+        raise ValueError("at least one skill is required")
+    return skills
+
+
+def _parse_education(value: Any) -> Optional[List[Dict[str, Any]]]:
+    if isinstance(value, str):
+        value = value.strip()
+        if not value:
+            return None
+        value = json.loads(value) if value.startswith("[") else [{"degree": value}]
+    if value is None:
+        return None
+    if not isinstance(value, list) or not all(isinstance(entry, dict) for entry in value):
+        raise ValueError("must be a list of objects")
+    return value
+
+
+def parse_row(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate one record and return its insert parameters.
+
+    Raises ValueError naming every invalid field. Plain checks rather than
+    a pydantic model, which cost more than the insert itself per row.
+    Every row carries the same keys, as executemany requires.
+    """
+    row: Dict[str, Any] = {}
+    errors = []
+    for field, (max_length, required) in _STRING_FIELDS.items():
+        value = record.get(field)
+        if isinstance(value, str):
+            # CSV has no null; an empty cell means the field wasn't provided
+            value = value.strip() or None
+        if value is None:
+            if required:
+                errors.append(f"{field}: field required")
+        elif not isinstance(value, str):
+            errors.append(f"{field}: must be a string")
+        elif max_length is not None and len(value) > max_length:
+            errors.append(f"{field}: at most {max_length} characters")
+        row[field] = value
+    for field, parse in (("email", _parse_email), ("skills", _parse_skills), ("education", _parse_education)):
+        try:
+            row[field] = parse(record.get(field))
+        except ValueError as e:
+            errors.append(f"{field}: {e}")
+    if errors:
+        raise ValueError("; ".join(errors))
+
+    row["id"] = row["id"] or str(uuid.uuid4())
+    row["status"] = row["status"] or "new"
+    row["candidate_metadata"] = {
+        key: value for key, value in record.items() if key not in _KNOWN_FIELDS and value not in (None, "")
+    } or None
+    row["location_city"], row["location_region"], row["location_country"] = normalize_location(row["location"])
+    row["score"] = 0.0
+    return row
+
+
+class ImportResult:
+    """Running totals for one import; reported after every batch"""
+
+    def __init__(self, max_errors: int = IMPORT_MAX_ERRORS):
+        self.max_errors = max_errors
+        self.rows = 0
+        self.inserted = 0
+        self.duplicates = 0
+        self.invalid = 0
+        self.errors: List[Dict[str, Any]] = []
+        # Ids written, for indexing them afterwards; not part of the report
+        self.inserted_ids: List[str] = []
+        self.started = time.perf_counter()
+
+    def add_error(self, row: int, error: str, email: Optional[str] = None) -> None:
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"row": row, "email": email, "error": error})
+
+    def to_dict(self) -> Dict[str, Any]:
+        elapsed = time.perf_counter() - self.started
+        return {
+            "rows": self.rows,
+            "inserted": self.inserted,
+            "duplicates": self.duplicates,
+            "invalid": self.invalid,
+            "seconds": round(elapsed, 2),
+            "rows_per_second": round(self.rows / elapsed, 1) if elapsed else None,
+            "errors": self.errors,
+            "errors_truncated": self.duplicates + self.invalid > len(self.errors),
+        }
+
+
+def detect_format(filename: Optional[str], format: Optional[str] = None) -> str:
+    """Explicit format if given, otherwise from the file extension"""
+    if format:
+        format = format.lower()
+    elif filename:
+        extension = os.path.splitext(filename)[1].lower()
+        format = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}.get(extension)
+    if format not in FORMATS:
+        raise ValueError("format must be 'csv' or 'jsonl' (or use a .csv/.jsonl file name)")
+    return format
+
+
+def iter_records(stream: BinaryIO, format: str) -> Iterator[Tuple[int, Any]]:
+    """Yield (row number, record) pairs, reading the stream incrementally.
+
+    Records that can't be decoded are yielded as ValueError instances so
+    the caller can report them and carry on.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        if format == "csv":
+            reader = csv.DictReader(text)
+            for number, record in enumerate(reader, start=1):
+                if None in record:
+                    yield number, ValueError("more cells than header columns")
+                    continue
+                yield number, record
+            return
+        for number, line in enumerate(text, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield number, ValueError(f"invalid JSON: {e}")
+                continue
+            if not isinstance(record, dict):
+                yield number, ValueError("expected a JSON object")
+                continue
+            yield number, record
+    finally:
+        # Leave the caller's stream open
+        text.detach()
+
+
+def _insert_statement(dialect_name: str):
+    """INSERT that skips rows whose id or email already exists and returns the ids written"""
+    if dialect_name == "postgresql":
+        insert = postgresql.insert
+    elif dialect_name == "sqlite":
+        insert = sqlite.insert
+    else:
+        raise ValueError(f"Bulk import is not supported on {dialect_name}")
+    table = Candidate.__table__
+    return insert(table).on_conflict_do_nothing().returning(table.c.id)
+
+
+def _write_batch(engine, statement, batch: List[Tuple[int, Dict[str, Any]]]) -> Set[str]:
+    """Insert a batch in one transaction; returns the ids written"""
+    table = Candidate.__table__
+    with engine.begin() as conn:
+        # The unique constraint on email is case-sensitive and stored emails
+        # may predate lowercasing, so look existing ones up by lower(email)
+        stored = func.lower(table.c.email)
+        taken = {
+            email for (email,) in conn.execute(
+                select(stored).where(stored.in_([row["email"] for _, row in batch]))
+            )
+        }
+        rows = [row for _, row in batch if row["email"] not in taken]
+        inserted = {candidate_id for (candidate_id,) in conn.execute(statement, rows)} if rows else set()
+        links = [
+            {"candidate_id": row["id"], "skill": name}
+            for row in rows if row["id"] in inserted
+            for name in normalize_skills(row["skills"])
+        ]
+        if links:
+            conn.execute(CandidateSkill.__table__.insert(), links)
+        if inserted:
+            # Core inserts skip the ORM hooks, so invalidate cached searches here
+            bump_pool_version(conn)
+    return inserted
+
+
+def _record_batch(batch: List[Tuple[int, Dict[str, Any]]], inserted: Set[str], result: ImportResult) -> None:
+    result.inserted += len(inserted)
+    for number, row in batch:
+        if row["id"] in inserted:
+            result.inserted_ids.append(row["id"])
+        else:
+            result.duplicates += 1
+            result.add_error(number, "candidate with this email or id already exists", row["email"])
+
+
+def import_candidates(
+    stream: BinaryIO,
+    format: str,
+    batch_size: int = IMPORT_BATCH_SIZE,
+    progress: Optional[Callable[[ImportResult], None]] = None
+) -> ImportResult:
+    """Import candidates from a CSV or JSONL byte stream.
+
+    Required fields are name, email, location, skills and experience; a
+    CSV skills cell may be a JSON array or a ;, | or , separated list.
+    Rows repeating an email seen earlier in the file or already stored are
+    skipped and reported, as are rows that fail validation. Each batch is
+    committed on its own, so a failure part-way keeps earlier batches.
+    progress is called with the running result after every batch.
+    """
+    engine = get_engine()
+    statement = _insert_statement(engine.dialect.name)
+    result = ImportResult()
+    seen_emails = set()
+    batch: List[Tuple[int, Dict[str, Any]]] = []
+
+    for number, record in iter_records(stream, format):
+        result.rows += 1
+        if isinstance(record, ValueError):
+            result.invalid += 1
+            result.add_error(number, str(record))
+            continue
+        try:
+            row = parse_row(record)
+        except ValueError as e:
+            result.invalid += 1
+            result.add_error(number, str(e), record.get("email"))
+            continue
+        if row["email"] in seen_emails:
+            result.duplicates += 1
+            result.add_error(number, "email repeated earlier in the file", row["email"])
+            continue
+        seen_emails.add(row["email"])
+
+        batch.append((number, row))
+        if len(batch) >= batch_size:
+            _record_batch(batch, _write_batch(engine, statement, batch), result)
+            batch = []
+            if progress is not None:
+                progress(result)
+
+    if batch:
+        _record_batch(batch, _write_batch(engine, statement, batch), result)
+    if progress is not None:
+        progress(result)
+    return result
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Import candidates from a CSV or JSONL export")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=FORMATS, help="defaults to the file extension")
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    from ..database.models import init_db
+
+    format = detect_format(args.path, args.format)
+    init_db()
+
+    def report(result: ImportResult) -> None:
+        print(
+            f"{result.rows} rows: {result.inserted} inserted, {result.duplicates} duplicates, "
+            f"{result.invalid} invalid",
+            file=sys.stderr
+        )
+
+    with open(args.path, "rb") as f:
+        result = import_candidates(f, format, args.batch_size, progress=report)
+    json.dump(result.to_dict(), sys.stdout, indent=2)
+    print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,119 +1,666 @@
-from typing import List, Dict, Any, Optional
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import and_, func, insert, or_, select, true
 from sqlalchemy.orm import Session
-from ..database.models import Candidate, Screening, Outreach
-from ..llm.gemini_client import GeminiClient
+from starlette.concurrency import run_in_threadpool
+from ..database.models import Candidate, CandidateAnalysis, CandidateSkill, Screening, Outreach, get_pool_version
+from ..database.skills import normalize_skills
+from ..database.locations import normalize_location
+from ..llm.registry import get_llm_client
+from ..llm.errors import LLMError, LLMOutputError, LLMRetryableError, LLMUnavailableError
+from ..llm.prompts import (
+    MAX_OUTPUT_TOKENS, QUERY_PARSE_PROMPT_VERSION, compact_json, estimate_tokens, fit_candidate, query_parse_prompt
+)
+from ..llm.schemas import SearchCriteria
+from ..llm.cache import AnalysisCache, analysis_cache, content_hash, query_parse_cache
+from ..metrics import stage, timed_iter
+from .analysis_store import ANALYSIS_PRECOMPUTE, analysis_payload, analysis_store, profile_fingerprint
+from .score_store import score_store
+from .vector_index import vector_index
+from .lexical_scorer import lexical_scores
+from .search_cache import SearchResultCache, search_result_cache
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError, as_completed
+from functools import partial
+import base64
+import contextvars
+import heapq
 import uuid
 import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of ranking and batch screening LLM calls in flight per process
+RANK_MAX_CONCURRENCY = int(os.getenv("RANK_MAX_CONCURRENCY", "16"))
+# Candidates scored per batched analysis prompt (1 disables batching)
+RANK_BATCH_SIZE = max(1, int(os.getenv("RANK_BATCH_SIZE", "8")))
+# Overall time budget (seconds) for analyzing a search's candidates
+RANK_TIMEOUT = float(os.getenv("RANK_TIMEOUT", "60"))
+
+# Default per-request budget for deep LLM analysis; empty means unlimited
+_max_calls = os.getenv("RANK_LLM_MAX_CALLS", "10")
+_max_tokens = os.getenv("RANK_LLM_MAX_TOKENS", "")
+RANK_LLM_MAX_CALLS = int(_max_calls) if _max_calls else None
+RANK_LLM_MAX_TOKENS = int(_max_tokens) if _max_tokens else None
+
+# Candidates accepted by one batch screening request
+SCREEN_BATCH_MAX_CANDIDATES = int(os.getenv("SCREEN_BATCH_MAX_CANDIDATES", "200"))
+
+# Candidates sent for inline LLM analysis together; results stream out per window
+SEARCH_WINDOW_SIZE = int(os.getenv("SEARCH_WINDOW_SIZE", "200"))
+
+# How parsed query criteria are turned into SQL filters: strict, soft or off
+CRITERIA_MODES = ("strict", "soft", "off")
+SEARCH_CRITERIA_MODE = os.getenv("SEARCH_CRITERIA_MODE", "soft").lower()
+
+# Parsed locations that don't restrict anything
+ANY_LOCATION = {"", "any", "anywhere", "remote", "none", "n/a"}
+
+# Words in the experience text that indicate each seniority level. Mid is
+# rarely spelled out, so it doesn't filter.
+SENIORITY_KEYWORDS = {
+    "Junior": ["junior", "entry", "intern", "graduate"],
+    "Senior": ["senior", "sr.", "lead", "principal", "staff"],
+    "Lead": ["lead", "principal", "staff", "head of", "manager"],
+}
+
+# Results deep-analyzed by the LLM rank above those only scored lexically
+STAGE_ORDER = {"llm": 0, "lexical": 1}
+
+def rank_key(result: Dict[str, Any]) -> Tuple[int, float, str]:
+    """Sort key for ranked results: LLM stage first, then best score, ties broken by id"""
+    return (STAGE_ORDER[result["stage"]], -result["score"], result["id"])
+
+def encode_cursor(result: Dict[str, Any]) -> str:
+    """Opaque keyset cursor pointing just after the given result"""
+    raw = json.dumps([result["stage"], result["score"], result["id"]]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+def decode_cursor(cursor: str) -> Tuple[int, float, str]:
+    try:
+        stage, score, candidate_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return (STAGE_ORDER[stage], -float(score), str(candidate_id))
+    except (ValueError, TypeError, KeyError):
+        raise ValueError("Invalid cursor")
+
+class LLMBudget:
+    """Per-request cap on deep LLM analysis, as calls and/or estimated tokens"""
+
+    def __init__(self, max_calls: Optional[int] = None, max_tokens: Optional[int] = None):
+        self.max_calls = RANK_LLM_MAX_CALLS if max_calls is None else max_calls
+        self.max_tokens = RANK_LLM_MAX_TOKENS if max_tokens is None else max_tokens
+
+    def affordable(self, payloads: List[Dict[str, Any]]) -> int:
+        """How many of the payloads, taken in order, fit in the budget"""
+        count = len(payloads)
+        if self.max_calls is not None:
+            # Each call scores up to RANK_BATCH_SIZE candidates
+            count = min(count, self.max_calls * RANK_BATCH_SIZE)
+        if self.max_tokens is not None:
+            spent = 0
+            for index, payload in enumerate(payloads[:count]):
+                spent += estimate_analysis_tokens(payload)
+                if spent > self.max_tokens:
+                    return index
+        return count
+
+def estimate_analysis_tokens(payload: Dict[str, Any]) -> int:
+    """Rough token cost of analyzing one candidate in a batched prompt"""
+    # The trimmed payload as the prompt builder sends it, the capped JSON
+    # answer and a share of the prompt instructions
+    return (
+        estimate_tokens(compact_json(fit_candidate(payload)))
+        + MAX_OUTPUT_TOKENS["analysis"]
+        + 100 // RANK_BATCH_SIZE
+    )
+
+# Shared by every request, so RANK_MAX_CONCURRENCY bounds the process, not
+# each search; threads are only started when calls are submitted
+_llm_executor = ThreadPoolExecutor(max_workers=RANK_MAX_CONCURRENCY, thread_name_prefix="llm-fanout")
+
+def run_concurrently(calls: Dict[Any, Callable[[], Any]], timeout: float = RANK_TIMEOUT) -> Iterator[Tuple[Any, Any]]:
+    """Run LLM calls on the process-wide pool of RANK_MAX_CONCURRENCY threads.
+
+    Yields (key, result) pairs in completion order; a call that raised
+    yields its exception as the result, and calls unfinished after timeout
+    seconds, time spent queued behind other requests included, yield a
+    TimeoutError. Each call runs in a copy of the caller's context so its
+    LLM timings still reach the request's Server-Timing.
+    """
+    if not calls:
+        return
+    futures = {_llm_executor.submit(contextvars.copy_context().run, call): key for key, call in calls.items()}
+    finished = set()
+    try:
+        for future in as_completed(futures, timeout=timeout):
+            finished.add(future)
+            try:
+                result = future.result()
+            except Exception as e:
+                result = e
+            yield futures[future], result
+    except FuturesTimeoutError:
+        for future, key in futures.items():
+            if future not in finished:
+                yield key, TimeoutError(f"Timed out after {timeout}s")
+    finally:
+        # Calls still queued are dropped; running ones finish and are discarded
+        for future in futures:
+            future.cancel()
+
 
 class CandidateService:
     def __init__(self, db: Session):
         self.db = db
-        self.llm = GeminiClient()
 
-    def search_candidates(self, query: str, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
-        """Search for candidates based on natural language query"""
+    @property
+    def llm(self):
+        # Resolved per use so requests that never call the LLM don't create a client
+        return get_llm_client()
+
+    def search_candidates(
+        self,
+        query: str,
+        filters: Optional[Dict[str, Any]] = None,
+        mode: Optional[str] = None,
+        budget: Optional[LLMBudget] = None
+    ) -> List[Dict[str, Any]]:
+        """Search for candidates based on natural language query.
+
+        mode controls how the LLM-parsed criteria are pushed into SQL:
+        "strict" requires every parsed skill, the location and the seniority,
+        "soft" only requires one matching skill, "off" ignores them. budget
+        caps how many candidates get deep LLM analysis.
+        """
+        mode = self._resolve_mode(mode)
+        budget = budget or LLMBudget()
+
+        # Identical searches over an unchanged candidate pool are served from memory
+        with stage("search_cache"):
+            cache_key = self._search_cache_key(query, filters, mode, budget)
+            cached = search_result_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        db_query, search_criteria = self._prepare_search(query, filters, mode)
+        
+        # Rank with the lexical/LLM cascade
+        ranked_candidates = self._rank_candidates(db_query, search_criteria, query, budget)
+        search_result_cache.set(cache_key, ranked_candidates)
+        
+        return ranked_candidates
+
+    def search_page(
+        self,
+        query: str,
+        filters: Optional[Dict[str, Any]] = None,
+        mode: Optional[str] = None,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        budget: Optional[LLMBudget] = None
+    ) -> Dict[str, Any]:
+        """Return one keyset page of ranked search results.
+
+        Pages of a cached search are sliced from memory. Otherwise the
+        cascade ranks every matched candidate, which needs all of their
+        profiles in memory for the corpus-wide lexical scores; of its results
+        only the best limit + 1 after the cursor are kept, plus the full list
+        while it is still small enough to cache for the next page.
+        """
+        after = decode_cursor(cursor) if cursor else None
+        mode = self._resolve_mode(mode)
+        budget = budget or LLMBudget()
+
+        with stage("search_cache"):
+            cache_key = self._search_cache_key(query, filters, mode, budget)
+            cached = search_result_cache.get(cache_key)
+        if cached is not None:
+            start = 0
+            if after is not None:
+                start = next((i for i, result in enumerate(cached) if rank_key(result) > after), len(cached))
+            page = cached[start:start + limit + 1]
+            next_cursor = encode_cursor(page[limit - 1]) if len(page) > limit else None
+            return {"candidates": page[:limit], "next_cursor": next_cursor, "total": len(cached)}
+
+        db_query, search_criteria = self._prepare_search(query, filters, mode)
+
+        total = 0
+        collected: Optional[List[Dict[str, Any]]] = []
+
+        def after_cursor(results):
+            nonlocal total, collected
+            for result in results:
+                total += 1
+                if collected is not None:
+                    collected.append(result)
+                    if len(collected) > search_result_cache.max_results:
+                        collected = None
+                if after is None or rank_key(result) > after:
+                    yield result
+
+        results = self._iter_cascade(db_query, search_criteria, query, budget)
+        page = heapq.nsmallest(limit + 1, after_cursor(results), key=rank_key)
+        self._flush_scores()
+        if collected is not None:
+            search_result_cache.set(cache_key, sorted(collected, key=rank_key))
+
+        next_cursor = encode_cursor(page[limit - 1]) if len(page) > limit else None
+        return {"candidates": page[:limit], "next_cursor": next_cursor, "total": total}
+
+    def stream_search(
+        self,
+        query: str,
+        filters: Optional[Dict[str, Any]] = None,
+        mode: Optional[str] = None,
+        budget: Optional[LLMBudget] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield search results as soon as each one is scored (unsorted).
+
+        Lexically scored candidates come out immediately, LLM-analyzed ones as
+        their analyses complete. A cached search is replayed in rank order.
+        """
+        mode = self._resolve_mode(mode)
+        budget = budget or LLMBudget()
+
+        with stage("search_cache"):
+            cache_key = self._search_cache_key(query, filters, mode, budget)
+            cached = search_result_cache.get(cache_key)
+        if cached is not None:
+            yield from cached
+            return
+
+        db_query, search_criteria = self._prepare_search(query, filters, mode)
+        collected = []
+        try:
+            for result in self._iter_cascade(db_query, search_criteria, query, budget):
+                if collected is not None:
+                    collected.append(result)
+                    if len(collected) > search_result_cache.max_results:
+                        collected = None
+                yield result
+        finally:
+            self._flush_scores()
+        # Only reached when the client consumed the whole stream
+        if collected is not None:
+            search_result_cache.set(cache_key, sorted(collected, key=rank_key))
+
+    def _resolve_mode(self, mode: Optional[str]) -> str:
+        mode = (mode or SEARCH_CRITERIA_MODE).lower()
+        if mode not in CRITERIA_MODES:
+            raise ValueError(f"Unknown criteria mode '{mode}', expected one of {', '.join(CRITERIA_MODES)}")
+        return mode
+
+    def _search_cache_key(self, query: str, filters: Optional[Dict[str, Any]], mode: str, budget: LLMBudget) -> str:
+        return SearchResultCache.make_key(
+            query, filters, mode, budget, self.llm.model_name, get_pool_version(self.db), vector_index.usable
+        )
+
+    def _prepare_search(self, query: str, filters: Optional[Dict[str, Any]], mode: str):
+        """Parse the query and build the filtered candidate query"""
+        filters = filters or {}
+
         # First, use LLM to understand the query and extract search criteria
-        search_criteria = self._parse_search_query(query)
+        with stage("parse_query"):
+            search_criteria = self._parse_search_query(query)
         
         # Build database query
         db_query = self.db.query(Candidate)
         
-        # Apply filters
-        if filters:
-            if filters.get("location"):
-                db_query = db_query.filter(Candidate.location.ilike(f"%{filters['location']}%"))
-            if filters.get("skills"):
-                # Assuming skills is stored as JSON array
-                for skill in filters["skills"]:
-                    db_query = db_query.filter(Candidate.skills.contains(skill))
-        
-        # Get candidates
-        candidates = db_query.all()
-        
-        # Use LLM to rank and score candidates
-        ranked_candidates = self._rank_candidates(candidates, search_criteria)
+        # Apply explicit filters
+        if filters.get("location"):
+            db_query = db_query.filter(self._location_predicate(filters["location"]))
+        if filters.get("skills"):
+            db_query = db_query.filter(self._skills_predicate(filters["skills"], match_all=True))
+
+        # Apply parsed criteria so the candidate set shrinks before ranking
+        for predicate in self._criteria_predicates(search_criteria, filters, mode):
+            db_query = db_query.filter(predicate)
         
-        return ranked_candidates
+        # Narrow to the nearest profiles by embedding before any LLM ranking,
+        # counting only neighbours that pass the filters above
+        def keep(ids: List[str]) -> set:
+            return {candidate_id for (candidate_id,) in db_query.filter(Candidate.id.in_(ids)).with_entities(Candidate.id)}
+
+        with stage("vector_search"):
+            nearest_ids = vector_index.search(query, keep=keep)
+        if nearest_ids is not None:
+            db_query = db_query.filter(Candidate.id.in_(nearest_ids))
+
+        return db_query, search_criteria
+
+    def _skills_predicate(self, skills: List[str], match_all: bool):
+        """Match candidates through the normalized candidate_skills index.
+
+        With match_all the per-skill index lookups are intersected; otherwise
+        any one of the skills is enough.
+        """
+        names = normalize_skills(skills)
+        matches = select(CandidateSkill.candidate_id).where(CandidateSkill.skill.in_(names))
+        if match_all and len(names) > 1:
+            matches = matches.group_by(CandidateSkill.candidate_id).having(
+                func.count(CandidateSkill.skill) == len(names)
+            )
+        return Candidate.id.in_(matches)
+
+    def _location_predicate(self, location: str):
+        """Equality match on the indexed normalized location columns"""
+        city, region, country = normalize_location(location)
+        predicates = []
+        if city:
+            predicates.append(Candidate.location_city == city)
+        # Once the city matches, a candidate that just didn't state region or
+        # country ("Seattle" vs "Seattle, WA") still counts as a match
+        for column, value in ((Candidate.location_region, region), (Candidate.location_country, country)):
+            if value:
+                predicates.append(or_(column == value, column.is_(None)) if city else column == value)
+        if not predicates:
+            return true()
+        return and_(*predicates)
+
+    def _criteria_predicates(self, criteria: Dict[str, Any], filters: Dict[str, Any], mode: str) -> List[Any]:
+        """Compile LLM-parsed search criteria into SQL predicates.
+
+        Explicit filters take precedence: a field already filtered by the
+        caller isn't filtered again from the parsed criteria.
+        """
+        if mode == "off":
+            return []
+
+        predicates = []
+        skills = criteria.get("required_skills") or []
+        skills = normalize_skills(skills) if isinstance(skills, list) else []
+        if skills and not filters.get("skills"):
+            predicates.append(self._skills_predicate(skills, match_all=(mode == "strict")))
+
+        if mode == "strict":
+            location = criteria.get("location")
+            if isinstance(location, str) and location.strip().lower() not in ANY_LOCATION and not filters.get("location"):
+                predicates.append(self._location_predicate(location.strip()))
+
+            keywords = SENIORITY_KEYWORDS.get(str(criteria.get("experience_level", "")).strip().title())
+            if keywords:
+                predicates.append(or_(*[Candidate.experience.ilike(f"%{keyword}%") for keyword in keywords]))
+
+        return predicates
 
     def _parse_search_query(self, query: str) -> Dict[str, Any]:
-        """Use LLM to parse natural language query into structured search criteria"""
-        prompt = f"""
-        Parse the following recruitment query into structured search criteria:
-        "{query}"
-        
-        Provide a JSON response with:
-        1. "required_skills": List of required technical skills
-        2. "experience_level": Experience level (Junior/Mid/Senior/Lead)
-        3. "location": Location preferences
-        4. "employment_type": Employment type (Full-time/Contract/Part-time)
-        5. "domain": Domain/Industry preferences
-        
-        Format your response as valid JSON only.
+        """Use LLM to parse natural language query into structured search criteria.
+
+        Parses are cached by normalized query, so repeated or trivially
+        reworded queries skip the LLM call.
         """
-        
-        system_prompt = """
-        You are an expert recruitment analyst. Parse natural language job requirements 
-        into structured search criteria. Be precise and extract only the explicitly mentioned requirements.
+        criteria = query_parse_cache.get_criteria(query, QUERY_PARSE_PROMPT_VERSION, self.llm.model_name)
+        if criteria is not None:
+            return criteria
+
+        self._release_connection()
+        try:
+            criteria = self.llm.generate_structured(query_parse_prompt(query)).model_dump()
+        except LLMError:
+            # Backend down, throttled or answering garbage: search on the raw
+            # query lexically with no parsed constraints. Not cached, so the
+            # next identical query retries.
+            return SearchCriteria().model_dump()
+
+        query_parse_cache.set_criteria(query, QUERY_PARSE_PROMPT_VERSION, self.llm.model_name, criteria)
+        return criteria
+
+    def _rank_candidates(self, db_query, criteria: Dict[str, Any], query: str, budget: Optional[LLMBudget] = None) -> List[Dict[str, Any]]:
+        """Rank the query's candidates with the cascade and sort the results"""
+        with stage("rank"):
+            ranked = list(self._iter_cascade(db_query, criteria, query, budget))
+        self._flush_scores()
+
+        # Sort by stage and score, breaking ties by id so the order is deterministic
+        ranked.sort(key=rank_key)
+        return ranked
+
+    def _iter_cascade(self, db_query, criteria: Dict[str, Any], query: str, budget: Optional[LLMBudget] = None) -> Iterator[Dict[str, Any]]:
+        """Two-stage ranking.
+
+        Stage one scores every matched candidate lexically (skill overlap and
+        BM25). The best of them, as many as the budget affords, go on to the
+        LLM stage: those with a fresh stored analysis (see analysis_store)
+        take its fit score at no LLM cost and, with ANALYSIS_PRECOMPUTE off,
+        the rest are analyzed inline. Everyone else keeps their lexical
+        score, stored analysis or not, so how far the refresher has got
+        doesn't decide who ranks first. Each result's "stage" says which
+        scorer produced its score.
         """
-        
-        response = self.llm.generate_response(prompt, system_prompt)
-        
+        budget = budget or LLMBudget()
+        model_name = self.llm.model_name
+        prompt_version = self.llm.ANALYSIS_PROMPT_VERSION
+
+        # Only the columns ranking needs. BM25 statistics and the budget's
+        # pick of the best lexical candidates span the whole matched set,
+        # so every row is loaded; the vector index and SQL filters are what
+        # keep that set small.
+        with stage("db_fetch"):
+            rows = db_query.with_entities(
+                Candidate.id, Candidate.name, Candidate.skills, Candidate.experience,
+                Candidate.location, Candidate.education, Candidate.score,
+                CandidateAnalysis.analysis.label("stored_analysis")
+            ).outerjoin(
+                CandidateAnalysis, analysis_store.fresh_condition(model_name, prompt_version)
+            )
+            profiles = [row._asdict() for row in rows]
+        self._release_connection()
+        if not profiles:
+            return
+
+        with stage("rank_lexical"):
+            lexical = lexical_scores(profiles, criteria, query)
+            order = sorted(range(len(profiles)), key=lambda i: (-lexical[i], profiles[i]["id"]))
+            top_count = budget.affordable([self._analysis_payload(profiles[i]) for i in order])
+            top = order[:top_count]
+            stored = [i for i in top if profiles[i]["stored_analysis"] is not None]
+            deep = [i for i in top if profiles[i]["stored_analysis"] is None]
+        if ANALYSIS_PRECOMPUTE or (deep and not self.llm.is_available()):
+            # Not analyzed inline, or the circuit is open and the calls would fail fast anyway
+            deep = []
+
+        for i in stored:
+            analysis = profiles[i]["stored_analysis"]
+            score_store.record(profiles[i]["id"], analysis["fit_score"], current=profiles[i]["score"])
+            yield self._result(profiles[i], analysis["fit_score"], "llm", analysis, lexical[i])
+
+        # Candidates outside the budget, and those in it left unanalyzed, keep their lexical score
+        llm_scored = set(stored) | set(deep)
+        for i in order:
+            if i not in llm_scored:
+                yield self._result(profiles[i], float(lexical[i]), "lexical", None, lexical[i])
+
+        for start in range(0, len(deep), SEARCH_WINDOW_SIZE):
+            window = deep[start:start + SEARCH_WINDOW_SIZE]
+            payloads = [self._analysis_payload(profiles[i]) for i in window]
+            analyses = timed_iter("rank_llm", self._iter_analyses([profiles[i]["id"] for i in window], payloads))
+            computed = []
+            for local_index, analysis in analyses:
+                i = window[local_index]
+                profile = profiles[i]
+                if "error" in analysis:
+                    # Degrade to the lexical score; keep the stored score as is
+                    yield self._result(profile, float(lexical[i]), "lexical", analysis, lexical[i])
+                    continue
+
+                computed.append((profile["id"], payloads[local_index], analysis))
+                fit_score = analysis["fit_score"]
+                # Buffered and written in bulk; unchanged scores are skipped
+                score_store.record(profile["id"], fit_score, current=profile["score"])
+                yield self._result(profile, fit_score, "llm", analysis, lexical[i])
+            self._store_analyses(computed, model_name, prompt_version)
+
+    def _store_analyses(self, computed: List[Tuple[str, Dict[str, Any], Dict[str, Any]]], model_name: str, prompt_version: str) -> None:
+        """Keep inline analyses so later searches read them instead of calling the LLM"""
         try:
-            # Try to parse JSON response
-            import re
-            json_match = re.search(r'\{.*\}', response, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group())
-        except json.JSONDecodeError:
-            pass
-        
-        # Fallback parsing
+            analysis_store.save(computed, model_name, prompt_version)
+        except Exception:
+            # Only costs a repeat analysis; the analysis cache still has them.
+            # Counted as write_errors in analysis_store.stats()
+            logger.exception("Storing %d inline analyses failed", len(computed))
+
+    def refresh_analyses(self, limit: int) -> Dict[str, int]:
+        """Claim and analyze up to limit candidates whose stored analysis is missing or stale.
+
+        Profiles whose fingerprint is unchanged are just marked clean. Failed
+        analyses count against the candidate unless the error was transient,
+        in which case "retryable" is set and the caller should back off.
+        """
+        model_name = self.llm.model_name
+        prompt_version = self.llm.ANALYSIS_PROMPT_VERSION
+        rows = analysis_store.claim_stale(self.db, model_name, prompt_version, limit)
+        self._release_connection()
+
+        unchanged, candidate_ids, payloads = [], [], []
+        for row in rows:
+            payload = self._analysis_payload(row)
+            if (
+                row["fingerprint"] == profile_fingerprint(payload) and row["error"] is None
+                and row["analysis_model"] == model_name and row["analysis_prompt_version"] == prompt_version
+            ):
+                unchanged.append(row["id"])
+            else:
+                candidate_ids.append(row["id"])
+                payloads.append(payload)
+        analysis_store.mark_clean(unchanged)
+
+        computed, failed, released = [], [], []
+        for index, analysis in self._iter_analyses(candidate_ids, payloads):
+            if "error" not in analysis:
+                computed.append((candidate_ids[index], payloads[index], analysis))
+            elif analysis.get("retryable"):
+                released.append(candidate_ids[index])
+            else:
+                failed.append((candidate_ids[index], payloads[index], analysis["error"]))
+        analysis_store.save(computed, model_name, prompt_version, invalidate_searches=True)
+        analysis_store.record_failures(failed, model_name, prompt_version)
+        # Transient errors don't count against the candidate; leave it for the next pass
+        analysis_store.release(released)
         return {
-            "required_skills": [],
-            "experience_level": "Mid",
-            "location": "",
-            "employment_type": "Full-time",
-            "domain": ""
+            "stale": len(rows),
+            "analyzed": len(computed),
+            "unchanged": len(unchanged),
+            "failed": len(failed),
+            "retryable": bool(released),
         }
 
-    def _rank_candidates(self, candidates: List[Candidate], criteria: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Rank candidates based on search criteria using LLM"""
-        ranked = []
-        for candidate in candidates:
-            # Convert candidate to dict for LLM analysis
-            candidate_data = {
-                "name": candidate.name,
-                "skills": candidate.skills,
-                "experience": candidate.experience,
-                "location": candidate.location,
-                "education": candidate.education
-            }
-            
-            # Get LLM analysis
-            analysis = self.llm.analyze_candidate(candidate_data)
-            
-            # Update candidate score
-            fit_score = analysis.get("fit_score", 75)
-            candidate.score = fit_score
-            self.db.commit()
-            
-            ranked.append({
-                "id": candidate.id,
-                "name": candidate.name,
-                "skills": candidate.skills,
-                "experience": candidate.experience,
-                "location": candidate.location,
-                "score": fit_score,
-                "analysis": analysis
-            })
-        
-        # Sort by score
-        ranked.sort(key=lambda x: x["score"], reverse=True)
-        return ranked
+    def _release_connection(self) -> None:
+        """End the session's transaction before a slow LLM call.
+
+        The connection goes back to the pool instead of sitting idle in
+        transaction; the write after the call checks one out again.
+        """
+        self.db.commit()
+
+    def _analysis_payload(self, profile: Dict[str, Any]) -> Dict[str, Any]:
+        """Candidate fields sent to the LLM (and hashed for the analysis cache)"""
+        return analysis_payload(profile)
+
+    def _result(self, profile: Dict[str, Any], score: float, stage: str, analysis: Optional[Dict[str, Any]], lexical_score: float) -> Dict[str, Any]:
+        return {
+            "id": profile["id"],
+            "name": profile["name"],
+            "skills": profile["skills"],
+            "experience": profile["experience"],
+            "location": profile["location"],
+            "score": score,
+            "stage": stage,
+            "lexical_score": float(lexical_score),
+            "analysis": analysis
+        }
+
+    def _flush_scores(self) -> None:
+        if not score_store.background:
+            with stage("score_flush"):
+                score_store.flush(self.db)
+
+    def _iter_analyses(self, candidate_ids: List[str], payloads: List[Dict[str, Any]]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Analyze candidates with at most RANK_MAX_CONCURRENCY LLM calls in flight.
+
+        Cached analyses are looked up first; the rest are sent in chunks of
+        RANK_BATCH_SIZE candidates per prompt. Yields (input index, analysis)
+        pairs in completion order. A failed or timed-out analysis yields an
+        {"error": ...} entry instead of failing the whole search.
+        """
+        if not payloads:
+            return
+
+        prompt_version = self.llm.ANALYSIS_PROMPT_VERSION
+        model_name = self.llm.model_name
+        keys = [AnalysisCache.make_key(payload, prompt_version, model_name) for payload in payloads]
+        cached = analysis_cache.get_many(keys)
+
+        pending = []
+        for index, key in enumerate(keys):
+            if key in cached:
+                yield index, cached[key]
+            else:
+                pending.append(index)
+        if not pending:
+            return
+
+        chunks = [pending[i:i + RANK_BATCH_SIZE] for i in range(0, len(pending), RANK_BATCH_SIZE)]
+        calls = {
+            number: partial(self._analyze_chunk, [candidate_ids[i] for i in chunk], [payloads[i] for i in chunk])
+            for number, chunk in enumerate(chunks)
+        }
+        for number, chunk_results in run_concurrently(calls):
+            chunk = chunks[number]
+            if isinstance(chunk_results, Exception):
+                chunk_results = [self._llm_error(chunk_results)] * len(chunk)
+            yield from zip(chunk, chunk_results)
+
+    def _analyze_chunk(self, candidate_ids: List[str], payloads: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Analyze one chunk with a single batched prompt.
+
+        Candidates the batch response doesn't cover, or all of them when the
+        response can't be parsed, fall back to individual analyze_candidate
+        calls. Transient and outage errors aren't retried one by one against
+        the same provider: they raise, or fail the rest of the fallbacks.
+        """
+        batch: Dict[str, Dict[str, Any]] = {}
+        if len(payloads) > 1:
+            try:
+                batch = self.llm.analyze_candidates([
+                    {"id": candidate_id, **payload}
+                    for candidate_id, payload in zip(candidate_ids, payloads)
+                ])
+            except LLMOutputError:
+                batch = {}
+
+        results = []
+        analyzed = []
+        outage: Optional[Exception] = None
+        for candidate_id, payload in zip(candidate_ids, payloads):
+            analysis = batch.get(candidate_id)
+            if analysis is None:
+                if outage is not None:
+                    results.append(self._llm_error(outage))
+                    continue
+                try:
+                    analysis = self.llm.analyze_candidate(payload)
+                except Exception as e:
+                    if isinstance(e, (LLMRetryableError, LLMUnavailableError)):
+                        outage = e
+                    results.append(self._llm_error(e))
+                    continue
+            analyzed.append((payload, analysis))
+            results.append(analysis)
+        analysis_cache.set_analyses(analyzed, self.llm.ANALYSIS_PROMPT_VERSION, self.llm.model_name)
+        return results
+
+    def _llm_error(self, error: Exception) -> Dict[str, Any]:
+        """Result entry for a failed LLM call; retryable marks outages worth retrying later"""
+        entry = {"error": str(error)}
+        if isinstance(error, (LLMRetryableError, LLMUnavailableError, TimeoutError)):
+            entry["retryable"] = True
+        return entry
 
     def get_candidate(self, candidate_id: str) -> Dict[str, Any]:
         """Get detailed candidate information"""
-        candidate = self.db.query(Candidate).filter(Candidate.id == candidate_id).first()
+        with stage("db_fetch"):
+            candidate = self.db.query(Candidate).filter(Candidate.id == candidate_id).first()
         if not candidate:
             raise ValueError(f"Candidate {candidate_id} not found")
         
@@ -137,16 +684,19 @@ class CandidateService:
 
     def screen_candidate(self, candidate_id: str) -> Dict[str, Any]:
         """Perform AI-powered screening of a candidate"""
-        candidate = self.db.query(Candidate).filter(Candidate.id == candidate_id).first()
+        with stage("db_fetch"):
+            candidate = self.db.query(Candidate).filter(Candidate.id == candidate_id).first()
         if not candidate:
             raise ValueError(f"Candidate {candidate_id} not found")
-        
-        # Generate screening questions
-        questions = self.llm.generate_screening_questions({
+        profile = {
             "skills": candidate.skills,
             "experience": candidate.experience,
             "education": candidate.education
-        })
+        }
+        self._release_connection()
+        
+        # Generate screening questions
+        questions = self.llm.generate_screening_questions(profile)
         
         # Create screening record
         screening = Screening(
@@ -156,7 +706,8 @@ class CandidateService:
             score=0.0
         )
         self.db.add(screening)
-        self.db.commit()
+        with stage("commit"):
+            self.db.commit()
         
         return {
             "candidate_id": candidate_id,
@@ -164,20 +715,109 @@ class CandidateService:
             "screening_id": screening.id
         }
 
+    def screen_candidates(self, candidate_ids: List[str]) -> Dict[str, Any]:
+        """Screen a shortlist of candidates in one request.
+
+        Candidates are loaded with one query and grouped by their normalized
+        skill set; each group shares one question set generated from the
+        skills alone, through run_concurrently. Experience and education are
+        free text that practically never match between candidates, so keying
+        on them would generate one set per candidate. Use screen_candidate
+        for questions tailored to a candidate's full profile. Screenings for
+        all successful candidates are written in a single flush. Returns a
+        result per requested id, in request order: the screening, or an
+        {"error": ...} entry for unknown candidates and failed generations.
+        """
+        candidate_ids = list(dict.fromkeys(candidate_ids))
+        if len(candidate_ids) > SCREEN_BATCH_MAX_CANDIDATES:
+            raise ValueError(f"At most {SCREEN_BATCH_MAX_CANDIDATES} candidates can be screened at once")
+
+        with stage("db_fetch"):
+            rows = self.db.query(Candidate.id, Candidate.skills).filter(Candidate.id.in_(candidate_ids)).all()
+
+        profiles: Dict[str, Dict[str, Any]] = {}
+        members: Dict[str, List[str]] = {}
+        for row in rows:
+            skills = sorted(normalize_skills(row.skills or []))
+            key = content_hash("screening", skills)
+            profiles[key] = {"skills": skills}
+            members.setdefault(key, []).append(row.id)
+        self._release_connection()
+
+        questions_by_profile = self._generate_questions(profiles)
+
+        results: Dict[str, Dict[str, Any]] = {}
+        screenings = []
+        now = datetime.utcnow()
+        for key, ids in members.items():
+            outcome = questions_by_profile[key]
+            for candidate_id in ids:
+                if "error" in outcome:
+                    results[candidate_id] = {"candidate_id": candidate_id, **outcome}
+                else:
+                    screenings.append({
+                        "candidate_id": candidate_id,
+                        "questions": outcome["questions"],
+                        "answers": [],
+                        "score": 0.0,
+                        "created_at": now,
+                        "updated_at": now,
+                    })
+
+        if screenings:
+            # Core insert: multi-row INSERT ... RETURNING instead of the ORM
+            # flushing a statement per screening. Rows come back in no
+            # particular order; candidate ids are unique within the batch.
+            table = Screening.__table__
+            with stage("commit"):
+                inserted = dict(self.db.execute(
+                    insert(table).returning(table.c.candidate_id, table.c.id), screenings
+                ).all())
+                self.db.commit()
+            for row in screenings:
+                results[row["candidate_id"]] = {
+                    "candidate_id": row["candidate_id"],
+                    "questions": row["questions"],
+                    "screening_id": inserted[row["candidate_id"]]
+                }
+
+        entries = [
+            results.get(candidate_id) or {"candidate_id": candidate_id, "error": f"Candidate {candidate_id} not found"}
+            for candidate_id in candidate_ids
+        ]
+        return {
+            "results": entries,
+            "screened": len(screenings),
+            "failed": len(entries) - len(screenings),
+            "question_sets": len(profiles)
+        }
+
+    def _generate_questions(self, profiles: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Question sets keyed like profiles, as {"questions": [...]} or an {"error": ...} entry"""
+        calls = {key: partial(self.llm.generate_screening_questions, profile) for key, profile in profiles.items()}
+        return {
+            key: self._llm_error(result) if isinstance(result, Exception) else {"questions": result}
+            for key, result in run_concurrently(calls)
+        }
+
     def submit_screening_answers(self, screening_id: int, answers: List[str]) -> Dict[str, Any]:
         """Submit and evaluate screening answers"""
-        screening = self.db.query(Screening).filter(Screening.id == screening_id).first()
+        with stage("db_fetch"):
+            screening = self.db.query(Screening).filter(Screening.id == screening_id).first()
         if not screening:
             raise ValueError(f"Screening {screening_id} not found")
+        questions = screening.questions
+        self._release_connection()
         
         # Use Gemini to evaluate answers
-        evaluation = self.llm.evaluate_screening_answers(screening.questions, answers)
+        evaluation = self.llm.evaluate_screening_answers(questions, answers)
         
         # Update screening record
         screening.answers = answers
         screening.score = evaluation.get("overall_score", 0.0)
         screening.feedback = evaluation.get("feedback", "")
-        self.db.commit()
+        with stage("commit"):
+            self.db.commit()
         
         return {
             "screening_id": screening_id,
@@ -187,4 +827,25 @@ class CandidateService:
             "weaknesses": evaluation.get("weaknesses", []),
             "recommendation": evaluation.get("recommendation", ""),
             "feedback": screening.feedback
-        } 
\ No newline at end of file
+        } 
+
+    # Awaitable variants for the async routes. The session and the LLM SDKs
+    # block, so these run the sync methods on the worker threadpool instead
+    # of the event loop.
+    async def asearch_candidates(self, *args: Any, **kwargs: Any) -> List[Dict[str, Any]]:
+        return await run_in_threadpool(self.search_candidates, *args, **kwargs)
+
+    async def asearch_page(self, *args: Any, **kwargs: Any) -> Dict[str, Any]:
+        return await run_in_threadpool(self.search_page, *args, **kwargs)
+
+    async def aget_candidate(self, candidate_id: str) -> Dict[str, Any]:
+        return await run_in_threadpool(self.get_candidate, candidate_id)
+
+    async def ascreen_candidate(self, candidate_id: str) -> Dict[str, Any]:
+        return await run_in_threadpool(self.screen_candidate, candidate_id)
+
+    async def ascreen_candidates(self, candidate_ids: List[str]) -> Dict[str, Any]:
+        return await run_in_threadpool(self.screen_candidates, candidate_ids)
+
+    async def asubmit_screening_answers(self, screening_id: int, answers: List[str]) -> Dict[str, Any]:
+        return await run_in_threadpool(self.submit_screening_answers, screening_id, answers)
@@ -0,0 +1,350 @@
+"""Background queue for screening question generation and answer evaluation.
+
+Both make an LLM call that can take seconds, so with async=true the API
+records a job in screening_jobs and returns its id; workers in the API
+process run it and the client polls GET /jobs/{id} or passes a callback
+URL (on a host in JOB_CALLBACK_ALLOWED_HOSTS) to be notified.
+The table is the queue, so SQLite works for local runs and several API
+processes can share a PostgreSQL database. Run workers without the API
+(with JOB_WORKERS=0 on the API processes) using:
+
+    python -m app.services.job_queue --workers 8
+"""
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+import argparse
+import os
+import queue
+import sys
+import threading
+import time
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from ..database.models import Candidate, Screening, ScreeningJob, SessionLocal
+from ..llm.errors import LLMRetryableError, LLMUnavailableError
+from ..metrics import JOB_QUEUE_WAIT_SECONDS, JOB_SECONDS
+from .candidate_service import CandidateService
+
+# Worker threads running screening jobs in this process; 0 only enqueues
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+# Seconds between scans for due jobs: retries, jobs enqueued by other
+# processes and jobs left over from a restart
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "2"))
+# Attempts per job when the LLM backend is throttled or down
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+# Base delay before retrying, doubled per attempt
+JOB_RETRY_DELAY = float(os.getenv("JOB_RETRY_DELAY", "5"))
+# A running job not finished after this long is assumed lost with its worker and requeued
+JOB_TIMEOUT = float(os.getenv("JOB_TIMEOUT", "600"))
+# Seconds to wait on a completion callback
+JOB_CALLBACK_TIMEOUT = float(os.getenv("JOB_CALLBACK_TIMEOUT", "5"))
+# Comma-separated hosts completion callbacks may be sent to; empty disables
+# callbacks, so clients can't make the server call arbitrary (internal) URLs
+JOB_CALLBACK_ALLOWED_HOSTS = {
+    host.strip().lower() for host in os.getenv("JOB_CALLBACK_ALLOWED_HOSTS", "").split(",") if host.strip()
+}
+
+JOB_KINDS = ("screen", "evaluate")
+
+
+def job_to_dict(job: ScreeningJob) -> Dict[str, Any]:
+    return {
+        "job_id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "candidate_id": job.candidate_id,
+        "screening_id": job.screening_id,
+        "result": job.result,
+        "error": job.error,
+        "attempts": job.attempts,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        "status_url": f"/jobs/{job.id}",
+    }
+
+
+class JobQueue:
+    """Runs screening LLM work outside the request.
+
+    The screening_jobs table is the source of truth. Enqueued ids are also
+    handed to this process's workers right away; a poller picks up due jobs
+    the in-memory queue doesn't know about (retries, other processes,
+    restarts). Workers claim a job with a conditional UPDATE, so a job runs
+    once even when several processes share the table.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        workers: int = JOB_WORKERS,
+        poll_interval: float = JOB_POLL_INTERVAL
+    ):
+        self.session_factory = session_factory
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self.succeeded = 0
+        self.failed = 0
+        self.retried = 0
+        self.running = 0
+
+    def check_callback_url(self, callback_url: Optional[str]) -> Optional[str]:
+        """Return callback_url if callbacks may be sent there, otherwise raise ValueError"""
+        if callback_url is None:
+            return None
+        if not JOB_CALLBACK_ALLOWED_HOSTS:
+            raise ValueError("Job callbacks are disabled; poll status_url instead")
+        try:
+            parts = urlsplit(callback_url)
+            host = (parts.hostname or "").lower()
+        except ValueError:
+            raise ValueError("callback_url is not a valid URL")
+        if parts.scheme not in ("http", "https") or parts.username or parts.password:
+            raise ValueError("callback_url must be a plain http(s) URL")
+        if host not in JOB_CALLBACK_ALLOWED_HOSTS:
+            raise ValueError(f"callback_url host '{host}' is not allowed")
+        return callback_url
+
+    def enqueue_screening(self, db: Session, candidate_id: str, callback_url: Optional[str] = None) -> Dict[str, Any]:
+        """Queue question generation for a candidate"""
+        if db.query(Candidate.id).filter(Candidate.id == candidate_id).first() is None:
+            raise ValueError(f"Candidate {candidate_id} not found")
+        return self._enqueue(db, ScreeningJob(kind="screen", candidate_id=candidate_id, callback_url=callback_url))
+
+    def enqueue_evaluation(
+        self, db: Session, screening_id: int, answers: List[str], callback_url: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Queue evaluation of submitted screening answers"""
+        screening = db.query(Screening.candidate_id).filter(Screening.id == screening_id).first()
+        if screening is None:
+            raise ValueError(f"Screening {screening_id} not found")
+        return self._enqueue(db, ScreeningJob(
+            kind="evaluate",
+            candidate_id=screening.candidate_id,
+            screening_id=screening_id,
+            payload={"answers": answers},
+            callback_url=callback_url
+        ))
+
+    def _enqueue(self, db: Session, job: ScreeningJob) -> Dict[str, Any]:
+        db.add(job)
+        db.commit()
+        # Without workers here (JOB_WORKERS=0) nothing would drain the queue;
+        # the poller of a process that has them picks the job up instead
+        if self._threads:
+            self._queue.put(job.id)
+        return job_to_dict(job)
+
+    def get(self, db: Session, job_id: str) -> Dict[str, Any]:
+        job = db.get(ScreeningJob, job_id)
+        if job is None:
+            raise ValueError(f"Job {job_id} not found")
+        return job_to_dict(job)
+
+    def start(self) -> None:
+        """Start the workers and the poller; the first poll recovers unfinished jobs"""
+        if self.workers <= 0 or self._threads:
+            return
+        self._stop.clear()
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"job-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        poller = threading.Thread(target=self._poll, name="job-poller", daemon=True)
+        poller.start()
+        self._threads.append(poller)
+
+    def stop(self) -> None:
+        """Stop taking jobs. Jobs still running are requeued by the next process after JOB_TIMEOUT."""
+        if not self._threads:
+            return
+        self._stop.set()
+        for _ in range(self.workers):
+            self._queue.put(None)
+        for thread in self._threads:
+            # An LLM call in flight can take a while; don't hold shutdown for it
+            thread.join(timeout=5)
+        self._threads = []
+
+    def _poll(self) -> None:
+        while not self._stop.is_set():
+            try:
+                for job_id in self.due_jobs():
+                    self._queue.put(job_id)
+            except Exception:
+                # Database unavailable; try again next tick
+                pass
+            self._stop.wait(self.poll_interval)
+
+    def due_jobs(self, limit: int = 100) -> List[str]:
+        """Ids of queued jobs ready to run, after requeueing jobs whose worker was lost.
+
+        A lost job that has used its JOB_MAX_ATTEMPTS is failed instead, so a
+        job that kills its worker every time isn't retried forever.
+        """
+        now = datetime.utcnow()
+        table = ScreeningJob.__table__
+        lost = (table.c.status == "running", table.c.started_at < now - timedelta(seconds=JOB_TIMEOUT))
+        db = self.session_factory()
+        try:
+            db.execute(
+                update(table)
+                .where(*lost, table.c.attempts >= JOB_MAX_ATTEMPTS)
+                .values(status="failed", error="Worker lost while running the job", finished_at=now)
+            )
+            db.execute(
+                update(table)
+                .where(*lost)
+                .values(status="queued", run_after=now)
+            )
+            db.commit()
+            # Keep the local backlog bounded; an id queued twice is skipped by the claim
+            waiting = self._queue.qsize()
+            if waiting >= limit:
+                return []
+            return [
+                job_id for (job_id,) in db.query(ScreeningJob.id)
+                .filter(ScreeningJob.status == "queued", ScreeningJob.run_after <= now)
+                .order_by(ScreeningJob.run_after)
+                .limit(limit - waiting)
+            ]
+        finally:
+            db.close()
+
+    def _work(self) -> None:
+        while True:
+            job_id = self._queue.get()
+            if job_id is None or self._stop.is_set():
+                return
+            try:
+                self.run(job_id)
+            except Exception:
+                # The job stays running and is requeued after JOB_TIMEOUT
+                pass
+
+    def _claim(self, db: Session, job_id: str) -> bool:
+        table = ScreeningJob.__table__
+        claimed = db.execute(
+            update(table)
+            .where(table.c.id == job_id, table.c.status == "queued")
+            .values(status="running", started_at=datetime.utcnow(), attempts=table.c.attempts + 1)
+        ).rowcount
+        db.commit()
+        return claimed == 1
+
+    def run(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Claim and run one job; returns the finished job, or None if another worker has it"""
+        db = self.session_factory()
+        try:
+            if not self._claim(db, job_id):
+                return None
+            job = db.get(ScreeningJob, job_id)
+            JOB_QUEUE_WAIT_SECONDS.labels(job.kind).observe(
+                max(0.0, (job.started_at - job.run_after).total_seconds())
+            )
+            with self._lock:
+                self.running += 1
+            start = time.perf_counter()
+            outcome = "failed"
+            try:
+                result = self._execute(db, job)
+            except (LLMRetryableError, LLMUnavailableError) as e:
+                db.rollback()
+                if job.attempts < JOB_MAX_ATTEMPTS:
+                    outcome = "retried"
+                    job.status = "queued"
+                    job.run_after = datetime.utcnow() + timedelta(seconds=JOB_RETRY_DELAY * 2 ** (job.attempts - 1))
+                else:
+                    job.status = "failed"
+                job.error = str(e)
+            except Exception as e:
+                db.rollback()
+                job.status = "failed"
+                job.error = str(e)
+            else:
+                outcome = "succeeded"
+                job.status = "succeeded"
+                job.result = result
+                job.error = None
+            finally:
+                with self._lock:
+                    self.running -= 1
+            JOB_SECONDS.labels(job.kind, outcome).observe(time.perf_counter() - start)
+
+            if job.status != "queued":
+                job.finished_at = datetime.utcnow()
+            db.commit()
+            with self._lock:
+                setattr(self, outcome, getattr(self, outcome) + 1)
+            finished = job_to_dict(job)
+            callback_url = job.callback_url
+        finally:
+            db.close()
+
+        if finished["status"] != "queued" and callback_url:
+            self._notify(callback_url, finished)
+        return finished
+
+    def _execute(self, db: Session, job: ScreeningJob) -> Dict[str, Any]:
+        service = CandidateService(db)
+        if job.kind == "screen":
+            result = service.screen_candidate(job.candidate_id)
+            job.screening_id = result["screening_id"]
+            return result
+        if job.kind == "evaluate":
+            return service.submit_screening_answers(job.screening_id, job.payload["answers"])
+        raise ValueError(f"Unknown job kind '{job.kind}'")
+
+    def _notify(self, callback_url: str, job: Dict[str, Any]) -> None:
+        """POST the finished job to its callback URL; best effort, no retries"""
+        import httpx
+
+        try:
+            # Checked again: the allowlist may have changed since the job was queued
+            self.check_callback_url(callback_url)
+            # Redirects aren't followed, so an allowed host can't bounce the call elsewhere
+            httpx.post(callback_url, json=job, timeout=JOB_CALLBACK_TIMEOUT, follow_redirects=False)
+        except (ValueError, httpx.HTTPError):
+            pass
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "workers": len([thread for thread in self._threads if thread.name.startswith("job-worker")]),
+            "waiting": self._queue.qsize(),
+            "running": self.running,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "retried": self.retried,
+        }
+
+
+job_queue = JobQueue()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run screening job workers without the API")
+    parser.add_argument("--workers", type=int, default=max(JOB_WORKERS, 1))
+    args = parser.parse_args(argv)
+
+    from ..database.models import init_db
+
+    init_db()
+    workers = JobQueue(workers=args.workers)
+    workers.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        workers.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+from typing import TYPE_CHECKING, Any, Dict, List
+import re
+
+from ..database.skills import normalize_skill, normalize_skills
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Share of the lexical score taken by required-skill overlap; the rest is BM25
+SKILL_WEIGHT = 0.6
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+STOPWORDS = {
+    "a", "an", "and", "the", "with", "for", "in", "of", "or", "to", "who", "at", "on",
+    "developer", "engineer", "candidate", "candidates", "looking", "years", "year", "experience",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    tokens = []
+    for token in TOKEN_RE.findall(str(text).lower()):
+        token = token.rstrip(".")
+        if token and token not in STOPWORDS:
+            tokens.append(normalize_skill(token))
+    return tokens
+
+
+def profile_tokens(profile: Dict[str, Any]) -> List[str]:
+    parts = [" ".join(profile.get("skills") or []), profile.get("experience") or ""]
+    for entry in profile.get("education") or []:
+        if isinstance(entry, dict):
+            parts.append(str(entry.get("degree", "")))
+    return tokenize(" ".join(parts))
+
+
+def lexical_scores(profiles: List[Dict[str, Any]], criteria: Dict[str, Any], query: str) -> "np.ndarray":
+    """Score profiles 0-100 against the query without calling an LLM.
+
+    Combines the fraction of parsed required skills a candidate has with BM25
+    over skills, experience and degrees, computed as matrix operations over
+    the whole candidate set.
+    """
+    # Imported on first search rather than at app import
+    import numpy as np
+
+    n = len(profiles)
+    if n == 0:
+        return np.zeros(0)
+
+    required = criteria.get("required_skills") or []
+    required = normalize_skills(required) if isinstance(required, list) else []
+
+    terms = list(dict.fromkeys(
+        tokenize(query)
+        + [token for skill in required for token in tokenize(skill)]
+        + tokenize(criteria.get("domain") or "")
+    ))
+
+    # Required-skill overlap: (n x r) membership matrix averaged per row
+    if required:
+        skill_sets = [set(normalize_skills(profile.get("skills") or [])) for profile in profiles]
+        membership = np.array([[skill in skills for skill in required] for skills in skill_sets], dtype=float)
+        overlap = membership.mean(axis=1)
+    else:
+        overlap = np.zeros(n)
+
+    # BM25 over the candidate set: (n x t) term-frequency matrix
+    if terms:
+        term_index = {term: j for j, term in enumerate(terms)}
+        tf = np.zeros((n, len(terms)))
+        lengths = np.zeros(n)
+        for i, profile in enumerate(profiles):
+            tokens = profile_tokens(profile)
+            lengths[i] = len(tokens)
+            for token in tokens:
+                j = term_index.get(token)
+                if j is not None:
+                    tf[i, j] += 1
+
+        df = (tf > 0).sum(axis=0)
+        idf = np.log1p((n - df + 0.5) / (df + 0.5))
+        avg_length = lengths.mean() or 1.0
+        norm = K1 * (1 - B + B * lengths / avg_length)
+        bm25 = ((tf * (K1 + 1)) / (tf + norm[:, None]) * idf).sum(axis=1)
+        peak = bm25.max()
+        bm25 = bm25 / peak if peak > 0 else bm25
+    else:
+        bm25 = np.zeros(n)
+
+    if required:
+        combined = SKILL_WEIGHT * overlap + (1 - SKILL_WEIGHT) * bm25
+    else:
+        combined = bm25
+    return np.round(combined * 100, 2)
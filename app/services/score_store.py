@@ -0,0 +1,118 @@
+from typing import Callable, Dict, Optional
+import os
+import threading
+
+from sqlalchemy import bindparam, or_, update
+from sqlalchemy.orm import Session
+
+from ..database.models import Candidate, SessionLocal
+
+# Seconds between background flushes; 0 flushes at the end of every search
+SCORE_FLUSH_INTERVAL = float(os.getenv("SCORE_FLUSH_INTERVAL", "0"))
+
+
+class ScoreStore:
+    """Write-behind buffer for candidate scores.
+
+    Searches record scores here instead of assigning them on the ORM objects,
+    so a search never runs one UPDATE per candidate. Buffered scores are
+    written with a single executemany UPDATE, either at the end of the search
+    or periodically from a background thread.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal, flush_interval: float = SCORE_FLUSH_INTERVAL):
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        self._pending: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.skipped = 0
+        self.written = 0
+
+    def record(self, candidate_id: str, score: float, current: Optional[float] = None) -> None:
+        """Buffer a score update, skipping it when it matches the stored score"""
+        if current is not None and current == score:
+            with self._lock:
+                self.skipped += 1
+                # A newer unchanged score supersedes a buffered different one
+                self._pending.pop(candidate_id, None)
+            return
+        with self._lock:
+            self._pending[candidate_id] = score
+
+    def flush(self, db: Optional[Session] = None) -> int:
+        """Write all buffered scores in one bulk UPDATE; returns rows buffered"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        table = Candidate.__table__
+        stmt = (
+            update(table)
+            .where(table.c.id == bindparam("b_id"))
+            # Rows that already hold this score are left alone (and unlocked)
+            .where(or_(table.c.score.is_(None), table.c.score != bindparam("b_score")))
+            .values(score=bindparam("b_score"))
+        )
+        params = [{"b_id": candidate_id, "b_score": score} for candidate_id, score in pending.items()]
+
+        own_session = db is None
+        if own_session:
+            db = self.session_factory()
+        try:
+            db.execute(stmt, params)
+            db.commit()
+        except Exception:
+            db.rollback()
+            # Put the scores back unless a newer value arrived meanwhile
+            with self._lock:
+                for candidate_id, score in pending.items():
+                    self._pending.setdefault(candidate_id, score)
+            raise
+        finally:
+            if own_session:
+                db.close()
+
+        with self._lock:
+            self.written += len(params)
+        return len(params)
+
+    @property
+    def background(self) -> bool:
+        return self.flush_interval > 0
+
+    def start(self) -> None:
+        """Start the background flush thread when an interval is configured"""
+        if not self.background or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="score-store-flush", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread and write whatever is still buffered"""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                # Scores were re-buffered; try again on the next tick
+                pass
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "pending": len(self._pending),
+            "written": self.written,
+            "skipped": self.skipped,
+        }
+
+
+score_store = ScoreStore()
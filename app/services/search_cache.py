@@ -0,0 +1,55 @@
+from typing import Any, Dict, List, Optional
+import os
+
+from ..llm.cache import LRUCache, content_hash, normalize_query
+
+SEARCH_CACHE_SIZE = int(os.getenv("SEARCH_CACHE_SIZE", "500"))
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", "600"))
+# Larger result sets aren't cached; each page re-ranks them instead
+SEARCH_CACHE_MAX_RESULTS = int(os.getenv("SEARCH_CACHE_MAX_RESULTS", "5000"))
+
+
+class SearchResultCache:
+    """In-process cache of fully ranked search results.
+
+    Keys include the candidate pool version, which every candidate write
+    bumps, so an entry can never outlive a change to the candidates it ranked,
+    and whether vector retrieval narrowed the search, so results ranked
+    before the index was ready aren't served once it is.
+    """
+
+    def __init__(self, max_size: int = SEARCH_CACHE_SIZE, ttl_seconds: float = SEARCH_CACHE_TTL, max_results: int = SEARCH_CACHE_MAX_RESULTS):
+        self.memory = LRUCache(max_size=max_size, ttl_seconds=ttl_seconds)
+        self.max_results = max_results
+
+    @staticmethod
+    def make_key(
+        query: str, filters: Optional[Dict[str, Any]], mode: str, budget: Any, model_name: str, pool_version: int,
+        vector_retrieval: bool = False
+    ) -> str:
+        return content_hash(
+            "search",
+            normalize_query(query),
+            filters or {},
+            mode,
+            [budget.max_calls, budget.max_tokens],
+            model_name,
+            pool_version,
+            vector_retrieval
+        )
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        return self.memory.get(key)
+
+    def set(self, key: str, results: List[Dict[str, Any]]) -> bool:
+        """Cache a ranked result list unless it's too large; returns whether it was stored"""
+        if len(results) > self.max_results:
+            return False
+        self.memory.set(key, results)
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        return self.memory.stats()
+
+
+search_result_cache = SearchResultCache()
@@ -0,0 +1,327 @@
+from datetime import datetime, timedelta
+from typing import Any, Callable, Iterable, List, Optional, Set
+import hashlib
+import json
+import logging
+import os
+import threading
+
+from sqlalchemy import event, select, true
+from sqlalchemy.orm import Session
+
+from ..database.models import Candidate, SessionLocal, bump_pool_version
+from ..metrics import VECTOR_INDEX_ERRORS
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, run a single worker or a Chroma server
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+VECTOR_SEARCH_ENABLED = os.getenv("VECTOR_SEARCH_ENABLED", "true").lower() == "true"
+VECTOR_MODEL = os.getenv("VECTOR_MODEL", "all-MiniLM-L6-v2")
+VECTOR_INDEX_PATH = os.getenv("VECTOR_INDEX_PATH", "./chroma")
+# Chroma server shared by all worker processes; unset keeps an embedded
+# index in VECTOR_INDEX_PATH, owned by one process
+VECTOR_INDEX_HOST = os.getenv("VECTOR_INDEX_HOST")
+VECTOR_INDEX_PORT = int(os.getenv("VECTOR_INDEX_PORT", "8000"))
+# Seconds between scans for candidates written since the last one
+VECTOR_SYNC_INTERVAL = float(os.getenv("VECTOR_SYNC_INTERVAL", "10"))
+# Nearest candidates retrieved per query before LLM ranking
+VECTOR_TOP_K = int(os.getenv("VECTOR_TOP_K", "50"))
+# Most neighbours fetched while looking for VECTOR_TOP_K that pass the
+# search's filters; past this the filters alone narrow the search
+VECTOR_MAX_FETCH = int(os.getenv("VECTOR_MAX_FETCH", "2000"))
+
+# Candidate columns that make up the embedded profile
+PROFILE_FIELDS = ("skills", "experience", "education")
+# Each sync rescans this far back, for writes committed after the previous
+# scan with an earlier updated_at; unchanged profiles are skipped by fingerprint
+SYNC_OVERLAP = timedelta(seconds=60)
+
+
+def profile_text(candidate: Any) -> str:
+    """Flatten the parts of a profile that describe what a candidate can do"""
+    skills = ", ".join(candidate.skills or [])
+    education = "; ".join(
+        " ".join(str(entry.get(key, "")) for key in ("degree", "institution")).strip()
+        for entry in (candidate.education or [])
+        if isinstance(entry, dict)
+    )
+    return f"Skills: {skills}\nExperience: {candidate.experience or ''}\nEducation: {education}"
+
+
+def profile_fingerprint(candidate: Any) -> str:
+    payload = json.dumps([getattr(candidate, field) for field in PROFILE_FIELDS], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CandidateVectorIndex:
+    """Embedding index over candidate profiles, stored in a Chroma collection.
+
+    Search uses it to pull the top-K nearest profiles for a query before any
+    LLM call. An embedded (PersistentClient) index must not be opened by
+    several processes, so only the worker holding the lock file in its
+    directory uses it; the others search without vector retrieval. Set
+    VECTOR_INDEX_HOST to share a Chroma server between all workers instead.
+    The process that indexes runs a background thread that builds the
+    index, then picks up candidates written by any process through their
+    updated_at every VECTOR_SYNC_INTERVAL.
+    """
+
+    def __init__(self, path: str = VECTOR_INDEX_PATH, model_name: str = VECTOR_MODEL, host: Optional[str] = VECTOR_INDEX_HOST):
+        self.path = path
+        self.model_name = model_name
+        self.host = host
+        self._model = None
+        self._collection = None
+        self._owner_lock = None
+        # Guards the collection; embedding happens outside it
+        self._lock = threading.RLock()
+        self._pending_lock = threading.Lock()
+        self._deleted: Set[str] = set()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._synced_at: Optional[datetime] = None
+        self.ready = False
+        self.available = VECTOR_SEARCH_ENABLED
+
+    def _acquire(self) -> bool:
+        """Whether this process may open the index: always for a server, for the lock holder when embedded"""
+        if self.host or self._owner_lock is not None:
+            return True
+        if fcntl is None:
+            return True
+        os.makedirs(self.path, exist_ok=True)
+        lock = open(os.path.join(self.path, ".owner.lock"), "w")
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock.close()
+            return False
+        # Held, with the file open, for the life of the process
+        self._owner_lock = lock
+        return True
+
+    def _load(self):
+        """Import and open the embedding model and collection on first use"""
+        if self._collection is not None:
+            return self._collection
+        with self._lock:
+            if self._collection is None:
+                # Heavy optional dependencies; only imported when search needs them
+                from sentence_transformers import SentenceTransformer
+                import chromadb
+
+                self._model = SentenceTransformer(self.model_name)
+                if self.host:
+                    client = chromadb.HttpClient(host=self.host, port=VECTOR_INDEX_PORT)
+                else:
+                    client = chromadb.PersistentClient(path=self.path)
+                self._collection = client.get_or_create_collection(
+                    "candidates",
+                    metadata={"hnsw:space": "cosine"}
+                )
+        return self._collection
+
+    def _embed(self, texts: List[str]) -> List[List[float]]:
+        return self._model.encode(texts, normalize_embeddings=True).tolist()
+
+    def upsert(self, candidates: Iterable[Any]) -> int:
+        """Embed and store candidates whose profile fingerprint changed"""
+        candidates = list(candidates)
+        if not candidates:
+            return 0
+        collection = self._load()
+        with self._lock:
+            existing = collection.get(ids=[candidate.id for candidate in candidates], include=["metadatas"])
+        known = {
+            candidate_id: (metadata or {}).get("fingerprint")
+            for candidate_id, metadata in zip(existing["ids"], existing["metadatas"])
+        }
+
+        changed = []
+        fingerprints = []
+        for candidate in candidates:
+            fingerprint = profile_fingerprint(candidate)
+            if known.get(candidate.id) != fingerprint:
+                changed.append(candidate)
+                fingerprints.append(fingerprint)
+        if not changed:
+            return 0
+
+        # The slow part; searches keep using the collection meanwhile
+        texts = [profile_text(candidate) for candidate in changed]
+        embeddings = self._embed(texts)
+        with self._lock:
+            collection.upsert(
+                ids=[candidate.id for candidate in changed],
+                embeddings=embeddings,
+                documents=texts,
+                metadatas=[{"fingerprint": fingerprint} for fingerprint in fingerprints]
+            )
+        return len(changed)
+
+    def delete(self, candidate_ids: List[str]) -> None:
+        if candidate_ids:
+            collection = self._load()
+            with self._lock:
+                collection.delete(ids=candidate_ids)
+
+    def _index_where(self, db: Session, condition, batch_size: int) -> int:
+        """Upsert the profiles of candidates matching condition, streamed in batches"""
+        updated = 0
+        # Plain rows, not entities, so the session's identity map doesn't grow to the whole table
+        rows = db.execute(
+            select(Candidate.id, *[getattr(Candidate, field) for field in PROFILE_FIELDS]).where(condition)
+        )
+        for batch in rows.yield_per(batch_size).partitions():
+            updated += self.upsert(batch)
+        return updated
+
+    def _invalidate_searches(self, db: Session) -> None:
+        # Cached searches were narrowed without these profiles
+        with db.get_bind().begin() as conn:
+            bump_pool_version(conn)
+
+    def rebuild(self, db: Session, batch_size: int = 500, candidate_ids: Optional[List[str]] = None) -> int:
+        """Backfill the index from the candidates table, or just the given candidates"""
+        updated = 0
+        if candidate_ids is None:
+            self._synced_at = datetime.utcnow()
+            updated = self._index_where(db, true(), batch_size)
+            self.ready = True
+        else:
+            for start in range(0, len(candidate_ids), batch_size):
+                updated += self._index_where(db, Candidate.id.in_(candidate_ids[start:start + batch_size]), batch_size)
+        if updated:
+            self._invalidate_searches(db)
+        return updated
+
+    def sync(self, db: Session, batch_size: int = 500) -> int:
+        """Index candidates written since the last sync, by this or any other process, and drop deleted ones"""
+        with self._pending_lock:
+            deleted, self._deleted = list(self._deleted), set()
+        self.delete(deleted)
+
+        started = datetime.utcnow()
+        updated = self._index_where(db, Candidate.updated_at >= self._synced_at - SYNC_OVERLAP, batch_size)
+        self._synced_at = started
+        if updated:
+            self._invalidate_searches(db)
+        return updated
+
+    @property
+    def usable(self) -> bool:
+        return self.available and self.ready
+
+    def start_backfill(self, candidate_ids: Optional[List[str]] = None) -> None:
+        """Index in a background thread so startup isn't blocked.
+
+        Without candidate_ids this starts the indexer: a full rebuild, then
+        a sync every VECTOR_SYNC_INTERVAL until stop(). With candidate_ids
+        only those candidates are indexed, right away (rows written with
+        Core inserts, say); the indexer would get to them on its next sync.
+        Does nothing in a process that doesn't own an embedded index.
+        """
+        if not self.available:
+            return
+        if not self._acquire():
+            logger.info("Vector index %s is owned by another process; searching without it here", self.path)
+            self.available = False
+            return
+        if candidate_ids is None and self._thread is not None:
+            return
+
+        def run():
+            db = SessionLocal()
+            try:
+                self.rebuild(db, candidate_ids=candidate_ids)
+                if candidate_ids is not None:
+                    return
+                while not self._stop.wait(VECTOR_SYNC_INTERVAL):
+                    try:
+                        self.sync(db)
+                    except Exception:
+                        VECTOR_INDEX_ERRORS.labels("sync").inc()
+                        logger.exception("Vector index sync failed; retrying next interval")
+                    finally:
+                        db.rollback()
+            except Exception:
+                VECTOR_INDEX_ERRORS.labels("backfill").inc()
+                logger.exception("Vector index backfill failed; search falls back to SQL filtering only")
+                self.available = False
+            finally:
+                db.close()
+
+        thread = threading.Thread(target=run, name="vector-index-backfill", daemon=True)
+        if candidate_ids is None:
+            self._stop.clear()
+            self._thread = thread
+        thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            # An embedding batch in flight can take a while; don't hold shutdown for it
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def mark_deleted(self, candidate_id: str) -> None:
+        with self._pending_lock:
+            self._deleted.add(candidate_id)
+
+    def search(
+        self,
+        query: str,
+        top_k: int = VECTOR_TOP_K,
+        keep: Optional[Callable[[List[str]], Set[str]]] = None,
+        max_fetch: int = VECTOR_MAX_FETCH
+    ) -> Optional[List[str]]:
+        """Ids of the top_k profiles nearest to the query, or None if the index can't be used.
+
+        keep, given a list of ids, returns those the search's filters admit
+        (which also drops candidates deleted by other processes).
+        Neighbours are then fetched in growing rounds until top_k of them
+        pass; if max_fetch neighbours don't yield that many, the filters are
+        selective enough on their own and None is returned.
+        """
+        if not self.usable:
+            return None
+        try:
+            collection = self._load()
+            embedding = self._embed([query])
+            with self._lock:
+                size = collection.count()
+            if not size:
+                return None
+            fetch = top_k
+            while True:
+                fetch = min(fetch, size)
+                with self._lock:
+                    ids = collection.query(query_embeddings=embedding, n_results=max(fetch, 1), include=[])["ids"][0]
+                if keep is None:
+                    return ids[:top_k]
+                kept = keep(ids)
+                nearest = [candidate_id for candidate_id in ids if candidate_id in kept]
+                if len(nearest) >= top_k or fetch >= size:
+                    return nearest[:top_k]
+                if fetch >= max_fetch:
+                    return None
+                fetch = min(fetch * 4, max_fetch)
+        except Exception:
+            VECTOR_INDEX_ERRORS.labels("search").inc()
+            logger.exception("Vector search failed; falling back to SQL filtering only")
+            return None
+
+
+vector_index = CandidateVectorIndex()
+
+
+# Inserts and profile updates are found by the indexer's updated_at scan;
+# deletes leave no row behind, so they are recorded here
+@event.listens_for(Candidate, "after_delete")
+def _candidate_deleted(mapper, connection, target):
+    if vector_index.available:
+        vector_index.mark_deleted(target.id)
@@ -0,0 +1,108 @@
+"""Local stand-in for the Ollama /api/generate endpoint.
+
+Answers every prompt the app builds with deterministic JSON (see
+app.llm.fake_client) after a configurable delay, and injects 429s and 500s
+at configurable rates. Point the app at it with LLM_PROVIDER=ollama and
+OLLAMA_BASE_URL. Run from the repository root:
+
+    python -m benchmarks.fake_llm_server --port 11500 --latency 0.3 --error-rate 0.01
+"""
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app.llm.fake_client import FakeLLMClient
+from app.llm.prompts import estimate_tokens
+
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    config: argparse.Namespace = None
+    rng = random.Random(0)
+    rng_lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: dict) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        # Ollama answers its root path with a liveness message
+        self._send(200, {"status": "Ollama is running"})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        if self.path != "/api/generate":
+            self._send(404, {"error": "not found"})
+            return
+
+        config = self.config
+        with self.rng_lock:
+            roll = self.rng.random()
+            jitter = self.rng.uniform(-config.jitter, config.jitter)
+
+        text = FakeLLMClient.respond(request.get("prompt", ""))
+        if config.output_padding:
+            # Pad object replies to simulate verbose models; unknown fields
+            # are ignored by schema validation
+            reply = json.loads(text)
+            if isinstance(reply, dict):
+                reply["notes"] = "lorem " * config.output_padding
+                text = json.dumps(reply)
+        output_tokens = estimate_tokens(text)
+
+        time.sleep(max(0.0, config.latency + jitter + output_tokens * config.ms_per_token / 1000))
+        if roll < config.rate_limit_rate:
+            self._send(429, {"error": "rate limited"})
+            return
+        if roll < config.rate_limit_rate + config.error_rate:
+            self._send(500, {"error": "simulated failure"})
+            return
+
+        self._send(200, {
+            "model": request.get("model", "fake"),
+            "response": text,
+            "done": True,
+            "prompt_eval_count": estimate_tokens(request.get("prompt", "") + request.get("system", "")),
+            "eval_count": output_tokens,
+        })
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11500)
+    parser.add_argument("--latency", type=float, default=0.3, help="base seconds per call")
+    parser.add_argument("--jitter", type=float, default=0.1, help="+/- seconds of uniform jitter")
+    parser.add_argument("--ms-per-token", type=float, default=0.0, help="extra milliseconds per output token")
+    parser.add_argument("--output-padding", type=int, default=0, help="filler words added to each reply")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of calls answered with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fraction of calls answered with 429")
+    args = parser.parse_args(argv)
+
+    FakeLLMHandler.config = args
+    server = ThreadingHTTPServer((args.host, args.port), FakeLLMHandler)
+    server.daemon_threads = True
+    print(f"fake LLM listening on http://{args.host}:{args.port}", file=sys.stderr, flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
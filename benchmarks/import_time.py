@@ -0,0 +1,118 @@
+"""Check that importing the app is fast and free of side effects.
+
+Imports app.main in fresh interpreters pointed at a database file that
+does not exist, then fails (exit code 1) if the best import time exceeds
+--budget-ms, if the import created the database, or if it pulled in a
+module that should only load on first use (LLM SDKs, numpy, embedding
+libraries). Run from the repository root, e.g. in CI:
+
+    python -m benchmarks.import_time --budget-ms 1500
+
+tests/test_startup.py runs the same check as part of the test suite.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+# Loaded lazily by the code paths that need them, never by `import app.main`
+DEFERRED_MODULES = [
+    "google.generativeai",
+    "numpy",
+    "sentence_transformers",
+    "chromadb",
+]
+
+CHILD = """
+import json, sys, time
+started = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - started
+deferred = json.loads(sys.argv[1])
+print(json.dumps({
+    "seconds": elapsed,
+    "loaded": [name for name in deferred if name in sys.modules],
+}))
+"""
+
+
+def parse_importtime(stderr: str, top: int, root: str = "app.main"):
+    """Slowest modules imported directly by root, from `python -X importtime` output"""
+    children = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line.split(":", 1)[1].split("|")
+        # Two spaces of indent per nesting level; a module's imports are
+        # printed before the module itself
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 1:
+            children.append((int(cumulative_us), name.strip()))
+        elif depth == 0:
+            if name.strip() == root:
+                break
+            children = []
+    children.sort(reverse=True)
+    return [{"module": name, "ms": round(us / 1000, 1)} for us, name in children[:top]]
+
+
+def run_once(env: dict, importtime: bool = False) -> dict:
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    command += ["-c", CHILD, json.dumps(DEFERRED_MODULES)]
+    result = subprocess.run(command, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"importing app.main failed:\n{result.stderr}")
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    if importtime:
+        report["stderr"] = result.stderr
+    return report
+
+
+def check(budget_ms: float = 1500.0, repeat: int = 5, top: int = 10) -> dict:
+    """Import app.main repeat times plus once profiled; the report lists any failures"""
+    tmp_dir = tempfile.mkdtemp(prefix="import-bench-")
+    database_path = os.path.join(tmp_dir, "never-created.db")
+    env = dict(os.environ)
+    env.update({"DATABASE_URL": f"sqlite:///{database_path}", "LLM_PROVIDER": "gemini"})
+
+    runs = [run_once(env) for _ in range(repeat)]
+    profile = run_once(env, importtime=True)
+    best_ms = min(run["seconds"] for run in runs) * 1000
+
+    failures = []
+    if best_ms > budget_ms:
+        failures.append(f"import took {best_ms:.0f}ms, budget is {budget_ms:.0f}ms")
+    if os.path.exists(database_path):
+        failures.append("importing the app created the database")
+    loaded = sorted({name for run in runs + [profile] for name in run["loaded"]})
+    if loaded:
+        failures.append(f"imported at startup: {', '.join(loaded)}")
+
+    return {
+        "best_ms": round(best_ms, 1),
+        "runs_ms": [round(run["seconds"] * 1000, 1) for run in runs],
+        "budget_ms": budget_ms,
+        "slowest_imports": parse_importtime(profile["stderr"], top),
+        "failures": failures,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=1500.0)
+    parser.add_argument("--repeat", type=int, default=5, help="imports to run; the fastest is compared")
+    parser.add_argument("--top", type=int, default=10, help="slowest direct imports of app.main to report")
+    args = parser.parse_args(argv)
+
+    report = check(args.budget_ms, args.repeat, args.top)
+    json.dump(report, sys.stdout, indent=2)
+    print()
+    return 1 if report["failures"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
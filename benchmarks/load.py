@@ -0,0 +1,290 @@
+"""Load-test the API against a fake LLM at several candidate pool sizes.
+
+For each --rows value this seeds a fresh database, starts the fake LLM
+server and the app under uvicorn as subprocesses, drives each endpoint
+with --concurrency closed-loop clients and prints JSON results
+(throughput and p50/p95/p99 latency per endpoint). Run from the
+repository root:
+
+    python -m benchmarks.load --rows 1000 10000 100000 --concurrency 16 --output bench.json
+
+Pass --database-url to run against a local Postgres instead of a
+throwaway SQLite file; the database is reset before seeding. Repeated
+searches are served from the result caches after warm-up; pass --cold to
+measure the uncached pipeline. Searches analyze candidates inline within
+the LLM budget; pass --precompute to analyze every seeded candidate
+before the app starts and serve searches from the stored analyses.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+
+QUERIES = [
+    "Senior Python engineer with AWS experience",
+    "React and TypeScript frontend developer in New York",
+    "Kubernetes and Terraform DevOps engineer",
+    "Machine learning engineer with PyTorch",
+    "Java Spring Boot backend developer in Berlin",
+    "Go developer with Kafka and PostgreSQL",
+    "Lead data engineer with Spark and Airflow",
+    "Full stack developer Node.js GraphQL remote",
+]
+
+ANSWER = (
+    "I would start by profiling the hot path, then add caching where reads dominate, "
+    "keep writes idempotent and roll out behind a feature flag with metrics on latency and errors."
+)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_up(url: str, process: subprocess.Popen, timeout: float = 120.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{url} exited with code {process.returncode} before becoming ready")
+        try:
+            if httpx.get(url, timeout=1.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} did not become ready within {timeout}s")
+
+
+def percentile(sorted_values: List[float], p: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    # Nearest-rank method
+    index = max(0, math.ceil(p / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def summarize(latencies: List[float], statuses: Dict[str, int], errors: int, elapsed: float) -> Dict[str, Any]:
+    ordered = sorted(latencies)
+    ms = lambda value: round(value * 1000, 2) if value is not None else None  # noqa: E731
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "status_counts": statuses,
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else None,
+        "mean_ms": ms(sum(ordered) / len(ordered)) if ordered else None,
+        "p50_ms": ms(percentile(ordered, 50)),
+        "p95_ms": ms(percentile(ordered, 95)),
+        "p99_ms": ms(percentile(ordered, 99)),
+    }
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    make_request: Callable[[int], Any],
+    requests: int,
+    concurrency: int,
+    on_response: Optional[Callable[[httpx.Response], None]] = None,
+) -> Dict[str, Any]:
+    """Issue `requests` calls from `concurrency` closed-loop workers"""
+    counter = iter(range(requests))
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            method, url, body = make_request(i)
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, url, json=body)
+            except httpx.HTTPError:
+                errors += 1
+                statuses["transport_error"] = statuses.get("transport_error", 0) + 1
+                continue
+            latencies.append(time.perf_counter() - started)
+            status = str(response.status_code)
+            statuses[status] = statuses.get(status, 0) + 1
+            if response.status_code >= 400:
+                errors += 1
+            elif on_response is not None:
+                on_response(response)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, statuses, errors, time.perf_counter() - started)
+
+
+async def run_load(base_url: str, rows: int, args: argparse.Namespace) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    candidate_ids = [f"bench-{rng.randrange(rows)}" for _ in range(args.requests)]
+    screening_ids: List[int] = []
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        search = lambda i: ("POST", "/search", {"query": QUERIES[i % len(QUERIES)], "limit": 20})  # noqa: E731
+        # Warm connections and the query-parse cache so runs compare steady state
+        await run_scenario(client, search, args.warmup, args.concurrency)
+
+        results = {}
+        results["search"] = await run_scenario(client, search, args.requests, args.concurrency)
+        results["candidate"] = await run_scenario(
+            client, lambda i: ("GET", f"/candidate/{candidate_ids[i]}", None), args.requests, args.concurrency
+        )
+        results["screen"] = await run_scenario(
+            client, lambda i: ("POST", f"/candidate/{candidate_ids[i]}/screen", None), args.requests, args.concurrency,
+            on_response=lambda response: screening_ids.append(response.json()["screening_id"])
+        )
+        if screening_ids:
+            results["submit"] = await run_scenario(
+                client,
+                lambda i: ("POST", f"/screening/{screening_ids[i % len(screening_ids)]}/submit", {"answers": [ANSWER] * 5}),
+                args.requests, args.concurrency
+            )
+        shortlist = 50
+        results["screen_batch"] = await run_scenario(
+            client,
+            lambda i: ("POST", "/candidates/screen", {
+                "candidate_ids": [candidate_ids[(i * shortlist + j) % len(candidate_ids)] for j in range(shortlist)]
+            }),
+            max(1, args.requests // shortlist), args.concurrency
+        )
+        results["screen_queued"] = await run_scenario(
+            client, lambda i: ("POST", f"/candidate/{candidate_ids[i]}/screen?async=true", None), args.requests,
+            args.concurrency
+        )
+        return results
+
+
+def run_size(rows: int, args: argparse.Namespace) -> Dict[str, Any]:
+    tmp_dir = tempfile.mkdtemp(prefix="load-bench-")
+    database_url = args.database_url or f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}"
+    llm_port, app_port = free_port(), free_port()
+
+    env = dict(os.environ)
+    env.update({
+        "DATABASE_URL": database_url,
+        "LLM_PROVIDER": "ollama",
+        "LLM_MODEL": "fake",
+        "OLLAMA_BASE_URL": f"http://127.0.0.1:{llm_port}",
+        # Embedding retrieval depends on a model download; keep runs comparable
+        "VECTOR_SEARCH_ENABLED": "false",
+        # Analyses are either all stored up front or all computed during the run
+        "ANALYSIS_PRECOMPUTE": "true" if args.precompute else "false",
+        "ANALYSIS_REFRESH_INTERVAL": "0",
+    })
+    if args.cold:
+        # Every request pays for query parsing, ranking and analysis
+        env.update({
+            "SEARCH_CACHE_SIZE": "0",
+            "QUERY_CACHE_SIZE": "0",
+            "QUERY_CACHE_PERSIST": "false",
+            "ANALYSIS_CACHE_SIZE": "0",
+            "ANALYSIS_CACHE_PERSIST": "false",
+        })
+
+    seed_started = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-m", "benchmarks.seed", "--rows", str(rows), "--seed", str(args.seed), "--reset"],
+        env=env, check=True
+    )
+    seed_seconds = time.perf_counter() - seed_started
+
+    llm = subprocess.Popen([
+        sys.executable, "-m", "benchmarks.fake_llm_server", "--port", str(llm_port),
+        "--latency", str(args.llm_latency), "--jitter", str(args.llm_jitter),
+        "--ms-per-token", str(args.llm_ms_per_token), "--output-padding", str(args.llm_output_padding),
+        "--error-rate", str(args.llm_error_rate), "--rate-limit-rate", str(args.llm_rate_limit_rate),
+    ], env=env)
+    precompute_seconds = None
+    try:
+        if args.precompute:
+            wait_until_up(f"http://127.0.0.1:{llm_port}/", llm)
+            precompute_started = time.perf_counter()
+            subprocess.run([sys.executable, "-m", "app.services.analysis_store"], env=env, check=True)
+            precompute_seconds = time.perf_counter() - precompute_started
+    except BaseException:
+        llm.terminate()
+        raise
+    app = subprocess.Popen([
+        sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(app_port),
+        "--workers", str(args.workers), "--log-level", "warning",
+    ], env=env)
+    try:
+        wait_until_up(f"http://127.0.0.1:{app_port}/", app)
+        results = asyncio.run(run_load(f"http://127.0.0.1:{app_port}", rows, args))
+    finally:
+        for process in (app, llm):
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+    report = {"rows": rows, "seed_seconds": round(seed_seconds, 2), "endpoints": results}
+    if precompute_seconds is not None:
+        report["precompute_seconds"] = round(precompute_seconds, 2)
+    return report
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--database-url", help="run against this database instead of a temporary SQLite file")
+    parser.add_argument("--requests", type=int, default=200, help="requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--cold", action="store_true", help="disable the search, query-parse and analysis caches")
+    parser.add_argument("--precompute", action="store_true", help="store every candidate's analysis before the run")
+    parser.add_argument("--llm-latency", type=float, default=0.3)
+    parser.add_argument("--llm-jitter", type=float, default=0.1)
+    parser.add_argument("--llm-ms-per-token", type=float, default=0.0)
+    parser.add_argument("--llm-output-padding", type=int, default=0)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--llm-rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    report = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "database_url")},
+        "database": "postgresql" if args.database_url and args.database_url.startswith("postgres") else "sqlite",
+        "runs": [run_size(rows, args) for rows in args.rows],
+    }
+
+    json.dump(report, sys.stdout, indent=2)
+    print()
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
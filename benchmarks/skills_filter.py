@@ -0,0 +1,124 @@
+"""Compare skill filtering via JSON scans against the candidate_skills index.
+
+Builds a throwaway SQLite database with synthetic candidates and times
+multi-skill filters both ways. Run from the repository root:
+
+    python -m benchmarks.skills_filter --rows 100000
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+TMP_DIR = tempfile.mkdtemp(prefix="skills-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(TMP_DIR, 'bench.db')}"
+
+from sqlalchemy import String, cast, func, select  # noqa: E402
+
+from app.database.models import Candidate, CandidateSkill, SessionLocal, get_engine, init_db  # noqa: E402
+from app.database.skills import normalize_skills  # noqa: E402
+
+SKILL_POOL = [
+    "Python", "JavaScript", "TypeScript", "Java", "Go", "Rust", "C++", "C#", "Ruby", "PHP",
+    "React", "Vue", "Angular", "Node.js", "Django", "FastAPI", "Flask", "Spring Boot", "Rails", "Laravel",
+    "AWS", "Google Cloud", "Azure", "Docker", "Kubernetes", "Terraform", "Ansible", "Jenkins", "GitHub Actions", "Linux",
+    "PostgreSQL", "MySQL", "MongoDB", "Redis", "Elasticsearch", "Kafka", "RabbitMQ", "Spark", "Airflow", "Snowflake",
+    "Machine Learning", "PyTorch", "TensorFlow", "Pandas", "NumPy", "GraphQL", "REST", "gRPC", "Swift", "Kotlin",
+]
+
+QUERIES = [
+    ["Python"],
+    ["Python", "AWS"],
+    ["Kubernetes", "Go", "Terraform"],
+    ["React", "TypeScript", "GraphQL", "Node.js"],
+]
+
+
+def seed(rows: int, batch_size: int = 10000) -> None:
+    rng = random.Random(42)
+    with get_engine().begin() as conn:
+        for start in range(0, rows, batch_size):
+            candidates = []
+            links = []
+            for i in range(start, min(start + batch_size, rows)):
+                skills = rng.sample(SKILL_POOL, rng.randint(3, 8))
+                candidate_id = f"bench-{i}"
+                candidates.append({
+                    "id": candidate_id,
+                    "name": f"Candidate {i}",
+                    "email": f"candidate{i}@bench.example.com",
+                    "location": "Remote",
+                    "skills": skills,
+                    "experience": "Engineer",
+                    "score": 0.0,
+                    "status": "new",
+                })
+                links.extend({"candidate_id": candidate_id, "skill": name} for name in normalize_skills(skills))
+            conn.execute(Candidate.__table__.insert(), candidates)
+            conn.execute(CandidateSkill.__table__.insert(), links)
+
+
+def json_scan_query(skills):
+    stmt = select(func.count()).select_from(Candidate)
+    for skill in skills:
+        stmt = stmt.where(cast(Candidate.skills, String).ilike(f'%"{skill}"%'))
+    return stmt
+
+
+def index_query(skills):
+    names = normalize_skills(skills)
+    matches = select(CandidateSkill.candidate_id).where(CandidateSkill.skill.in_(names))
+    if len(names) > 1:
+        matches = matches.group_by(CandidateSkill.candidate_id).having(func.count(CandidateSkill.skill) == len(names))
+    return select(func.count()).select_from(Candidate).where(Candidate.id.in_(matches))
+
+
+def time_query(db, stmt, repeat: int):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = db.execute(stmt).scalar()
+        timings.append((time.perf_counter() - started) * 1000)
+    return result, statistics.median(timings)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    init_db()
+    started = time.perf_counter()
+    seed(args.rows)
+    seed_seconds = time.perf_counter() - started
+
+    results = []
+    db = SessionLocal()
+    try:
+        for skills in QUERIES:
+            scan_count, scan_ms = time_query(db, json_scan_query(skills), args.repeat)
+            index_count, index_ms = time_query(db, index_query(skills), args.repeat)
+            results.append({
+                "skills": skills,
+                "matches": index_count,
+                "counts_agree": scan_count == index_count,
+                "json_scan_ms": round(scan_ms, 2),
+                "index_ms": round(index_ms, 2),
+                "speedup": round(scan_ms / index_ms, 1) if index_ms else None,
+            })
+    finally:
+        db.close()
+
+    json.dump({"rows": args.rows, "seed_seconds": round(seed_seconds, 2), "queries": results}, sys.stdout, indent=2)
+    print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+import os
+import tempfile
+
+# Settings are read when app modules are imported, so they're set first
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/test.db")
+os.environ.setdefault("LLM_PROVIDER", "fake")
+os.environ.setdefault("FAKE_LLM_LATENCY", "0")
+os.environ.setdefault("FAKE_LLM_JITTER", "0")
+os.environ.setdefault("LLM_MAX_RETRIES", "0")
+os.environ.setdefault("VECTOR_SEARCH_ENABLED", "false")
+os.environ.setdefault("ANALYSIS_CACHE_PERSIST", "false")
+os.environ.setdefault("QUERY_CACHE_PERSIST", "false")
+os.environ.setdefault("JOB_WORKERS", "0")
+
+import pytest
+
+from app.database.models import Candidate, SessionLocal, init_db, reset_db
+from app.llm import resilience
+from app.llm.cache import analysis_cache, query_parse_cache
+from app.llm.registry import get_llm_client
+from app.services.search_cache import search_result_cache
+
+
+@pytest.fixture
+def db():
+    """Session on freshly created tables, with the in-process caches emptied"""
+    reset_db()
+    init_db()
+    for cache in (search_result_cache, analysis_cache, query_parse_cache):
+        cache.memory.clear()
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    """The shared FakeLLMClient with a fresh resilience policy: no retries, breaker after 2 failures"""
+    policy = resilience.ResiliencePolicy(
+        limiter=resilience.AdaptiveRateLimiter(None, None),
+        breaker=resilience.CircuitBreaker(failure_threshold=2, reset_timeout=0.05),
+        max_retries=0
+    )
+    monkeypatch.setitem(resilience._policies, "fake", policy)
+    return get_llm_client()
+
+
+def add_candidates(db, *candidates):
+    """Insert candidates through the ORM so skill links and location columns are derived"""
+    rows = []
+    for index, fields in enumerate(candidates):
+        values = {
+            "name": f"Candidate {index}",
+            "email": f"candidate{index}@example.com",
+            "location": "Berlin, Germany",
+            "skills": ["python"],
+            "experience": "5 years building web services",
+        }
+        values.update(fields)
+        rows.append(Candidate(**values))
+    db.add_all(rows)
+    db.commit()
+    return rows
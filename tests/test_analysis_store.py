@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy.exc import OperationalError
+
+from app.database.models import CandidateAnalysis
+from app.llm.registry import get_llm_client
+from app.services import analysis_store as analysis_store_module
+from app.services.analysis_store import AnalysisRefresher, analysis_store
+from app.services.candidate_service import CandidateService
+
+from conftest import add_candidates
+
+
+def claim(db, limit=10):
+    llm = get_llm_client()
+    return analysis_store.claim_stale(db, llm.model_name, llm.ANALYSIS_PROMPT_VERSION, limit)
+
+
+def test_claims_do_not_overlap(db):
+    add_candidates(db, *[{} for _ in range(5)])
+
+    first = claim(db, limit=3)
+    second = claim(db, limit=3)
+    assert len(first) == 3
+    assert len(second) == 2
+    assert not {row["id"] for row in first} & {row["id"] for row in second}
+    assert claim(db) == []
+
+
+def test_expired_and_released_claims_are_taken_again(db):
+    add_candidates(db, {}, {})
+    first, second = [row["id"] for row in claim(db)]
+
+    analysis_store.release([first])
+    db.get(CandidateAnalysis, second).claimed_until = datetime.utcnow() - timedelta(seconds=1)
+    db.commit()
+    assert {row["id"] for row in claim(db)} == {first, second}
+
+
+def test_refresh_analyzes_each_candidate_once(db, llm):
+    candidates = add_candidates(db, *[{} for _ in range(5)])
+
+    refresher = AnalysisRefresher(batch_size=2)
+    assert refresher.refresh() == 5
+    assert refresher.refresh() == 0
+    db.expire_all()
+    rows = db.query(CandidateAnalysis).all()
+    assert len(rows) == 5
+    assert all(row.analysis and not row.dirty and row.claimed_until is None for row in rows)
+
+    # A profile edit makes the stored analysis stale; other fields don't
+    candidates[0].experience = "12 years of Rust"
+    candidates[1].status = "contacted"
+    db.commit()
+    assert [row["id"] for row in claim(db)] == [candidates[0].id]
+
+
+def test_transient_errors_release_the_claim(db, llm, monkeypatch):
+    add_candidates(db, {})
+    monkeypatch.setattr(llm, "error_rate", 1.0)
+
+    result = CandidateService(db).refresh_analyses(10)
+    assert result["retryable"]
+    row = db.query(CandidateAnalysis).one()
+    assert (row.dirty, row.attempts, row.claimed_until) == (True, 0, None)
+
+
+def test_failed_inline_writes_are_counted(db, llm, monkeypatch, caplog):
+    candidate = add_candidates(db, {})[0]
+
+    class Unavailable:
+        dialect = analysis_store_module.get_engine().dialect
+
+        def begin(self):
+            raise OperationalError("INSERT", {}, Exception("database is locked"))
+
+    monkeypatch.setattr(analysis_store_module, "get_engine", Unavailable)
+    errors = analysis_store.stats()["write_errors"]
+    CandidateService(db)._store_analyses(
+        [(candidate.id, {"skills": ["python"]}, {"fit_score": 70})], llm.model_name, llm.ANALYSIS_PROMPT_VERSION
+    )
+    assert analysis_store.stats()["write_errors"] == errors + 1
+    assert "Storing 1 inline analyses failed" in caplog.text
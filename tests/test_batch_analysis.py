@@ -0,0 +1,60 @@
+import pytest
+
+from app.llm.errors import LLMOutputError, LLMRateLimitError, LLMUnavailableError
+from app.services.candidate_service import CandidateService
+
+PAYLOADS = [
+    {"name": f"Candidate {index}", "skills": ["python"], "experience": f"{index} years", "location": "Berlin",
+     "education": None}
+    for index in range(4)
+]
+IDS = [f"c{index}" for index in range(4)]
+
+
+@pytest.fixture
+def calls(llm, monkeypatch):
+    """Counts single-candidate fallback calls"""
+    calls = []
+    analyze_candidate = llm.analyze_candidate
+
+    def counted(payload):
+        calls.append(payload["name"])
+        return analyze_candidate(payload)
+
+    monkeypatch.setattr(llm, "analyze_candidate", counted)
+    return calls
+
+
+def test_one_prompt_per_chunk(db, calls):
+    results = CandidateService(db)._analyze_chunk(IDS, PAYLOADS)
+    assert all("fit_score" in result for result in results)
+    assert calls == []
+
+
+def test_unparseable_batch_falls_back_per_candidate(db, llm, calls, monkeypatch):
+    def malformed(candidates):
+        raise LLMOutputError("Malformed analysis response")
+
+    monkeypatch.setattr(llm, "analyze_candidates", malformed)
+    results = CandidateService(db)._analyze_chunk(IDS, PAYLOADS)
+    assert all("fit_score" in result for result in results)
+    assert len(calls) == 4
+
+
+def test_missing_ids_fall_back_per_candidate(db, llm, calls, monkeypatch):
+    analyze_candidates = llm.analyze_candidates
+    monkeypatch.setattr(llm, "analyze_candidates", lambda candidates: analyze_candidates(candidates[:3]))
+    results = CandidateService(db)._analyze_chunk(IDS, PAYLOADS)
+    assert all("fit_score" in result for result in results)
+    assert calls == ["Candidate 3"]
+
+
+@pytest.mark.parametrize("error", [LLMRateLimitError("throttled"), LLMUnavailableError("circuit open")])
+def test_outages_are_not_retried_per_candidate(error, db, llm, calls, monkeypatch):
+    def fail(candidates):
+        raise error
+
+    monkeypatch.setattr(llm, "analyze_candidates", fail)
+    results = dict(CandidateService(db)._iter_analyses(IDS, PAYLOADS))
+    assert calls == []
+    assert all(results[index]["retryable"] for index in range(4))
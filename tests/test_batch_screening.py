@@ -0,0 +1,63 @@
+import pytest
+
+from app.database.models import Screening
+from app.services import candidate_service
+from app.services.candidate_service import CandidateService
+
+from conftest import add_candidates
+
+
+@pytest.fixture
+def generated(llm, monkeypatch):
+    """Skill sets question generation was called with"""
+    generated = []
+    generate = llm.generate_screening_questions
+
+    def counted(profile):
+        generated.append(profile["skills"])
+        return generate(profile)
+
+    monkeypatch.setattr(llm, "generate_screening_questions", counted)
+    return generated
+
+
+def test_candidates_with_the_same_skills_share_a_question_set(db, generated):
+    ada, bob, cleo = add_candidates(
+        db,
+        {"skills": ["Python", "SQL"], "experience": "10 years of data work"},
+        {"skills": ["sql", "python"], "experience": "2 years of web work"},
+        {"skills": ["go"]},
+    )
+
+    report = CandidateService(db).screen_candidates([ada.id, "missing", bob.id, cleo.id, ada.id])
+    assert (report["screened"], report["failed"], report["question_sets"]) == (3, 1, 2)
+    assert sorted(generated) == [["go"], ["python", "sql"]]
+
+    results = report["results"]
+    assert [result["candidate_id"] for result in results] == [ada.id, "missing", bob.id, cleo.id]
+    assert results[1]["error"] == "Candidate missing not found"
+    assert results[0]["questions"] == results[2]["questions"]
+    assert db.get(Screening, results[3]["screening_id"]).candidate_id == cleo.id
+    assert db.query(Screening).count() == 3
+
+
+def test_failed_generation_fails_only_its_group(db, llm, monkeypatch):
+    ada, bob = add_candidates(db, {"skills": ["python"]}, {"skills": ["rust"]})
+    generate = llm.generate_screening_questions
+
+    def flaky(profile):
+        if profile["skills"] == ["rust"]:
+            raise ValueError("model refused")
+        return generate(profile)
+
+    monkeypatch.setattr(llm, "generate_screening_questions", flaky)
+    report = CandidateService(db).screen_candidates([ada.id, bob.id])
+    assert (report["screened"], report["failed"]) == (1, 1)
+    assert "error" in report["results"][1]
+    assert db.query(Screening).count() == 1
+
+
+def test_too_many_candidates(db, monkeypatch):
+    monkeypatch.setattr(candidate_service, "SCREEN_BATCH_MAX_CANDIDATES", 2)
+    with pytest.raises(ValueError):
+        CandidateService(db).screen_candidates(["a", "b", "c"])
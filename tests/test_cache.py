@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta
+
+from app.database.models import LLMCacheEntry
+from app.llm.cache import AnalysisCache, analysis_cache, normalize_query
+from app.services.candidate_service import CandidateService
+
+
+def test_normalize_query_ignores_case_punctuation_and_order():
+    assert normalize_query("Senior Python developer, Berlin") == normalize_query("berlin python   senior DEVELOPER")
+
+
+def test_normalize_query_keeps_negations():
+    assert normalize_query("python developer not java") != normalize_query("python java developer")
+    assert normalize_query("python without java") != normalize_query("python with java")
+
+
+def test_normalize_query_keeps_repeated_tokens():
+    assert normalize_query("go go developer") != normalize_query("go developer")
+
+
+PAYLOAD = {"skills": ["python"], "experience": "5 years", "education": None}
+
+
+def test_analysis_key_covers_payload_prompt_version_and_model():
+    key = AnalysisCache.make_key(PAYLOAD, "3", "fake")
+    assert key == AnalysisCache.make_key(dict(reversed(PAYLOAD.items())), "3", "fake")
+    assert key != AnalysisCache.make_key({**PAYLOAD, "experience": "6 years"}, "3", "fake")
+    assert key != AnalysisCache.make_key(PAYLOAD, "4", "fake")
+    assert key != AnalysisCache.make_key(PAYLOAD, "3", "other")
+
+
+def test_persisted_entries_are_shared_between_processes(db):
+    writer = AnalysisCache(persist=True)
+    writer.set_analyses([(PAYLOAD, {"fit_score": 80}), ({**PAYLOAD, "skills": ["go"]}, {"fit_score": 60})], "3", "fake")
+    assert db.query(LLMCacheEntry).count() == 2
+
+    # A fresh cache has an empty memory tier, as in another worker
+    reader = AnalysisCache(persist=True)
+    assert reader.get_analysis(PAYLOAD, "3", "fake") == {"fit_score": 80}
+    assert reader.stats()["db_hits"] == 1
+    assert reader.get_analysis(PAYLOAD, "4", "fake") is None
+
+
+def test_set_many_overwrites_existing_rows(db):
+    cache = AnalysisCache(persist=True)
+    cache.set_analyses([(PAYLOAD, {"fit_score": 80})], "3", "fake")
+    cache.set_analyses([(PAYLOAD, {"fit_score": 90})], "3", "fake")
+    assert [entry.value for entry in db.query(LLMCacheEntry)] == [{"fit_score": 90}]
+
+
+def test_expired_rows_are_misses_and_pruned(db):
+    cache = AnalysisCache(persist=True, ttl_seconds=60)
+    cache.set_analyses([(PAYLOAD, {"fit_score": 80})], "3", "fake")
+    db.query(LLMCacheEntry).update({"created_at": datetime.utcnow() - timedelta(seconds=61)})
+    db.commit()
+
+    cache.memory.clear()
+    assert cache.get_analysis(PAYLOAD, "3", "fake") is None
+    assert cache.prune() == 1
+
+
+def test_analyzed_chunk_is_cached_in_one_write(db, llm, monkeypatch):
+    writes = []
+    monkeypatch.setattr(analysis_cache, "set_many", lambda entries, **attrs: writes.append(entries))
+    payloads = [{**PAYLOAD, "skills": [skill]} for skill in ("python", "go", "rust")]
+
+    CandidateService(db)._analyze_chunk(["a", "b", "c"], payloads)
+    assert len(writes) == 1
+    assert set(writes[0]) == {
+        AnalysisCache.make_key(payload, llm.ANALYSIS_PROMPT_VERSION, llm.model_name) for payload in payloads
+    }
@@ -0,0 +1,78 @@
+import io
+
+from app.database.models import Candidate, CandidateSkill
+from app.services.candidate_import import import_candidates
+
+from conftest import add_candidates
+
+CSV = b"""name,email,location,skills,experience,team
+Ada,ada@example.com,"London, UK",python;sql,10 years,platform
+Bob,bob@example.com,Berlin,"[""Go"", ""Docker""]",4 years,
+Ada Again,ADA@example.com,London,python,10 years,
+Existing,taken@example.com,Paris,java,2 years,
+No Skills,noskills@example.com,Paris,,2 years,
+Cleo,cleo@example.com,Madrid,rust,3 years,
+"""
+
+
+def test_import_dedupes_within_file_and_against_db(db):
+    add_candidates(db, {"email": "taken@example.com"})
+
+    result = import_candidates(io.BytesIO(CSV), "csv", batch_size=2)
+    report = result.to_dict()
+
+    assert (report["rows"], report["inserted"], report["duplicates"], report["invalid"]) == (6, 3, 2, 1)
+    assert {(error["row"], error["email"]) for error in report["errors"]} == {
+        (3, "ada@example.com"), (4, "taken@example.com"), (5, "noskills@example.com")
+    }
+
+    emails = {email for (email,) in db.query(Candidate.email)}
+    assert emails == {"taken@example.com", "ada@example.com", "bob@example.com", "cleo@example.com"}
+    assert set(result.inserted_ids) == {
+        candidate_id for (candidate_id,) in db.query(Candidate.id).filter(Candidate.email != "taken@example.com")
+    }
+
+    ada = db.query(Candidate).filter(Candidate.email == "ada@example.com").one()
+    assert ada.skills == ["python", "sql"]
+    assert ada.candidate_metadata == {"team": "platform"}
+    assert ada.location_city == "london"
+    assert {skill for (skill,) in db.query(CandidateSkill.skill).filter(CandidateSkill.candidate_id == ada.id)} == {
+        "python", "sql"
+    }
+
+
+def test_reimport_inserts_nothing(db):
+    import_candidates(io.BytesIO(CSV), "csv")
+    again = import_candidates(io.BytesIO(CSV), "csv")
+    assert again.inserted == 0
+    assert again.inserted_ids == []
+    assert again.duplicates == 5
+
+
+def test_stored_emails_match_regardless_of_case(db):
+    # Written before emails were lowercased on the way in
+    db.execute(Candidate.__table__.insert().values(
+        id="legacy", name="Legacy", email="Taken@Example.com", location="Paris", skills=["java"], experience="2 years"
+    ))
+    db.commit()
+
+    result = import_candidates(io.BytesIO(CSV), "csv")
+    assert result.inserted == 3
+    assert {error["email"] for error in result.errors} == {
+        "ada@example.com", "taken@example.com", "noskills@example.com"
+    }
+    assert db.query(Candidate).filter(Candidate.email.ilike("taken@example.com")).count() == 1
+
+
+def test_invalid_rows_name_every_bad_field(db):
+    jsonl = b'{"name": "", "email": "nope", "location": "Oslo", "skills": [1], "experience": "1 year"}\n'
+    result = import_candidates(io.BytesIO(jsonl), "jsonl")
+    assert result.invalid == 1
+    assert result.errors[0]["error"] == (
+        "name: field required; email: not an email address; skills: must be a list of strings"
+    )
+
+
+def test_orm_writes_lowercase_emails(db):
+    candidate = add_candidates(db, {"email": "  Mixed@Example.COM "})[0]
+    assert candidate.email == "mixed@example.com"
@@ -0,0 +1,31 @@
+from app.database.models import get_engine
+from app.services.candidate_service import CandidateService
+
+from conftest import add_candidates
+
+
+def checked_out() -> int:
+    return get_engine().pool.checkedout()
+
+
+def test_no_connection_held_during_llm_calls(db, llm, monkeypatch):
+    candidate = add_candidates(db, {})[0]
+    service = CandidateService(db)
+    seen = []
+
+    for name in ("generate_screening_questions", "evaluate_screening_answers", "generate_structured"):
+        original = getattr(llm, name)
+
+        def wrapped(*args, original=original):
+            seen.append(checked_out())
+            return original(*args)
+
+        monkeypatch.setattr(llm, name, wrapped)
+
+    screening = service.screen_candidate(candidate.id)
+    service.submit_screening_answers(screening["screening_id"], ["An answer"] * 5)
+    service.screen_candidates([candidate.id])
+    service.search_candidates("python developer")
+    # Every wrapped call, including the nested generate_structured ones
+    assert len(seen) >= 4
+    assert seen == [0] * len(seen)
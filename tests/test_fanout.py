@@ -0,0 +1,40 @@
+import threading
+import time
+
+from app.services.candidate_service import RANK_MAX_CONCURRENCY, run_concurrently
+
+
+def test_concurrency_is_capped_across_callers():
+    lock = threading.Lock()
+    in_flight = peak = 0
+
+    def call():
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        time.sleep(0.02)
+        with lock:
+            in_flight -= 1
+        return "ok"
+
+    def search():
+        results = dict(run_concurrently({index: call for index in range(RANK_MAX_CONCURRENCY)}))
+        assert list(results.values()) == ["ok"] * RANK_MAX_CONCURRENCY
+
+    searches = [threading.Thread(target=search) for _ in range(3)]
+    for thread in searches:
+        thread.start()
+    for thread in searches:
+        thread.join()
+    assert peak == RANK_MAX_CONCURRENCY
+
+
+def test_errors_and_timeouts_are_yielded():
+    def fail():
+        raise ValueError("bad")
+
+    results = dict(run_concurrently({"fail": fail, "slow": lambda: time.sleep(0.5), "ok": lambda: 1}, timeout=0.1))
+    assert isinstance(results["fail"], ValueError)
+    assert isinstance(results["slow"], TimeoutError)
+    assert results["ok"] == 1
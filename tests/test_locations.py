@@ -0,0 +1,40 @@
+import pytest
+
+from app.database.models import Candidate, backfill_location_fields, get_pool_version
+from app.database.locations import normalize_location
+
+
+@pytest.mark.parametrize("location, expected", [
+    ("NYC", ("new york", "ny", "us")),
+    ("New York, NY", ("new york", "ny", "us")),
+    ("new york,  ny, USA", ("new york", "ny", "us")),
+    ("Austin, Texas", ("austin", "tx", "us")),
+    ("Berlin, Germany", ("berlin", None, "de")),
+    ("Toronto, ON, Canada", ("toronto", "on", "ca")),
+    ("Bangalore", ("bengaluru", None, "in")),
+    ("Remote", ("remote", None, None)),
+    ("Somewhere Odd", ("somewhere odd", None, None)),
+    ("", (None, None, None)),
+])
+def test_normalize_location(location, expected):
+    assert normalize_location(location) == expected
+
+
+def test_backfill_fills_old_rows_once(db):
+    table = Candidate.__table__
+    # Written before the location columns existed
+    db.execute(table.insert(), [
+        {"id": "nyc", "name": "A", "email": "a@example.com", "location": "NYC", "skills": [], "experience": "x"},
+        {"id": "blank", "name": "B", "email": "b@example.com", "location": " ", "skills": [], "experience": "x"},
+    ])
+    db.commit()
+    version = get_pool_version(db)
+
+    assert backfill_location_fields(db) == 1
+    nyc = db.get(Candidate, "nyc")
+    assert (nyc.location_city, nyc.location_region, nyc.location_country) == ("new york", "ny", "us")
+    assert get_pool_version(db) == version + 1
+
+    # Visited rows aren't rescanned, even those that yielded nothing
+    assert backfill_location_fields(db) == 0
+    assert get_pool_version(db) == version + 1
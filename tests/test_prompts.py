@@ -0,0 +1,59 @@
+import pytest
+
+from app.llm.prompts import (
+    MAX_OUTPUT_TOKENS, analysis_prompt, compact_json, estimate_tokens, fit_candidate, truncate_text
+)
+from app.llm.usage import TokenUsage, token_usage
+
+
+def test_truncate_text_cuts_at_a_word_boundary():
+    text = "built " * 100
+    cut = truncate_text(text, 10)
+    assert cut.endswith("built…")
+    assert len(cut) <= 41
+    assert truncate_text("short", 10) == "short"
+
+
+def test_fit_candidate_keeps_small_profiles_and_drops_empty_fields():
+    candidate = {"name": "Ada", "skills": ["python"], "experience": "5 years", "education": None, "phone": ""}
+    assert fit_candidate(candidate) == {"name": "Ada", "skills": ["python"], "experience": "5 years"}
+
+
+@pytest.mark.parametrize("budget", [60, 200, 400])
+def test_fit_candidate_trims_long_text_to_the_budget(budget):
+    candidate = {
+        "name": "Ada",
+        "skills": ["python", "sql"],
+        "experience": "Led the platform team building data pipelines. " * 200,
+        "education": [{"degree": f"Course {index}", "notes": "x" * 200} for index in range(20)],
+    }
+    fitted = fit_candidate(candidate, max_tokens=budget)
+    assert estimate_tokens(compact_json(fitted)) <= budget
+    assert fitted["skills"] == ["python", "sql"]
+    # The most recent education entries are kept, within a third of the budget
+    assert fitted.get("education", []) == candidate["education"][:len(fitted.get("education", []))]
+    assert fitted["experience"].startswith("Led the platform team")
+    assert candidate["experience"].startswith(fitted["experience"].rstrip("…"))
+
+
+def test_analysis_prompt_caps_output():
+    prompt = analysis_prompt({"name": "Ada", "skills": ["python"], "experience": "5 years"})
+    assert prompt.max_output_tokens == MAX_OUTPUT_TOKENS["analysis"]
+    assert '"name":"Ada"' in prompt.prompt
+
+
+def test_usage_is_recorded_per_task(llm):
+    before = token_usage.stats().get("analysis", {"calls": 0, "input_tokens": 0, "output_tokens": 0})
+    llm.analyze_candidate({"name": "Ada", "skills": ["python"], "experience": "5 years"})
+
+    after = token_usage.stats()["analysis"]
+    assert after["calls"] == before["calls"] + 1
+    assert after["input_tokens"] > before["input_tokens"]
+    assert after["output_tokens"] > before["output_tokens"]
+
+
+def test_malformed_outputs_are_counted_separately():
+    usage = TokenUsage()
+    usage.record("query_parse", 40, 10)
+    usage.record_malformed("query_parse")
+    assert usage.stats() == {"query_parse": {"calls": 1, "input_tokens": 40, "output_tokens": 10, "malformed": 1}}
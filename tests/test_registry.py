@@ -0,0 +1,37 @@
+from concurrent.futures import ThreadPoolExecutor
+import time
+
+import pytest
+
+from app.llm import registry
+from app.llm.registry import get_llm_client
+
+
+def test_one_client_per_provider_and_model():
+    default = get_llm_client()
+    assert get_llm_client() is default
+    assert get_llm_client("FAKE") is default
+    assert get_llm_client("fake", "other") is not default
+    assert get_llm_client("fake", "other").model_name == "other"
+
+
+def test_concurrent_first_use_builds_one_client(monkeypatch):
+    created = []
+    create_client = registry._create_client
+
+    def slow_create(provider, model=None):
+        time.sleep(0.01)
+        created.append(model)
+        return create_client(provider, model)
+
+    monkeypatch.setattr(registry, "_clients", {})
+    monkeypatch.setattr(registry, "_create_client", slow_create)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        clients = list(pool.map(lambda _: get_llm_client("fake", "fresh"), range(32)))
+    assert len({id(client) for client in clients}) == 1
+    assert created == ["fresh"]
+
+
+def test_unknown_provider():
+    with pytest.raises(ValueError):
+        get_llm_client("nope")
@@ -0,0 +1,69 @@
+import time
+
+import pytest
+
+from app.llm.errors import LLMRateLimitError, LLMRetryableError, LLMUnavailableError
+from app.llm.resilience import CircuitBreaker
+
+
+def test_breaker_opens_after_threshold_and_recovers():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.available()
+    with pytest.raises(LLMUnavailableError):
+        breaker.before_call()
+
+    time.sleep(0.06)
+    assert breaker.available()
+    breaker.before_call()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # Only one trial call at a time
+    assert not breaker.available()
+    with pytest.raises(LLMUnavailableError):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.stats() == {"state": "closed", "consecutive_failures": 0, "rejected": 2}
+
+
+def test_failed_trial_reopens():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=0.05)
+    for _ in range(3):
+        breaker.record_failure()
+    time.sleep(0.06)
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(LLMUnavailableError):
+        breaker.before_call()
+
+
+def test_fake_client_trips_breaker(llm, monkeypatch):
+    monkeypatch.setattr(llm, "error_rate", 1.0)
+    for attempt in range(2):
+        with pytest.raises(LLMRetryableError):
+            llm.generate_response(f"prompt {attempt}")
+    assert not llm.is_available()
+    with pytest.raises(LLMUnavailableError):
+        llm.generate_response("prompt 2")
+
+    time.sleep(0.06)
+    monkeypatch.setattr(llm, "error_rate", 0.0)
+    assert llm.generate_response("prompt 3") == "{}"
+    assert llm.policy.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_rate_limits_do_not_trip_breaker(llm, monkeypatch):
+    monkeypatch.setattr(llm, "rate_limit_rate", 1.0)
+    for attempt in range(3):
+        with pytest.raises(LLMRateLimitError):
+            llm.generate_response(f"prompt {attempt}")
+    assert llm.is_available()
+    assert llm.policy.limiter.throttled == 3
@@ -0,0 +1,60 @@
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app.database.models import Candidate, SessionLocal
+from app.services.score_store import ScoreStore
+
+from conftest import add_candidates
+
+
+def scores(db):
+    db.expire_all()
+    return {candidate.email: candidate.score for candidate in db.query(Candidate)}
+
+
+def test_flush_writes_buffered_scores_in_one_update(db):
+    first, second = add_candidates(db, {}, {})
+    store = ScoreStore(flush_interval=0)
+    store.record(first.id, 70.0, current=first.score)
+    store.record(second.id, 40.0, current=second.score)
+    # The newest score for a candidate wins
+    store.record(second.id, 45.0, current=second.score)
+    assert scores(db) == {first.email: 0.0, second.email: 0.0}
+
+    assert store.flush() == 2
+    assert scores(db) == {first.email: 70.0, second.email: 45.0}
+    assert store.stats() == {"pending": 0, "written": 2, "skipped": 0}
+
+
+def test_unchanged_scores_are_skipped(db):
+    candidate = add_candidates(db, {"score": 50.0})[0]
+    store = ScoreStore(flush_interval=0)
+    store.record(candidate.id, 60.0, current=50.0)
+    # A later search finds the stored score still current
+    store.record(candidate.id, 50.0, current=50.0)
+
+    assert store.flush() == 0
+    assert store.stats()["skipped"] == 1
+
+
+def test_failed_flush_keeps_scores_buffered(db):
+    candidate = add_candidates(db, {})[0]
+
+    def broken_session():
+        session = SessionLocal()
+
+        def execute(*args, **kwargs):
+            raise OperationalError("UPDATE", {}, Exception("database is locked"))
+
+        session.execute = execute
+        return session
+
+    store = ScoreStore(session_factory=broken_session, flush_interval=0)
+    store.record(candidate.id, 80.0)
+    with pytest.raises(OperationalError):
+        store.flush()
+    assert store.stats()["pending"] == 1
+
+    store.session_factory = SessionLocal
+    assert store.flush() == 1
+    assert scores(db) == {candidate.email: 80.0}
@@ -0,0 +1,124 @@
+import pytest
+
+from app.services.candidate_service import CandidateService, decode_cursor, encode_cursor
+from app.services.search_cache import search_result_cache
+
+from conftest import add_candidates
+
+
+def result_ids(results):
+    return {result["id"] for result in results}
+
+
+def test_cursor_round_trip():
+    result = {"stage": "lexical", "score": 12.5, "id": "abc"}
+    assert decode_cursor(encode_cursor(result)) == (1, -12.5, "abc")
+
+
+# Not base64, a one-element list and an object
+@pytest.mark.parametrize("cursor", ["not base64!", "WzFd", "e30="])
+def test_invalid_cursor(cursor, db):
+    with pytest.raises(ValueError):
+        CandidateService(db).search_page("python developer", cursor=cursor)
+
+
+@pytest.mark.parametrize("cached", [True, False])
+def test_pages_cover_results_once_in_rank_order(cached, db):
+    add_candidates(db, *[
+        {"skills": ["python"] + (["docker"] if index % 3 == 0 else []), "experience": f"{index} years of python"}
+        for index in range(25)
+    ])
+    service = CandidateService(db)
+    expected = [result["id"] for result in service.search_candidates("python docker developer", mode="off")]
+
+    seen, cursor = [], None
+    while True:
+        if not cached:
+            # Every page re-ranks instead of slicing the cached result list
+            search_result_cache.memory.clear()
+        page = service.search_page("python docker developer", mode="off", limit=10, cursor=cursor)
+        assert page["total"] == 25
+        seen.extend(result["id"] for result in page["candidates"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == expected
+
+
+@pytest.fixture
+def pool(db):
+    return {
+        candidate.name: candidate.id
+        for candidate in add_candidates(
+            db,
+            {"name": "match", "skills": ["Python", "Docker"], "experience": "Senior backend engineer"},
+            {"name": "java", "skills": ["Java"], "experience": "Senior Java engineer"},
+            {"name": "paris", "skills": ["python", "docker"], "location": "Paris, France", "experience": "Junior developer"},
+            {"name": "partial", "skills": ["python"], "experience": "Senior data engineer"},
+        )
+    }
+
+
+@pytest.mark.parametrize("mode, expected", [
+    ("strict", {"match"}),
+    ("soft", {"match", "paris", "partial"}),
+    ("off", {"match", "java", "paris", "partial"}),
+])
+def test_criteria_pushdown(mode, expected, db, pool):
+    results = CandidateService(db).search_candidates("Senior python docker developer in Berlin", mode=mode)
+    assert result_ids(results) == {pool[name] for name in expected}
+
+
+def test_explicit_filters_override_parsed_criteria(db, pool):
+    results = CandidateService(db).search_candidates(
+        "Senior python docker developer in Berlin", filters={"skills": ["java"]}, mode="soft"
+    )
+    assert result_ids(results) == {pool["java"]}
+
+
+def test_unknown_mode(db):
+    with pytest.raises(ValueError):
+        CandidateService(db).search_candidates("python", mode="fuzzy")
+
+
+def test_stored_analyses_only_score_the_budgeted_top(db):
+    from app.llm.registry import get_llm_client
+    from app.services.analysis_store import analysis_payload, analysis_store
+    from app.services.candidate_service import RANK_BATCH_SIZE, LLMBudget
+
+    candidates = add_candidates(db, *[
+        {"skills": ["python", "docker"] if index < 5 else ["cobol"], "experience": f"{index} years"}
+        for index in range(20)
+    ])
+    llm = get_llm_client()
+    analysis = {"skills": [], "experience_level": "Mid", "location": "Berlin", "availability": "Now",
+                "fit_score": 99, "summary": ""}
+    analysis_store.save(
+        [(candidate.id, analysis_payload(candidate.__dict__), analysis) for candidate in candidates],
+        llm.model_name, llm.ANALYSIS_PROMPT_VERSION
+    )
+
+    # One call covers RANK_BATCH_SIZE candidates, the python matches first
+    results = CandidateService(db).search_candidates("python docker", mode="off", budget=LLMBudget(max_calls=1))
+    stages = {result["id"]: result["stage"] for result in results}
+    assert [stages[candidate.id] for candidate in candidates[:5]] == ["llm"] * 5
+    assert [result["stage"] for result in results] == ["llm"] * RANK_BATCH_SIZE + ["lexical"] * (20 - RANK_BATCH_SIZE)
+
+
+def test_candidate_writes_invalidate_cached_results(db):
+    first = add_candidates(db, {"experience": "5 years of python"})[0]
+    service = CandidateService(db)
+    results = service.search_candidates("python developer", mode="off")
+    hits = search_result_cache.stats()["hits"]
+
+    # Same query after normalization: served from the cache
+    assert service.search_candidates("Python  Developer", mode="off") == results
+    assert search_result_cache.stats()["hits"] == hits + 1
+
+    second = add_candidates(db, {"email": "second@example.com"})[0]
+    assert result_ids(service.search_candidates("python developer", mode="off")) == {first.id, second.id}
+
+    db.delete(second)
+    db.commit()
+    assert result_ids(service.search_candidates("python developer", mode="off")) == {first.id}
@@ -0,0 +1,71 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+
+from app.llm.singleflight import SingleFlight
+
+
+def run_while_blocked(flight, fn, callers=5):
+    """Start callers for one key while the leader's call is blocked; returns their results"""
+    release = threading.Event()
+
+    def blocked():
+        release.wait(5)
+        return fn()
+
+    with ThreadPoolExecutor(max_workers=callers) as pool:
+        futures = [pool.submit(flight.do, "key", blocked) for _ in range(callers)]
+        while flight.stats()["calls"] + flight.stats()["deduplicated"] < callers:
+            time.sleep(0.001)
+        release.set()
+        return [future.exception() or future.result() for future in futures]
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    calls = []
+    results = run_while_blocked(flight, lambda: calls.append(1) or "answer")
+
+    assert results == ["answer"] * 5
+    assert len(calls) == 1
+    assert flight.stats() == {"calls": 1, "deduplicated": 4, "in_flight": 0}
+
+
+def test_callers_share_the_leaders_error():
+    flight = SingleFlight()
+
+    def fail():
+        raise TimeoutError("upstream timed out")
+
+    results = run_while_blocked(flight, fail)
+    assert all(isinstance(result, TimeoutError) for result in results)
+
+
+def test_results_are_not_cached():
+    flight = SingleFlight()
+    assert flight.do("key", lambda: 1) == 1
+    assert flight.do("key", lambda: 2) == 2
+    assert flight.stats()["deduplicated"] == 0
+
+
+def test_identical_prompts_reach_the_provider_once(llm, monkeypatch):
+    calls = []
+    generate = llm._generate
+    release = threading.Event()
+
+    def slow_generate(*args, **kwargs):
+        calls.append(args[0])
+        release.wait(5)
+        return generate(*args, **kwargs)
+
+    monkeypatch.setattr(llm, "_generate", slow_generate)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(llm.generate_response, "Say hello", task="test") for _ in range(4)]
+        while not calls:
+            time.sleep(0.001)
+        time.sleep(0.05)
+        release.set()
+        responses = {future.result() for future in futures}
+
+    assert len(calls) == 1
+    assert len(responses) == 1
@@ -0,0 +1,38 @@
+from sqlalchemy import inspect, text
+
+from app.database import models
+from app.database.models import get_engine, migrate_schema
+from benchmarks import import_time
+
+
+def test_import_is_fast_and_side_effect_free():
+    report = import_time.check(repeat=3)
+    assert report["failures"] == []
+
+
+def drop_column(engine, table: str, column: str) -> None:
+    with engine.begin() as conn:
+        conn.execute(text(f"ALTER TABLE {table} DROP COLUMN {column}"))
+    # SQLite connections that cached the old schema would still see the column
+    engine.dispose()
+
+
+def test_migrate_schema_adds_missing_columns(db):
+    engine = get_engine()
+    drop_column(engine, "candidates", "skills_backfilled")
+
+    assert migrate_schema(engine) == ["candidates.skills_backfilled"]
+    assert migrate_schema(engine) == []
+
+
+def test_migrate_schema_tolerates_a_concurrent_migration(db, monkeypatch):
+    engine = get_engine()
+    drop_column(engine, "candidates", "skills_backfilled")
+    # What this process saw before another worker added the column
+    stale = inspect(engine)
+    stale.get_columns("candidates")
+    migrate_schema(engine)
+
+    views = iter([stale])
+    monkeypatch.setattr(models, "inspect", lambda bind: next(views, None) or inspect(bind))
+    assert migrate_schema(engine) == []